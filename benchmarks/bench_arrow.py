@@ -0,0 +1,97 @@
+"""
+Arrow Benchmark
+
+Parses a string column of a large local Parquet file batch by batch with num_parse.arrow_transform, reading the column
+both as plain strings and dictionary-encoded, and compares it against converting the column to Python objects and
+calling parse_num on every row. Checks that every way of parsing gives the same structs.
+
+If the Parquet file does not exist, it is first written with the texts of a generated corpus (see num_parse.corpus),
+drawn from a pool of distinct phrases so that values repeat like they do in real columns.
+
+Usage:
+    python benchmarks/bench_arrow.py PATH [--column NAME] [--rows N] [--distinct N] [--batch-size N] [--seed N]
+
+"""
+
+import argparse
+import logging
+import os
+import random
+import time
+
+def write_parquet(path, column, rows, distinct, seed):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from num_parse.NumParser import NumParser
+    from num_parse.corpus import CorpusGenerator
+    pool = [record['text'] for record in CorpusGenerator(NumParser(), seed=seed).generate(distinct)]
+    rnd = random.Random(seed)
+    with pq.ParquetWriter(path, pa.schema([(column, pa.string())])) as writer:
+        for start in range(0, rows, 100000):
+            writer.write_table(pa.table({column: rnd.choices(pool, k=min(100000, rows - start))}))
+
+def parse_rows(num_parser, batches, column):
+    import pyarrow as pa
+    from num_parse.arrow_transform import PARSED_TYPE
+    for batch in batches:
+        structs = []
+        for value in batch.column(column).to_pylist():
+            if value is None:
+                structs.append(None)
+                continue
+            try:
+                result = num_parser.parse_num(value)
+            except Exception as e:
+                structs.append({'error': type(e).__name__})
+                continue
+            structs.append({'min': float(result.min_val.magnitude), 'max': float(result.max_val.magnitude),
+                            'unit': str(result.min_val.units), 'base_min': result.base_min, 'base_max': result.base_max})
+        yield pa.array(structs, PARSED_TYPE)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('path', help='the Parquet file to parse (written if it does not exist)')
+    arg_parser.add_argument('--column', default='text')
+    arg_parser.add_argument('--rows', type=int, default=1000000, help='how many rows to write')
+    arg_parser.add_argument('--distinct', type=int, default=20000, help='how many distinct phrases to write')
+    arg_parser.add_argument('--batch-size', type=int, default=65536)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    import pyarrow.parquet as pq
+    from num_parse.NumParser import NumParser
+    from num_parse.arrow_transform import transform_batches
+    if not os.path.exists(args.path):
+        write_parquet(args.path, args.column, args.rows, args.distinct, args.seed)
+    rows = pq.ParquetFile(args.path).metadata.num_rows
+
+    def batches(dictionary):
+        parquet_file = pq.ParquetFile(args.path, read_dictionary=[args.column] if dictionary else None)
+        return parquet_file.iter_batches(batch_size=args.batch_size, columns=[args.column])
+
+    runs = {
+        'parse_num per row': lambda num_parser: parse_rows(num_parser, batches(False), args.column),
+        'transform': lambda num_parser: (batch.column(1) for batch in transform_batches(batches(False), args.column, num_parser)),
+        'transform (dictionary)': lambda num_parser: (batch.column(1) for batch in transform_batches(batches(True), args.column, num_parser)),
+    }
+    print('{} rows'.format(rows))
+    print('{:<24} {:>10} {:>12} {:>9}'.format('run', 'seconds', 'rows/s', 'speedup'))
+    baseline = None
+    expected = None
+    for name, run in runs.items():
+        # A new parser per run, so no run benefits from the registry caches another one filled
+        num_parser = NumParser()
+        start = time.perf_counter()
+        results = list(run(num_parser))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print('{:<24} {:>10.2f} {:>12.0f} {:>8.2f}x'.format(name, elapsed, rows / elapsed, baseline / elapsed))
+        values = [value for result in results for value in result.to_pylist()]
+        if expected is None:
+            expected = values
+        elif values != expected:
+            print('  results differ from parse_num per row!')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Column Parsing Benchmark
+
+Compares parse_column against calling parse_num on every value of homogeneous columns, and checks that both give the
+same values.
+
+Usage:
+    python benchmarks/bench_columns.py [--rows N] [--seed N]
+
+"""
+
+import argparse
+import logging
+import random
+import time
+from num_parse.NumParser import NumParser
+from num_parse.columns import infer_template, parse_column
+
+COLUMNS = {
+    'dose': lambda rnd: '{} mg'.format(rnd.randint(0, 2000)),
+    'duration': lambda rnd: '{}.{} to {} hours'.format(rnd.randint(1, 9), rnd.randint(0, 9), rnd.randint(10, 20)),
+    'price': lambda rnd: '${:,}'.format(rnd.randint(1, 99999)),
+    'count': lambda rnd: str(rnd.randint(-500, 500)),
+    'weight': lambda rnd: 'between {} and {} kg'.format(rnd.randint(1, 9), rnd.randint(10, 99)),
+}
+
+def parse_each(num_parser: NumParser, values):
+    results = []
+    for value in values:
+        try:
+            results.append(num_parser.parse_num(value))
+        except Exception:
+            results.append(None)
+    return results
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rows', type=int, default=5000)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    num_parser = NumParser()
+    rnd = random.Random(args.seed)
+    print('{:<10} {:<28} {:>16} {:>16} {:>9}'.format('column', 'template', 'parse_num (us)', 'column (us)', 'speedup'))
+    for name, make_value in COLUMNS.items():
+        values = [make_value(rnd) for _ in range(args.rows)] + ['n/a']
+        template = infer_template(num_parser, values[:100])
+
+        start = time.perf_counter()
+        expected = parse_each(num_parser, values)
+        baseline = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = parse_column(num_parser, values, errors='coerce')
+        column = time.perf_counter() - start
+        assert [str(value) for value in actual] == [str(value) for value in expected]
+
+        print('{:<10} {:<28} {:>16.1f} {:>16.1f} {:>8.1f}x'.format(
+            name, repr('<n>'.join(template.pieces)) if template else '-',
+            baseline / len(values) * 1e6, column / len(values) * 1e6, baseline / column))
+
+if __name__ == '__main__':
+    main()
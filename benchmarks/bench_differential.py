@@ -0,0 +1,43 @@
+"""
+Differential Benchmark
+
+Runs the reference engine and the accelerated engines (see num_parse.differential) over generated and/or recorded
+corpora, reporting every divergence in value, unit, exception type or comparison result, and the throughput of each
+engine. Exits with a non-zero status if any engine diverges from the reference.
+
+Recorded corpora are JSON lines files with a "text" (and optionally an "expect") key per line, such as the corpora of
+benchmarks/make_corpus.py or the dumps of instrumentation.SlowInputLog.
+
+Usage:
+    python benchmarks/bench_differential.py [--size N] [--seed N] [--mix CATEGORY=WEIGHT ...] [--corpus PATH ...]
+
+"""
+
+import argparse
+import itertools
+import logging
+import sys
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--size', type=int, default=5000, help='how many phrases to generate (0 for none)')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--mix', nargs='*', default=[], help='category weights, e.g. unit=2 range=1 (default: all equal)')
+    arg_parser.add_argument('--corpus', nargs='*', default=[], help='recorded corpora to compare on')
+    arg_parser.add_argument('--max-divergences', type=int, default=20)
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    from num_parse.NumParser import NumParser
+    from num_parse.corpus import CorpusGenerator, read_corpus
+    from num_parse.differential import compare_engines, default_engines
+    num_parser = NumParser()
+    mix = {category: float(weight) for category, weight in (item.split('=') for item in args.mix)} or None
+    records = itertools.chain(CorpusGenerator(num_parser, seed=args.seed, mix=mix).generate(args.size),
+                              *(read_corpus(path) for path in args.corpus))
+    report = compare_engines(records, default_engines(num_parser), max_divergences=args.max_divergences)
+    print(report.summary())
+    sys.exit(0 if report.agrees else 1)
+
+if __name__ == '__main__':
+    main()
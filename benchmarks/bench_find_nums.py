@@ -0,0 +1,79 @@
+"""
+Find Nums Benchmark
+
+Measures the throughput of NumParser.find_nums on multi-megabyte documents, and its peak memory use when the same
+documents are streamed from disk, which should stay flat as the documents grow.
+
+Usage:
+    python benchmarks/bench_find_nums.py [--sizes 1 2 4] [--seed N]
+
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from num_parse.NumParser import NumParser
+
+SENTENCES = [
+    'The package weighs {n} kg and ships within {n} to {m} days.',
+    'We walked for {n} hours and {m} minutes before lunch.',
+    'Nobody in the office could remember where the meeting was supposed to be held.',
+    'The recipe calls for {n} cups of flour, two eggs and a pinch of salt.',
+    'Revenue grew to ${n} million last year, up from {m} million.',
+    'There was nothing else worth noting in the report.',
+    'The board is one hundred and {word} centimeters long.',
+]
+
+WORDS = ['five', 'twelve', 'twenty', 'forty-two', 'ninety']
+
+def make_document(size: int, seed: int) -> str:
+    rnd = random.Random(seed)
+    lines = []
+    length = 0
+    while length < size:
+        line = ' '.join(rnd.choice(SENTENCES).format(n=rnd.randint(1, 999), m=rnd.randint(1, 999), word=rnd.choice(WORDS))
+                        for _ in range(rnd.randint(1, 6)))
+        lines.append(line)
+        length += len(line) + 1
+    return '\n'.join(lines)
+
+def time_find_nums(num_parser: NumParser, document: str):
+    start = time.perf_counter()
+    count = sum(1 for _ in num_parser.find_nums(document))
+    return count, time.perf_counter() - start
+
+def peak_streaming_memory(num_parser: NumParser, path: str) -> int:
+    tracemalloc.start()
+    with open(path) as f:
+        for _ in num_parser.find_nums(iter(lambda: f.read(1 << 14), '')):
+            pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sizes', type=float, nargs='+', default=[1, 2, 4], help='document sizes in MB')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    num_parser = NumParser()
+    print('{:>10} {:>10} {:>12} {:>12} {:>18}'.format('size (MB)', 'spans', 'time (s)', 'MB/s', 'stream peak (KB)'))
+    for size in args.sizes:
+        document = make_document(int(size * 2 ** 20), args.seed)
+        count, elapsed = time_find_nums(num_parser, document)
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write(document)
+        try:
+            peak = peak_streaming_memory(num_parser, f.name)
+        finally:
+            os.remove(f.name)
+        print('{:>10.1f} {:>10} {:>12.2f} {:>12.2f} {:>18.1f}'.format(size, count, elapsed, size / elapsed, peak / 1024))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Incremental Extraction Benchmark
+
+Measures the latency of small edits (typing a character, changing a number, joining two lines) to documents of several
+sizes with an ExtractionSession, against extracting the numbers of the whole document again with find_nums. The parsing
+an edit does is independent of the size of the document, but its bookkeeping is linear in it, so the latencies are also
+reported relative to those of the smallest document.
+
+Usage:
+    python benchmarks/bench_incremental.py [--sizes MB,MB,...] [--edits N] [--seed N]
+
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from num_parse.NumParser import NumParser
+from num_parse.extraction import ExtractionSession
+
+sys.path.insert(0, str(Path(__file__).parent))
+from bench_find_nums import make_document
+
+def random_edit(text: str, rnd: random.Random):
+    kind = rnd.choice(['type', 'digit', 'join'])
+    position = rnd.randrange(len(text))
+    if kind == 'type':
+        return position, position, rnd.choice('abcdefgh ')
+    if kind == 'digit':
+        position = next((idx for idx in range(position, len(text)) if text[idx].isdigit()), position)
+        return position, min(position + 1, len(text)), str(rnd.randint(0, 9))
+    position = text.find('\n', position)
+    return (position, position + 1, ' ') if position >= 0 else (0, 0, 'x')
+
+def measure(num_parser: NumParser, size: float, edits: int, seed: int):
+    """
+    :return: The number of segments, the initial and full extraction times and the sorted edit latencies (in seconds)
+             of a document of the given size in MB.
+    """
+
+    rnd = random.Random(seed)
+    document = make_document(int(size * 2 ** 20), seed)
+
+    start = time.perf_counter()
+    session = ExtractionSession(num_parser, document)
+    initial = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(edits):
+        edit = random_edit(session.text, rnd)
+        start = time.perf_counter()
+        session.edit(*edit)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in num_parser.find_nums(session.text):
+        pass
+    full = time.perf_counter() - start
+    return len(session.segments), initial, full, sorted(latencies)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sizes', default='0.25,1,4', help='comma separated document sizes in MB')
+    arg_parser.add_argument('--edits', type=int, default=200)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    num_parser = NumParser()
+    print('{:>8} {:>10} {:>10} {:>10} {:>12} {:>9} {:>9} {:>9} {:>9}'.format(
+        'MB', 'segments', 'initial s', 'full s', 'median ms', 'p95 ms', 'max ms', 'median x', 'p95 x'))
+    smallest = None
+    for size in [float(size) for size in args.sizes.split(',')]:
+        segments, initial, full, latencies = measure(num_parser, size, args.edits, args.seed)
+        median, p95 = statistics.median(latencies), latencies[int(len(latencies) * 0.95)]
+        smallest = smallest or (median, p95)
+        print('{:>8.2f} {:>10} {:>10.2f} {:>10.2f} {:>12.3f} {:>9.3f} {:>9.3f} {:>8.2f}x {:>8.2f}x'.format(
+            size, segments, initial, full, median * 1e3, p95 * 1e3, latencies[-1] * 1e3, median / smallest[0],
+            p95 / smallest[1]))
+
+if __name__ == '__main__':
+    main()
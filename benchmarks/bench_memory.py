@@ -0,0 +1,49 @@
+"""
+Memory Benchmark
+
+Profiles the allocations of parse_num with tracemalloc (see num_parse.allocations): the peak and retained memory of a
+parse for each category of a generated corpus, and the memory and registry sizes over a long run of the corpus, which
+makes the growth of the registry (e.g. the units inserted by looking up prefixed units) visible.
+
+Usage:
+    python benchmarks/bench_memory.py [--size N] [--seed N] [--every N] [--per-category N]
+
+"""
+
+import argparse
+import logging
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--size', type=int, default=20000, help='how many phrases to parse in the long run')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--every', type=int, default=2000, help='how many phrases to parse between samples')
+    arg_parser.add_argument('--per-category', type=int, default=20, help='how many phrases to profile per category')
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    from num_parse.NumParser import NumParser
+    from num_parse.allocations import AllocationProfiler
+    from num_parse.corpus import CATEGORIES, CorpusGenerator
+    num_parser = NumParser()
+    profiler = AllocationProfiler(num_parser)
+
+    categories = {}
+    for record in CorpusGenerator(num_parser, seed=args.seed).generate(args.per_category * len(CATEGORIES) * 3):
+        texts = categories.setdefault(record['category'], [])
+        if len(texts) < args.per_category:
+            texts.append(record['text'])
+    print('{:<10} {:>10} {:>16} {:>15}'.format('category', 'peak (B)', 'retained blocks', 'retained (B)'))
+    for category, stats in profiler.profile_categories(categories).items():
+        print('{:<10} {:>10.0f} {:>16.2f} {:>15.1f}'.format(category, stats.peak_bytes, stats.retained_blocks, stats.retained_bytes))
+
+    print()
+    texts = (record['text'] for record in CorpusGenerator(num_parser, seed=args.seed + 1).generate(args.size))
+    samples = profiler.track_growth(texts, every=args.every)
+    names = sorted(samples[0].registry)
+    print('{:>8} {:>12} '.format('parses', 'traced (B)') + ' '.join('{:>12}'.format(name[-12:]) for name in names))
+    for sample in samples:
+        print('{:>8} {:>12} '.format(sample.parses, sample.traced_bytes) + ' '.join('{:>12}'.format(sample.registry[name]) for name in names))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Prefilter Benchmark
+
+Compares calling parse_num on every row of a mostly number-free corpus against skipping the rows that
+NumParser.may_contain_number rules out.
+
+Usage:
+    python benchmarks/bench_prefilter.py [--rows N] [--positive-rate R] [--seed N]
+
+"""
+
+import argparse
+import logging
+import random
+import time
+from num_parse.NumParser import NumParser
+
+NEGATIVE_ROWS = [
+    'Nobody could remember where the meeting was supposed to be held',
+    'Salt and pepper to taste',
+    'See the attached report for details',
+    'Please go to the front desk',
+    'Customer asked for a refund or an exchange',
+    'N/A',
+    'Stir gently until combined',
+    'Shipped via ground',
+]
+
+POSITIVE_ROWS = ['5 kg', 'two to three hours', '$11', '4.5 million', 'between 5 and 10 cm', 'twenty three']
+
+def make_corpus(rows: int, positive_rate: float, seed: int):
+    rnd = random.Random(seed)
+    return [rnd.choice(POSITIVE_ROWS if rnd.random() < positive_rate else NEGATIVE_ROWS) for _ in range(rows)]
+
+def parse_all(num_parser: NumParser, corpus, prefilter: bool):
+    values = []
+    for row in corpus:
+        if prefilter and not num_parser.may_contain_number(row):
+            values.append(None)
+            continue
+        try:
+            values.append(num_parser.parse_num(row))
+        except Exception:
+            values.append(None)
+    return values
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--rows', type=int, default=20000)
+    arg_parser.add_argument('--positive-rate', type=float, default=0.05)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    num_parser = NumParser()
+    corpus = make_corpus(args.rows, args.positive_rate, args.seed)
+
+    start = time.perf_counter()
+    filtered = sum(not num_parser.may_contain_number(row) for row in corpus)
+    check = time.perf_counter() - start
+
+    timings = {}
+    results = {}
+    for prefilter in (False, True):
+        start = time.perf_counter()
+        results[prefilter] = parse_all(num_parser, corpus, prefilter)
+        timings[prefilter] = time.perf_counter() - start
+    assert [str(value) for value in results[False]] == [str(value) for value in results[True]]
+
+    print('rows: {}, ruled out by the prefilter: {} ({:.1%})'.format(len(corpus), filtered, filtered / len(corpus)))
+    print('prefilter alone: {:.2f} us/row'.format(check / len(corpus) * 1e6))
+    print('parse_num only:  {:.2f} us/row'.format(timings[False] / len(corpus) * 1e6))
+    print('with prefilter:  {:.2f} us/row ({:.1f}x)'.format(timings[True] / len(corpus) * 1e6, timings[False] / timings[True]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Benchmark Suite
+
+Times every category of input parse_num handles, the construction of a NumParser, the import of the package and the
+RangeValue comparison and arithmetic operators. Everything runs offline.
+
+Results are written as JSON (one entry per benchmark, with the per-call timings summarized), together with the commit
+and the versions they were measured with, so runs can be compared across commits:
+
+    python benchmarks/bench_suite.py --output before.json
+    ... change something ...
+    python benchmarks/bench_suite.py --output after.json --compare before.json
+
+Usage:
+    python benchmarks/bench_suite.py [--repeat N] [--output PATH] [--compare PATH] [--filter TEXT]
+
+"""
+
+import argparse
+import json
+import logging
+import operator
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# The inputs of every parse_num category, mostly drawn from the unit tests
+PARSE_CATEGORIES = {
+    'raw_numeric': ['112', '11211234', '1,000,000', '124,000', '3.14159'],
+    'number_words': ['five', 'one hundred and forty two', 'two million three thousand and nineteen',
+                     'one hundred twenty three million four hundred fifty six thousand seven hundred and eighty nine'],
+    'negatives': ['negative one', 'minus 1', '-4.5 million', 'negative 1,000,000', '--1'],
+    'decimals': ['two point three', 'point nineteen', 'nine point nine nine nine', '4.5 million'],
+    'ranges': ['five to 10', '12-14', 'between 5 and 10', 'from eight until ten', 'negative 1 through negative 5'],
+    'units': ['five meters', '4 cm', '12,000 ms', '10 degrees Celsius', '45 metric tons', '2 kips per square inch'],
+    'compound_durations': ['2 hours 30 minutes and 15 seconds', '3:58', '1:02:03', '1 hour and 30 minutes',
+                           '8 millenniums, 2 centuries, 6 decades, 4 years, 11 months, 3 weeks, 2 days, 5 hours, '
+                           '51 minutes, and 16 seconds'],
+    'multiplier_distribution': ['5 to 10 million', 'two to three thousand', '1 to 2 billion dollars'],
+    'errors': ['', 'the cat sat on the mat', 'kg', 'go to school'],
+}
+
+def summarize(timings: List[float], calls: int) -> Dict[str, float]:
+    """
+    Summarizes the timings of a benchmark.
+    :param timings: The duration of each repetition, in seconds.
+    :param calls: The number of calls each repetition made.
+    :return: The minimum, median and mean time per call, in microseconds.
+    """
+
+    per_call = [timing / calls * 1e6 for timing in timings]
+    return {
+        'calls': calls,
+        'repeat': len(timings),
+        'min_us': min(per_call),
+        'median_us': statistics.median(per_call),
+        'mean_us': statistics.mean(per_call),
+    }
+
+def time_calls(function: Callable[[], object], calls: int, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings, calls)
+
+def parse_benchmarks(num_parser, repeat: int, name_filter: str = '') -> Dict[str, Dict[str, float]]:
+    results = {}
+    for category, inputs in PARSE_CATEGORIES.items():
+        name = 'parse_num.' + category
+        if name_filter not in name:
+            continue
+
+        def parse_all():
+            for text in inputs:
+                try:
+                    num_parser.parse_num(text)
+                except Exception:
+                    pass
+        result = time_calls(parse_all, 10, repeat)
+        # Report per input rather than per pass over the category
+        for key in ('min_us', 'median_us', 'mean_us'):
+            result[key] /= len(inputs)
+        result['calls'] *= len(inputs)
+        results[name] = result
+    return results
+
+def instrumentation_benchmarks(repeat: int, name_filter: str = '') -> Dict[str, Dict[str, float]]:
+    """
+    Times parsing every category without and with instrumentation attached (the full per-stage instrumentation and the
+    slow input log, with and without the breakdown into stages), to measure their overhead.
+    """
+
+    from num_parse.NumParser import NumParser
+    from num_parse.instrumentation import Instrumentation, SlowInputLog
+    runs = [(name, instrumentation) for name, instrumentation in
+            (('all', None), ('instrumented', Instrumentation()), ('slow_input_log', SlowInputLog(10)),
+             ('slow_input_log.total', SlowInputLog(10, breakdown=False)))
+            if name_filter in 'parse_num.' + name]
+    if not runs:
+        return {}
+    num_parser = NumParser()
+    inputs = [text for texts in PARSE_CATEGORIES.values() for text in texts]
+
+    def parse_all():
+        for text in inputs:
+            try:
+                num_parser.parse_num(text)
+            except Exception:
+                pass
+
+    results = {}
+    for name, instrumentation in runs:
+        num_parser.set_instrumentation(instrumentation)
+        parse_all()
+        result = time_calls(parse_all, 10, repeat)
+        for key in ('min_us', 'median_us', 'mean_us'):
+            result[key] /= len(inputs)
+        result['calls'] *= len(inputs)
+        results['parse_num.' + name] = result
+    return results
+
+def range_value_benchmarks(num_parser, repeat: int, name_filter: str = '') -> Dict[str, Dict[str, float]]:
+    Q_ = num_parser.Quantity
+    from num_parse.RangeValue import RangeValue
+    values = {
+        'same_units': (RangeValue(Q_(5, 'm'), Q_(10, 'm')), RangeValue(Q_(7, 'm'))),
+        'mixed_units': (RangeValue(Q_(5, 'm'), Q_(10, 'm')), RangeValue(Q_(700, 'cm'))),
+        'unitless': (RangeValue(Q_(5)), RangeValue(Q_(7))),
+    }
+    operators = {
+        'eq': operator.eq, 'lt': operator.lt, 'le': operator.le, 'gt': operator.gt, 'ge': operator.ge,
+        'add': operator.add, 'sub': operator.sub,
+    }
+    benchmarks = {}
+    for name, (lhs, rhs) in values.items():
+        for op_name, op in operators.items():
+            benchmarks['RangeValue.{}.{}'.format(op_name, name)] = lambda op=op, lhs=lhs, rhs=rhs: op(lhs, rhs)
+        benchmarks['RangeValue.mul_scalar.' + name] = lambda lhs=lhs: lhs * 3
+    benchmarks['RangeValue.construct'] = lambda: RangeValue(Q_(5, 'm'), Q_(10, 'm'))
+    return {name: time_calls(function, 200, repeat) for name, function in benchmarks.items() if name_filter in name}
+
+def construction_benchmarks(repeat: int, name_filter: str = '') -> Dict[str, Dict[str, float]]:
+    from num_parse.NumParser import NumParser
+    benchmarks = {
+        'NumParser()': NumParser,
+        'NumParser(units_profile="basic")': lambda: NumParser(units_profile='basic'),
+    }
+    return {name: time_calls(function, 1, repeat) for name, function in benchmarks.items() if name_filter in name}
+
+def import_benchmark(repeat: int, name_filter: str = '') -> Dict[str, Dict[str, float]]:
+    """
+    Times importing the package in a fresh interpreter, minus the start-up time of the interpreter itself.
+    """
+
+    name = 'import num_parse.NumParser'
+    if name_filter not in name:
+        return {}
+
+    def run(code):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True, cwd=REPO_ROOT)
+        return time.perf_counter() - start
+
+    timings = [run('import num_parse.NumParser') - run('pass') for _ in range(repeat)]
+    return {name: summarize(timings, 1)}
+
+def environment() -> Dict[str, str]:
+    import numpy
+    import pint
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, cwd=REPO_ROOT).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'pint': pint.__version__,
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+    }
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> None:
+    print('{:<55} {:>12} {:>12} {:>8}'.format('benchmark', 'before (us)', 'after (us)', 'ratio'))
+    for name, result in results.items():
+        if name in baseline:
+            before, after = baseline[name]['median_us'], result['median_us']
+            print('{:<55} {:>12.2f} {:>12.2f} {:>7.2f}x'.format(name, before, after, before / after if after else float('inf')))
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    arg_parser.add_argument('--output', help='where to write the JSON results (default: standard output)')
+    arg_parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    arg_parser.add_argument('--filter', default='', help='only run the benchmarks whose name contains this text')
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    from num_parse.NumParser import NumParser
+    num_parser = NumParser()
+    # Every suite only runs its benchmarks whose name matches the filter
+    suites = [
+        lambda: import_benchmark(args.repeat, args.filter),
+        lambda: construction_benchmarks(args.repeat, args.filter),
+        lambda: parse_benchmarks(num_parser, args.repeat, args.filter),
+        lambda: instrumentation_benchmarks(args.repeat, args.filter),
+        lambda: range_value_benchmarks(num_parser, args.repeat, args.filter),
+    ]
+    results = {}
+    for suite in suites:
+        results.update(suite())
+
+    report = json.dumps({'environment': environment(), 'results': results}, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(report + '\n')
+    else:
+        print(report)
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text())['results'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Unit Profiles Benchmark
+
+Compares the cost of constructing a NumParser and of searching for unit words with the full unit definitions
+against trimmed unit profiles.
+
+Usage:
+    python benchmarks/bench_unit_profiles.py [--repeat N]
+
+"""
+
+import argparse
+import logging
+import time
+from num_parse.NumParser import NumParser
+
+PROFILES = {
+    'full': None,
+    'basic': 'basic',
+    'length': ['length'],
+    'time': ['time'],
+}
+
+SAMPLE_INPUTS = ['5 kg', '3 hours', '$11', 'two and a half feet', '45 degrees Fahrenheit',
+                 '5 to 10 cm', 'twenty three', 'four hundred and twelve', '1 hour and 30 minutes']
+
+def time_construction(profile, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        NumParser(units_profile=profile)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def time_unit_search(num_parser: NumParser, repeat: int) -> float:
+    words = [[num_parser.clean_word(word) for word in text.split()] for text in SAMPLE_INPUTS]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for clean_words in words:
+            if not num_parser.has_unit_word(clean_words, True)[1]:
+                num_parser.has_unit_word(clean_words, False)
+    return (time.perf_counter() - start) / (repeat * len(words))
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print('{:<10} {:>10} {:>16} {:>12}'.format('profile', 'units', 'construct (ms)', 'search (us)'))
+    for name, profile in PROFILES.items():
+        num_parser = NumParser(units_profile=profile)
+        construction = time_construction(profile, args.repeat)
+        search = time_unit_search(num_parser, args.repeat * 20)
+        print('{:<10} {:>10} {:>16.1f} {:>12.1f}'.format(name, len(num_parser.ureg._units), construction * 1e3, search * 1e6))
+
+if __name__ == '__main__':
+    main()
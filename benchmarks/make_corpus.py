@@ -0,0 +1,62 @@
+"""
+Make Corpus
+
+Writes a synthetic, labeled corpus of number phrases (see num_parse.corpus) to a JSON lines file, e.g. for the other
+benchmarks or for measuring the accuracy of parse_num per category.
+
+Usage:
+    python benchmarks/make_corpus.py OUTPUT [--size N] [--seed N] [--mix CATEGORY=WEIGHT ...] [--accuracy]
+
+"""
+
+import argparse
+import logging
+import time
+from collections import Counter
+
+def accuracy(num_parser, path):
+    """
+    Parses every phrase of a corpus and counts, per category, how many parse to their label.
+    """
+
+    from num_parse.corpus import read_corpus
+    correct, total = Counter(), Counter()
+    for record in read_corpus(path):
+        total[record['category']] += 1
+        try:
+            value = num_parser.parse_num(record['text'])
+        except Exception:
+            correct[record['category']] += record['error']
+            continue
+        if record['error'] or not hasattr(value, 'min_val'):
+            continue
+        unit = None if value.min_val.unitless else str(value.min_val.units)
+        if unit == record['unit'] and abs(value.min_val.m - record['min']) <= 1e-9 * max(1, abs(record['min'])) and \
+                abs(value.max_val.m - record['max']) <= 1e-9 * max(1, abs(record['max'])):
+            correct[record['category']] += 1
+    for category in sorted(total):
+        print('{:<10} {:>8} / {:<8} {:>6.1%}'.format(category, correct[category], total[category],
+                                                   correct[category] / total[category]))
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('output')
+    arg_parser.add_argument('--size', type=int, default=100000)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--mix', nargs='*', default=[], help='category weights, e.g. unit=2 range=1 (default: all equal)')
+    arg_parser.add_argument('--accuracy', action='store_true', help='also report how many phrases parse to their label')
+    args = arg_parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    from num_parse.NumParser import NumParser
+    from num_parse.corpus import CorpusGenerator
+    num_parser = NumParser()
+    mix = {category: float(weight) for category, weight in (item.split('=') for item in args.mix)} or None
+    start = time.perf_counter()
+    count = CorpusGenerator(num_parser, seed=args.seed, mix=mix).write(args.output, args.size)
+    print('wrote {} phrases to {} in {:.2f} s'.format(count, args.output, time.perf_counter() - start))
+    if args.accuracy:
+        accuracy(num_parser, args.output)
+
+if __name__ == '__main__':
+    main()
@@ -40,22 +40,26 @@ ASSUMPTIONS:
 
 """
 
-from pathlib import Path
 import pint
 from pint import UnitRegistry, UndefinedUnitError, OffsetUnitCalculusError, DimensionalityError
+from pint.errors import PintError
 from pint.compat import is_duck_array_type, zero_or_nan
-from pint.definitions import UnitDefinition
-from typing import Union, List, Tuple, Optional
+from pint.definitions import AliasDefinition, Definition, DimensionDefinition, PrefixDefinition, UnitDefinition
+from pint.parser import DefinitionFiles
+from pint.util import ParserHelper, to_units_container
+from typing import Callable, Dict, FrozenSet, Hashable, Iterable, Iterator, Set, Union, List, Tuple, Optional
 import num_parse.word_to_num_values as word_to_num_values
-from num_parse.RangeValue import RangeValue
+from num_parse.RangeValue import RangeValue, MARGIN
+from num_parse.unit_definitions.profiles import DEFAULT_UNITS_PATH, load_profile
+from num_parse.unit_definitions.compiled import CompiledUnits, load_compiled
 from functools import reduce
+from datetime import timedelta
+from decimal import Decimal
 from io import BytesIO
 import re
 import tokenize
 import numpy as np
 
-MARGIN = 0.0001
-
 def tokenizer(input_string):
     for tokinfo in tokenize.tokenize(BytesIO(input_string.encode("utf-8")).readline):
         if tokinfo.type != tokenize.ENCODING:
@@ -67,8 +71,389 @@ def tokenizer(input_string):
 # Injecting the above tokenizer into pint :)
 pint.util.tokenizer = tokenizer
 
+# The longest run of text NumParser.find_nums scans at once when a document has very long lines
+MAX_SEGMENT_LENGTH = 1 << 16
+
+# The common magnitude suffixes of shorthand numbers (e.g. "4.5k", "2.1bn", "12MM"), for parsers of data that uses them.
+# NumParser reads no suffixes unless it is given a table, since several of them also name units ("k" is the Boltzmann
+# constant, "M" a meter or molar, "MM" a megameter, "B" a byte and "T" a tesla), which is how they are read otherwise.
+MAGNITUDE_SUFFIXES = {
+    'k': 10**3, 'K': 10**3,
+    'M': 10**6, 'MM': 10**6, 'mn': 10**6,
+    'B': 10**9, 'bn': 10**9,
+    'T': 10**12, 'tn': 10**12,
+}
+
+# The currency symbols that may precede shorthand numbers (e.g. "$3M"), and the units they denote
+CURRENCY_SYMBOLS = {'$': 'dollar'}
+
+# Function words that also name units ("at" is a technical atmosphere, "am" an attometer, "a" an ampere, ...), which
+# find_nums does not read as the unit of a number on their own, e.g. in "20 at the station" or "10:30 am". "in" is left
+# out, since after a number it is much more often an inch (e.g. "12 in pipe") and parse_num reads it as one too
+UNIT_STOP_WORDS = frozenset(['a', 'an', 'am', 'at', 'as', 'me', 'he', 'us', 'up', 'are', 'has'])
+
+_UNIT_WORD = re.compile(r'[^\W\d]\w*')
+
+def unit_words(text: str) -> Set[str]:
+    """
+    :return: The lowercase words of a unit expression (e.g. {"kilometer", "hour"} for "kilometer / hour").
+    """
+
+    return {word.lower() for word in _UNIT_WORD.findall(text)}
+
+class UnitCache(dict):
+    """
+    A cache of the registry that can find the keys mentioning given unit words without scanning every entry. The words
+    of the keys are only indexed the first time they are looked up, and kept up to date from then on, so caches that
+    are never looked up cost nothing extra.
+    """
+
+    def __init__(self,
+                 entries: Dict,
+                 words_of: Callable[[Hashable], Iterable[str]]):
+        """
+        :param entries: The entries of the cache.
+        :param words_of: Gives the unit words a key mentions.
+        """
+
+        super().__init__(entries)
+        self.words_of = words_of
+        #: Map each unit word to the keys that mention it, or None until the first lookup
+        self.index: Optional[Dict[str, Set]] = None
+
+    def __reduce__(self):
+        # Pickled (e.g. into the compiled unit definitions) as a plain dict, which the registry wraps again on loading
+        return dict, (dict(self),)
+
+    def __setitem__(self, key, value):
+        if self.index is not None and key not in self:
+            for word in self.words_of(key):
+                self.index.setdefault(word, set()).add(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        if self.index is not None:
+            for word in self.words_of(key):
+                self.index[word].discard(key)
+
+    def words(self) -> Dict[str, Set]:
+        """
+        :return: The index of the keys by the unit words they mention, built if it has not been yet.
+        """
+
+        if self.index is None:
+            self.index = {}
+            for key in self:
+                for word in self.words_of(key):
+                    self.index.setdefault(word, set()).add(key)
+        return self.index
+
+    def keys_mentioning(self, words: Iterable[str]) -> Set:
+        """
+        :param words: The unit words.
+        :return: The keys that mention any of the words.
+        """
+
+        index = self.words()
+        return set().union(*(index.get(word, ()) for word in words))
+
 class NumUnitRegistry(UnitRegistry):
 
+    def __init__(self, *args, **kwargs):
+        #: Map (source units, destination units) to the (factor, offset) of the conversion between them
+        self._conversion_cache = UnitCache({}, NumUnitRegistry._unit_names)
+        #: Names of the prefixed units added to the registry on the fly by get_name
+        self._prefixed_units = set()
+        #: Map the length of each prefix spelling to the spellings of that length (including the empty prefix)
+        self._prefix_table = {}
+        #: Map every unit name, symbol and alias (and its plural) to the name of the unit
+        self._unit_index = {}
+        #: Map each dimensionality to the names, symbols and aliases of the units that have it
+        self._dimension_index = {}
+        #: Collects the (key, definition) pairs defined while register_definitions runs
+        self._defined_keys = None
+        super().__init__(*args, **kwargs)
+
+    def load_definitions(self, file, is_resource: bool = False):
+        """
+        Adds the units and prefixes from a definitions file to the registry.
+        Besides what pint accepts, the file can also be already parsed definitions (e.g. a trimmed unit profile)
+        or compiled unit definitions.
+        :param file: A filename, a line iterable, a DefinitionFiles object or a CompiledUnits object.
+        :param is_resource: Whether the file should be loaded from the pint package.
+        :return: The parsed definition files (or the compiled unit definitions).
+        """
+
+        if isinstance(file, CompiledUnits):
+            self.load_definitions(file.definitions)
+            return file
+
+        if not isinstance(file, DefinitionFiles):
+            return super().load_definitions(file, is_resource)
+
+        loaders = {
+            AliasDefinition: self._define,
+            UnitDefinition: self._define,
+            DimensionDefinition: self._define,
+            PrefixDefinition: self._define,
+        }
+        for loaderfunc, definition_class in self._directives.values():
+            loaders[definition_class] = loaderfunc
+        for lineno, definition in file.iter_definitions():
+            loaders[definition.__class__](definition)
+        return file
+
+    def _build_cache(self, loaded_files=None) -> None:
+        if isinstance(loaded_files, CompiledUnits):
+            self._cache = self._caches[()] = loaded_files.cache
+            self._wrap_caches()
+            for name, definition in loaded_files.prefixed_units.items():
+                self._units[name] = definition
+                self._prefixed_units.add(name)
+            self._prefix_table = loaded_files.prefix_table
+            self._unit_index = loaded_files.unit_index
+            self._dimension_index = loaded_files.dimension_index
+            return
+
+        super()._build_cache(loaded_files)
+        self._wrap_caches()
+        self._prefix_table = {}
+        for key in self._prefixes:
+            self._prefix_table.setdefault(len(key), set()).add(key)
+        self._unit_index = {}
+        dimension_index = {}
+        for key, definition in self._units.items():
+            self._index_unit_key(key, definition)
+            try:
+                dimensionality = self._get_dimensionality(self.UnitsContainer({definition.name: 1}))
+            except Exception:
+                continue
+            dimension_index.setdefault(dimensionality, set()).add(key)
+        self._dimension_index = {dimensionality: frozenset(keys) for dimensionality, keys in dimension_index.items()}
+
+    def _wrap_caches(self) -> None:
+        # Lets register_definitions find the entries that mention the spellings it defines
+        self._cache.parse_unit = UnitCache(self._cache.parse_unit, unit_words)
+        self._cache.root_units = UnitCache(self._cache.root_units, NumUnitRegistry._unit_names)
+        self._cache.dimensionality = UnitCache(self._cache.dimensionality, NumUnitRegistry._unit_names)
+
+    def _index_unit_key(self, key: str, definition: UnitDefinition) -> None:
+        if key:
+            self._unit_index.setdefault(key, definition.name)
+            if len(key) > 1:
+                self._unit_index.setdefault(key + 's', definition.name)
+
+    def _define_single_adder(self, key, value, unit_dict, casei_unit_dict):
+        super()._define_single_adder(key, value, unit_dict, casei_unit_dict)
+        # Keep the lookup tables up to date with units and prefixes defined after construction
+        if self._initialized:
+            if unit_dict is self._prefixes:
+                self._prefix_table.setdefault(len(key), set()).add(key)
+            elif unit_dict is self._units:
+                self._index_unit_key(key, value)
+            if self._defined_keys is not None:
+                self._defined_keys.append((key, value))
+
+    def register_definitions(self,
+                             definitions: Union[str, Iterable[Union[str, Definition]]]) -> List[str]:
+        """
+        Defines new units, prefixes, dimensions and aliases after construction, updating the lookup tables and
+        caches for just the new definitions (rather than rebuilding them).
+        :param definitions: Definition lines (e.g. "serving = [serving]"), either as a single multi-line string or
+                            an iterable of lines and/or pint Definition objects.
+        :return: The unit names, symbols and aliases that were defined.
+        """
+
+        if isinstance(definitions, str):
+            definitions = definitions.splitlines()
+
+        self._defined_keys = []
+        try:
+            for definition in definitions:
+                if isinstance(definition, str):
+                    definition = definition.strip()
+                    if not definition or definition.startswith('#'):
+                        continue
+                    if definition.startswith('@alias'):
+                        definition = AliasDefinition.from_string(definition, self.non_int_type)
+                    else:
+                        definition = Definition.from_string(definition, self.non_int_type)
+                if isinstance(definition, AliasDefinition):
+                    # Aliases do not go through _define_single_adder
+                    self._define_alias(definition)
+                    unit = self._units[self.get_name(definition.name)]
+                    for alias in definition.aliases:
+                        self._index_unit_key(alias, unit)
+                        self._defined_keys.append((alias, unit))
+                else:
+                    self._define(definition)
+            defined = self._defined_keys
+        finally:
+            self._defined_keys = None
+
+        unit_keys = [key for key, value in defined if isinstance(value, UnitDefinition)]
+        changed = {key for key, value in defined}
+
+        # Cached unit parses mentioning a new spelling (with any prefix and plural) may now resolve differently (e.g.
+        # when a new unit shadows a prefixed one), as may those of words starting with a new prefix, so drop them.
+        # Only those entries are looked up, rather than every entry of the caches.
+        parse_cache = self._cache.parse_unit
+        spellings = {(prefix + key + plural).lower() for key in changed for prefix in set(self._prefixes) | {''}
+                     for plural in ('', 's')}
+        new_prefixes = tuple(key.lower() for key, value in defined if isinstance(value, PrefixDefinition) and key)
+        if new_prefixes:
+            spellings.update(word for word in parse_cache.words() if word.startswith(new_prefixes))
+        for text in parse_cache.keys_mentioning(spellings):
+            del parse_cache[text]
+        # The same goes for cached conversions, root units and dimensionalities of redefined units
+        for cache in (self._conversion_cache, self._cache.root_units, self._cache.dimensionality):
+            for units in cache.keys_mentioning(changed):
+                del cache[units]
+
+        # Add the new units to the dimensionality caches the same way _build_cache does
+        names = {value.name for key, value in defined if isinstance(value, UnitDefinition)}
+        for name in names:
+            uc = ParserHelper.from_word(name, self.non_int_type)
+            dimensionality = self._get_dimensionality(uc)
+            self._get_root_units(uc)
+            self._cache.dimensional_equivalents.setdefault(dimensionality, set()).add(name)
+
+        # Move every new key to the set of its dimensionality (it may have had another one if it was redefined)
+        new_keys = {}
+        for key, value in defined:
+            if isinstance(value, UnitDefinition):
+                dimensionality = self._get_dimensionality(self.UnitsContainer({value.name: 1}))
+                new_keys.setdefault(dimensionality, set()).add(key)
+        all_new_keys = set(unit_keys)
+        for dimensionality, keys in list(self._dimension_index.items()):
+            if not keys.isdisjoint(all_new_keys):
+                self._dimension_index[dimensionality] = keys - all_new_keys
+        for dimensionality, keys in new_keys.items():
+            self._dimension_index[dimensionality] = self._dimension_index.get(dimensionality, frozenset()) | keys
+
+        # Like the units loaded at construction, units that are not in a group belong to the default group
+        if names and 'group' in self._defaults:
+            self.get_group(self._defaults['group']).add_units(*names)
+        return unit_keys
+
+    def has_unit_name(self,
+                      name: str,
+                      case_sensitive: Optional[bool] = None,
+                      units: Optional[FrozenSet[str]] = None) -> bool:
+        """
+        Checks whether a string names a unit, possibly with a prefix and/or a plural "s".
+        Equivalent to bool(self.parse_unit_name(name, case_sensitive)), but only tries the prefixes the name can
+        actually start with rather than every prefix.
+        :param name: The string to check.
+        :param case_sensitive: Whether the unit lookup should be case sensitive. Defaults to the registry's setting.
+        :param units: Optionally only accept these units (names, symbols and aliases), e.g. get_units_for_dimension(...).
+        :return: True if the string names a unit.
+        """
+
+        if units is None:
+            if name in self._unit_index:
+                return True
+            units = self._units
+
+        case_sensitive = self.case_sensitive if case_sensitive is None else case_sensitive
+        for length, prefixes in self._prefix_table.items():
+            if name[:length] not in prefixes:
+                continue
+            unit_name = name[length:]
+            candidates = (unit_name, unit_name[:-1]) if name.endswith('s') else (unit_name,)
+            for idx, candidate in enumerate(candidates):
+                if idx and len(candidate) == 1:
+                    continue
+                if case_sensitive:
+                    if candidate in units:
+                        return True
+                elif any(key in units for key in self._units_casei.get(candidate.lower(), ())):
+                    return True
+        return False
+
+    def get_units_for_dimension(self, dimension) -> FrozenSet[str]:
+        """
+        Looks up the units that have a given dimensionality in the dimensionality index.
+        :param dimension: A dimensionality, e.g. "[time]" or "[length] / [time]".
+        :return: The names, symbols and aliases of the units with that dimensionality.
+        """
+
+        if isinstance(dimension, str):
+            dimension = self.get_dimensionality(dimension)
+        return self._dimension_index.get(to_units_container(dimension, self), frozenset())
+
+    def get_time_units(self) -> Iterator[str]:
+        """
+        Finds the units (names, symbols and aliases) in the registry that measure time.
+        :return: An iterator over the time units, in alphabetical order.
+        """
+
+        return iter(sorted(self.get_units_for_dimension('[time]')))
+
+    @staticmethod
+    def _unit_names(units) -> Iterator[str]:
+        # Cache keys are either UnitsContainers or pairs of them
+        if isinstance(units, tuple):
+            for item in units:
+                yield from item
+        else:
+            yield from units
+
+    def is_affine(self, units) -> bool:
+        """
+        Checks whether every unit in a UnitsContainer converts linearly (with at most an offset) to its reference.
+        :param units: The UnitsContainer to check.
+        :return: False if any of the units is logarithmic (e.g. decibel), True otherwise.
+        """
+
+        return not any(self._units[self.get_name(name)].is_logarithmic for name in units)
+
+    def get_conversion(self, src, dst) -> Tuple[float, float]:
+        """
+        Resolves the conversion between two units into an affine factor and offset, caching the result.
+        :param src: The source units (str, Unit or UnitsContainer).
+        :param dst: The destination units (str, Unit or UnitsContainer).
+        :return: The factor and offset such that converted = value * factor + offset.
+        """
+
+        src = to_units_container(src, self)
+        dst = to_units_container(dst, self)
+        try:
+            return self._conversion_cache[src, dst]
+        except KeyError:
+            pass
+
+        if not (self.is_affine(src) and self.is_affine(dst)):
+            raise ValueError("Conversions involving logarithmic units cannot be expressed as a factor and offset!")
+
+        # Every unit in the definitions is affine in its reference, so two points determine the conversion.
+        # Incompatible units raise a DimensionalityError here.
+        offset = self.convert(0.0, src, dst)
+        factor = self.convert(1.0, src, dst) - offset
+        self._conversion_cache[src, dst] = factor, offset
+        return factor, offset
+
+    def convert_array(self, values, src, dst) -> np.ndarray:
+        """
+        Converts many magnitudes from one unit to another in a single vectorized step.
+        :param values: A sequence or NumPy array of magnitudes in the source units.
+        :param src: The source units.
+        :param dst: The destination units.
+        :return: A NumPy array of the magnitudes in the destination units.
+        """
+
+        src = to_units_container(src, self)
+        dst = to_units_container(dst, self)
+        if not (self.is_affine(src) and self.is_affine(dst)):
+            return self.convert(np.asarray(values, dtype=float), src, dst)
+
+        factor, offset = self.get_conversion(src, dst)
+        converted = np.asarray(values, dtype=float) * factor
+        if offset:
+            converted += offset
+        return converted
+
     def get_name(
         self, name_or_alias: str, case_sensitive: Optional[bool] = None
     ) -> str:
@@ -102,6 +487,7 @@ class NumUnitRegistry(UnitRegistry):
                 prefix_def.converter,
                 self.UnitsContainer({unit_name: 1}),
             )
+            self._prefixed_units.add(name)
             return prefix + unit_name
 
         return unit_name
@@ -114,7 +500,22 @@ def eq(lhs, rhs, check_all: bool, error_margin: float = 0.0):
     return out
 
 class NumParser(object):
-    def __init__(self):
+    def __init__(self,
+                 units_profile: Optional[Union[str, Iterable[str]]] = None,
+                 magnitude_suffixes: Optional[Dict[str, int]] = None,
+                 currency_symbols: Optional[Dict[str, str]] = None):
+        """
+        :param units_profile: Optionally restricts the units the parser knows about, which makes constructing the
+                              parser and searching for unit words cheaper. Either the name of a profile in
+                              unit_definitions.profiles.UNIT_PROFILES (e.g. "basic") or an iterable of dimension names
+                              (e.g. "length", "currency") and/or unit group names (e.g. "USCSLiquidVolume").
+                              Defaults to every unit in the unit definitions.
+        :param magnitude_suffixes: The suffixes of shorthand numbers (e.g. {"k": 1000} for "4.5k") and the values they
+                                   multiply by, e.g. MAGNITUDE_SUFFIXES. Defaults to none. See set_shorthand.
+        :param currency_symbols: The currency symbols that may precede shorthand numbers and the units they denote.
+                                 Defaults to the symbols of CURRENCY_SYMBOLS whose units the parser knows about.
+        """
+
         self.number_words = word_to_num_values.word_to_num_values
         self.decimal_words = word_to_num_values.decimal_words
         self.measures = word_to_num_values.measures
@@ -125,11 +526,24 @@ class NumParser(object):
         numeric_capturing_pattern = r'(-?[\w\. ]+)'
         self.range_expressions = [pattern.format(numeric_capturing_pattern) for pattern in [r'between {0} (and) {0}', r'from {0} (until) {0}', r'{0} (or) {0}', r'{0} (to) {0}', r'{0} (through) {0}', r'{0} ([-–]) {0}']]
         self.multipliers = ['thousand', 'million', 'billion', 'trillion']
-        units_path = Path(__file__).parent / 'unit_definitions/basic_units.txt'
-        self.ureg = NumUnitRegistry(str(units_path), autoconvert_offset_to_baseunit=True)
+        self.unit_stop_words = UNIT_STOP_WORDS
+        self.scan_expression = re.compile(r'\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?::\d+(?:\.\d+)?){1,2}|\d+(?:\.\d+)?|\.\d+|[^\W\d_]+|[^\w\s]')
+        self.clock_expression = re.compile(r'^(\d+)\s*:\s*(\d+(?:\.\d+)?)(?:\s*:\s*(\d+(?:\.\d+)?))?\s*([^\W\d_]+)?$')
+        # Words that make parse_num accept an input on their own (float() also accepts "nan" and "inf")
+        self.number_word_expression = re.compile(r'\d|\b(?:{})\b'.format('|'.join(map(re.escape, sorted(
+            set(self.number_words) | set(self.relevant_words) | {'nan', 'inf', 'infinity'}, key=len, reverse=True)))), re.IGNORECASE)
+        self.range_word_expression = re.compile(r'\b(?:{})\b'.format('|'.join(self.range_denoters)), re.IGNORECASE)
+        self.ureg = NumUnitRegistry(self.load_unit_definitions(units_profile), autoconvert_offset_to_baseunit=True)
 
         class Quantity(self.ureg.Quantity):
 
+            MARGIN = MARGIN
+
+            @property
+            def unitless(self):
+                # Same as pint's, but reads the root units from the registry cache instead of converting the magnitude
+                return not bool(self._REGISTRY._get_root_units(self._units)[1])
+
             def __eq__(self, other):
                 def bool_result(value):
                     nonlocal other
@@ -184,23 +598,170 @@ class NumParser(object):
                     return bool_result(False)
 
         self.Quantity = Quantity
-        self.time_units = list(self.get_time_units())
+        self.time_units = self.ureg.get_units_for_dimension('[time]')
+        self.set_shorthand(magnitude_suffixes, currency_symbols)
+        self.instrumentation = None
 
     def get_time_units(self):
-        def is_time_unit(unit_name):
-            try:
-                unit = self.Quantity._REGISTRY[unit_name]
-            except AttributeError as e:
-                return None
-            if unit.dimensionality._d == {'[time]': 1}:
-                return True
-        return filter(is_time_unit, self.Quantity._REGISTRY)
+        return self.ureg.get_time_units()
+
+    def load_unit_definitions(self,
+                              units_profile: Optional[Union[str, Iterable[str]]] = None):
+        """
+        Loads the unit definitions to build the registry of the parser from.
+        :param units_profile: The units profile (see __init__).
+        :return: The compiled unit definitions (of the profile), unless they are out of date with the text files,
+                 otherwise the (trimmed) definitions or the path of the definitions file.
+        """
+
+        compiled = load_compiled(profile=units_profile)
+        return compiled or load_profile(units_profile) or str(DEFAULT_UNITS_PATH)
+
+    def set_instrumentation(self,
+                            instrumentation) -> None:
+        """
+        Attaches instrumentation that times the stages of parse_num (see num_parse.instrumentation), replacing any
+        attached before. Parsers without instrumentation are not slowed down at all.
+        :param instrumentation: An instrumentation.Instrumentation, or None to remove the current one.
+        """
+
+        if self.instrumentation is not None:
+            self.instrumentation.detach(self)
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            instrumentation.attach(self)
+
+    def set_shorthand(self,
+                      magnitude_suffixes: Optional[Dict[str, int]] = None,
+                      currency_symbols: Optional[Dict[str, str]] = None) -> None:
+        """
+        Sets the suffixes and currency symbols of the shorthand numbers (e.g. "4.5k", "$3M", "2.1bn", "12MM") that
+        parse_num reads with precompiled expressions before tokenizing the input, both on their own and as words of longer
+        inputs (e.g. "5k to 10k" or "3k miles"). A suffix of the table is always
+        read as a magnitude, even where it also names a unit (e.g. "5k" is 5000 rather than 5 Boltzmann constants), so
+        the table decides between the two per data source.
+        :param magnitude_suffixes: The suffixes and the values they multiply by, which must directly follow the number,
+                                   e.g. MAGNITUDE_SUFFIXES. Defaults to none, so that suffixes keep being read as the
+                                   units they may name (e.g. "10M" as 10 meter).
+        :param currency_symbols: The currency symbols that may precede the number and the units they denote. Defaults
+                                 to the symbols of CURRENCY_SYMBOLS whose units the parser knows about.
+        """
+
+        if magnitude_suffixes is None:
+            magnitude_suffixes = {}
+        if currency_symbols is None:
+            currency_symbols = {symbol: unit for symbol, unit in CURRENCY_SYMBOLS.items() if self.ureg.has_unit_name(unit)}
+        for symbol, unit in currency_symbols.items():
+            if not self.ureg.has_unit_name(unit):
+                raise ValueError("The unit of the currency symbol {} is not defined: {}".format(symbol, unit))
+
+        self.magnitude_suffixes = dict(magnitude_suffixes)
+        self.currency_symbols = dict(currency_symbols)
+        if not self.magnitude_suffixes and not self.currency_symbols:
+            self.shorthand_expression = None
+            self.shorthand_token_expression = None
+            return
+
+        def alternatives(keys):
+            # Longest first, so that e.g. "MM" is not read as "M" followed by junk
+            return '|'.join(map(re.escape, sorted(keys, key=len, reverse=True))) or '(?!)'
+
+        self.shorthand_expression = re.compile(
+            r'^(?P<sign>[-+]?)(?:(?P<currency>{})\s*(?P<currency_sign>[-+]?))?'
+            r'(?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?)(?P<suffix>{})?$'.format(
+                alternatives(self.currency_symbols), alternatives(self.magnitude_suffixes)))
+        # The same numbers as words of a longer input (e.g. the bounds of "$3M - $5M" or the number of "3k miles")
+        self.shorthand_token_expression = re.compile(
+            r'(?<![\w.$])(?:(?P<currency>{})\s*)?'
+            r'(?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?)(?P<suffix>{})?(?![\w.])'.format(
+                alternatives(self.currency_symbols), alternatives(self.magnitude_suffixes)))
+
+    def shorthand_value(self,
+                        number: str,
+                        suffix: Optional[str]) -> Union[int, float]:
+        """
+        :param number: The digits of a shorthand number (e.g. "4.5").
+        :param suffix: Its magnitude suffix (e.g. "k"), if it has one.
+        :return: The value of the number, an integer if the digits are.
+        """
+
+        is_int = number.isdigit()
+        if suffix:
+            # Multiply decimals exactly, the way "4.1 thousand" is composed, rather than as floats (4.1 * 1000 is
+            # 4099.999999999999)
+            multiplier = self.magnitude_suffixes[suffix]
+            return int(number) * multiplier if is_int else float(Decimal(number) * multiplier)
+        return int(number) if is_int else float(number)
+
+    def expand_shorthand(self,
+                         normalized_input: str,
+                         units: Optional[FrozenSet[str]] = None) -> str:
+        """
+        Writes out the shorthand numbers among the words of an input (e.g. "$3M - $5M" as "3000000 dollar - 5000000
+        dollar" and "3k miles" as "3000 miles"), so that ranges and unit words around them are read as usual.
+        :param normalized_input: The normalized input string.
+        :param units: Optionally only expand numbers with currency symbols of these units.
+        :return: The input with its shorthand numbers written out.
+        """
+
+        if self.shorthand_token_expression is None:
+            return normalized_input
+
+        def expand(match):
+            currency, number, suffix = match.group('currency', 'number', 'suffix')
+            unit_string = self.currency_symbols[currency] if currency else None
+            if not (currency or suffix) or (unit_string and units is not None and unit_string not in units):
+                return match.group(0)
+            value = repr(self.shorthand_value(number, suffix))
+            return '{} {}'.format(value, unit_string) if unit_string else value
+
+        return self.shorthand_token_expression.sub(expand, normalized_input)
+
+    def match_shorthand(self,
+                        normalized_input: str,
+                        units: Optional[FrozenSet[str]] = None) -> Optional[RangeValue]:
+        """
+        Reads a shorthand number (e.g. "4.5k", "$3M", "-2.1bn", "1.2e6"), see set_shorthand.
+        :param normalized_input: The normalized input string.
+        :param units: Optionally only accept currency symbols of these units.
+        :return: The value of the number, or None if the input is not a shorthand number.
+        """
+
+        if self.shorthand_expression is None:
+            return None
+        match = self.shorthand_expression.match(normalized_input)
+        if match is None:
+            return None
+        currency, number, suffix = match.group('currency', 'number', 'suffix')
+        unit_string = self.currency_symbols[currency] if currency else None
+        if unit_string and units is not None and unit_string not in units:
+            return None
+
+        value = self.shorthand_value(number, suffix)
+        if (match.group('sign') == '-') != (match.group('currency_sign') == '-'):
+            value = -value
+        return self.make_value(value, unit_string=unit_string)
+
+    def register_units(self,
+                       definitions: Union[str, Iterable[str]]) -> None:
+        """
+        Adds custom units (e.g. "serving = [serving] = servings") to the parser after construction.
+        Only the new definitions are indexed, so this is much cheaper than constructing a new parser.
+        :param definitions: Definition lines in the format of the unit definition files, either as a single
+                            multi-line string or an iterable of lines.
+        """
+
+        self.ureg.register_definitions(definitions)
+        self.time_units = self.ureg.get_units_for_dimension('[time]')
 
     def parse_num(self,
-                  number_string: str) -> RangeValue:
+                  number_string: str,
+                  expect: Optional[str] = None) -> RangeValue:
         """
         Parses a given string containing a numeric value into the raw numeric value.
         :param number_string: A string containing a number.
+        :param expect: Optionally only detect units of this dimensionality (e.g. "[time]" or "[length] / [time]").
+                       Words naming units of any other dimensionality are not treated as units.
         :return: The raw numeric value in the given string.
         """
 
@@ -208,7 +769,7 @@ class NumParser(object):
         # Check cases where input is just a number value
         #######################################################
         if type(number_string) in [int, float]:
-            return RangeValue(self.Quantity(number_string))
+            return self.make_value(number_string)
 
         #######################################################
         # Clean input string
@@ -219,14 +780,33 @@ class NumParser(object):
         # Check cases where input is a raw number in a string
         #######################################################
         if self.is_int(normalized_input) or self.is_float(normalized_input):
-            return RangeValue(self.Quantity(normalized_input))
+            return self.make_value(normalized_input)
+
+        units = self.ureg.get_units_for_dimension(expect) if expect else None
+
+        #######################################################
+        # Check cases where input is a shorthand number (e.g. "4.5k", "$3M" or "2.1bn")
+        #######################################################
+        shorthand = self.match_shorthand(normalized_input, units)
+        if shorthand is not None:
+            return shorthand
+
+        normalized_input = self.expand_shorthand(normalized_input, units)
+        time_units = self.time_units if units is None else self.time_units & units
+
+        #######################################################
+        # Check cases where input is a clock-style duration (e.g. "3:58" or "1:02:03")
+        #######################################################
+        if time_units:
+            components = self.get_clock_components(normalized_input)
+            if components:
+                return self.sum_durations(components)
 
         #######################################################
         # Split input into potentially relevant words
         #######################################################
         # clean_words = [self.clean_word(word) for word in normalized_input.split()]
-        clean_words = [self.clean_word(tok.string) for tok in tokenizer(normalized_input) if tok.line and tok.type != tokenize.ERRORTOKEN]
-        clean_words = [item if item != '/' else 'per' for item in clean_words]
+        clean_words = self.split_words(normalized_input)
 
         if len(clean_words) == 0:
             raise ValueError("No relevant words/numbers in the given string!")
@@ -234,40 +814,69 @@ class NumParser(object):
         #######################################################
         # Check for unit words
         #######################################################
-        unit_span, unit_string = self.has_unit_word(clean_words, True)
+        unit_span, unit_string = self.has_unit_word(clean_words, True, units)
         if not unit_string:
-            unit_span, unit_string = self.has_unit_word(clean_words, False)
+            unit_span, unit_string = self.has_unit_word(clean_words, False, units)
 
         range_denoter, min_number_words, max_number_words = self.get_number_range(' '.join(clean_words))
         if range_denoter:
-            min_val = self.parse_num(' '.join(min_number_words)).min_val if len(min_number_words) else ''
-            max_val = self.parse_num(' '.join(max_number_words)).max_val if len(max_number_words) else ''
+            min_val = self.parse_num(' '.join(min_number_words), expect).min_val if len(min_number_words) else ''
+            max_val = self.parse_num(' '.join(max_number_words), expect).max_val if len(max_number_words) else ''
             if max_val.m > 1000 * min_val.m and max_number_words[-1] in self.multipliers and min_number_words[-1] not in self.multipliers:
                 # distribute multiplier from max val
-                min_val = self.parse_num(' '.join(min_number_words + [max_number_words[-1]])).min_val
-            q1 = self.Quantity(min_val.m, unit_string) if min_val.unitless else min_val
-            q2 = self.Quantity(max_val.m, unit_string) if max_val.unitless else max_val
-            final_num = RangeValue(q1, q2)
+                min_val = self.parse_num(' '.join(min_number_words + [max_number_words[-1]]), expect).min_val
+            final_num = self.make_value(min_val, max_val, unit_string)
             return final_num
 
-        if len(clean_words) == 3 and clean_words[1] == ':':
-            unit_string = ':'
-            clean_words = clean_words[:1] + ['minutes'] + clean_words[2:] + ['seconds']
+        if len(clean_words) == 3 and clean_words[1] == ':' and time_units:
+            # Clock-style durations the clock expression does not read (e.g. "3.5:20" or "five:20") are minutes and seconds
+            return self.sum_duration_components([([clean_words[0]], 'minutes'), ([clean_words[2]], 'seconds')], expect)
+
         if unit_string:
-            if not range_denoter and sum(map(lambda word: 1 if word in self.time_units or word.rstrip('s') in self.time_units else 0, clean_words)) > 1:
-                quantities = []
-                idx = 0
-                while idx < len(clean_words):
-                    if clean_words[idx] in self.time_units or clean_words[idx].rstrip('s') in self.time_units:
-                        unit_string = clean_words[idx]
-                        quantities.append(self.parse_num(' '.join(clean_words[:idx+1])))
-                        clean_words = clean_words[idx+1:]
-                        idx = 0
-                    else:
-                        idx += 1
-                return sum(quantities, start=RangeValue(self.Quantity(0, unit_string)))
-            else:
-                clean_words = clean_words[:unit_span[0]] + clean_words[unit_span[1]:]
+            components = self.get_duration_components(clean_words, time_units)
+            if components:
+                return self.sum_duration_components(components, expect)
+            clean_words = clean_words[:unit_span[0]] + clean_words[unit_span[1]:]
+
+        return self.make_value(self.compose_number(clean_words), unit_string=unit_string)
+
+    def make_value(self,
+                   min_val: Union[int, float, str, pint.Quantity],
+                   max_val: Optional[pint.Quantity] = None,
+                   unit_string: Optional[str] = None) -> RangeValue:
+        """
+        Builds the value parse_num returns.
+        :param min_val: The minimum (or only) value, either a magnitude (or a string of one) or a Quantity.
+        :param max_val: The maximum value of a range, as a Quantity.
+        :param unit_string: The unit of a magnitude, which unitless Quantities of a range also take.
+        :return: The RangeValue.
+        """
+
+        if max_val is None:
+            return RangeValue(self.Quantity(min_val, unit_string))
+        q1 = self.Quantity(min_val.m, unit_string) if min_val.unitless else min_val
+        q2 = self.Quantity(max_val.m, unit_string) if max_val.unitless else max_val
+        return RangeValue(q1, q2)
+
+    def split_words(self,
+                    normalized_input: str) -> List[str]:
+        """
+        Splits a normalized input into its cleaned words (with "/" read as "per").
+        :param normalized_input: The normalized input string.
+        :return: The cleaned words.
+        """
+
+        clean_words = [self.clean_word(tok.string) for tok in tokenizer(normalized_input) if tok.line and tok.type != tokenize.ERRORTOKEN]
+        return [item if item != '/' else 'per' for item in clean_words]
+
+    def compose_number(self,
+                       clean_words: List[str]) -> Union[int, float]:
+        """
+        Composes the number denoted by a list of words (with any unit words already removed).
+        :param clean_words: The cleaned words of the number, e.g. ["two", "hundred", "and", "five"].
+        :return: The value of the number.
+        """
+
         final_words = [word for word in clean_words if self.is_relevant_word(word)]
 
         #######################################################
@@ -320,7 +929,353 @@ class NumParser(object):
         if isNegative:
             final_num = -final_num
 
-        return RangeValue(self.Quantity(final_num,  unit_string))
+        return final_num
+
+    def get_clock_components(self,
+                             text: str) -> Optional[List[Tuple[Union[int, float], str]]]:
+        """
+        Splits a clock-style duration into its components.
+        Two fields are read as minutes and seconds ("3:58"), unless followed by an hour unit ("1:30 h"), and three fields
+        are read as hours, minutes and seconds ("1:02:03").
+        :param text: The normalized input string.
+        :return: The (value, unit) pairs of the duration, or None if the text is not a clock-style duration.
+        """
+
+        match = self.clock_expression.match(text)
+        if not match:
+            return None
+
+        fields = [field for field in match.group(1, 2, 3) if field is not None]
+        if not all(field.isdigit() for field in fields[:-1]):
+            return None
+        units = ['hour', 'minute', 'second']
+        if match.group(4):
+            try:
+                unit = self.ureg.get_name(match.group(4))
+            except UndefinedUnitError:
+                return None
+            if unit not in units[:len(units) - len(fields) + 1]:
+                return None
+            units = units[units.index(unit):]
+        else:
+            units = units[-len(fields):]
+        return [(int(field) if field.isdigit() else float(field), unit) for field, unit in zip(fields, units)]
+
+    def get_duration_components(self,
+                                clean_words: List[str],
+                                time_units: FrozenSet[str]) -> Optional[List[Tuple[List[str], str]]]:
+        """
+        Splits a compound duration (e.g. "2 hours 30 minutes and 15 seconds") into its components in a single pass.
+        :param clean_words: The cleaned words of the input.
+        :param time_units: The time units to split on.
+        :return: The (number words, unit word) pairs of the duration, or None if there are fewer than two time unit words.
+        """
+
+        components = []
+        number_words = []
+        for word in clean_words:
+            if word in time_units or word.rstrip('s') in time_units:
+                components.append((number_words, word))
+                number_words = []
+            else:
+                number_words.append(word)
+        if len(components) < 2:
+            return None
+        return components
+
+    def is_plain_number(self,
+                        number_words: List[str]) -> bool:
+        """
+        Checks if a list of words only spells out a number, so it can be composed without looking for units or ranges.
+        :param number_words: The words to check.
+        :return: False if any of the words could also be read as a unit or is not a number word.
+        """
+
+        return all((word in self.number_words or word == 'and' or self.is_int(word) or self.is_float(word)) and
+                   not self.ureg.has_unit_name(word, False) for word in number_words)
+
+    def sum_durations(self,
+                      components: List[Tuple[Union[int, float], str]]) -> RangeValue:
+        """
+        Adds up the components of a duration in the units of its last component.
+        :param components: The (value, unit) pairs of the duration.
+        :return: The total duration.
+        """
+
+        target = components[-1][1]
+        target_units = to_units_container(target, self.ureg)
+        total = 0
+        for value, unit in components:
+            units = to_units_container(unit, self.ureg)
+            total += value if units == target_units else self.ureg.convert(value, units, target_units)
+        return RangeValue(self.Quantity(total, target))
+
+    def sum_duration_components(self,
+                                components: List[Tuple[List[str], str]],
+                                expect: Optional[str] = None) -> RangeValue:
+        """
+        Adds up the components of a compound duration in the units of its last component.
+        :param components: The (number words, unit word) pairs of the duration.
+        :param expect: The dimensionality to detect units of, if any.
+        :return: The total duration.
+        """
+
+        if all(self.is_plain_number(number_words) for number_words, _ in components):
+            return self.sum_durations([(self.compose_number(number_words), unit) for number_words, unit in components])
+
+        # Some component holds words other than plain numbers (e.g. "6 decades 4 years"), so parse each one fully
+        quantities = [self.parse_num(' '.join(number_words + [unit]), expect) for number_words, unit in components]
+        return sum(quantities, start=RangeValue(self.Quantity(0, components[-1][1])))
+
+    def duration_seconds(self,
+                         duration_string: str) -> float:
+        """
+        Parses a duration (e.g. "2 hours 30 minutes", "1:02:03" or "ninety minutes") straight into seconds.
+        :param duration_string: A string containing a duration.
+        :return: The total number of seconds.
+        """
+
+        normalized_input = self.normalize_input(duration_string)
+        components = self.get_clock_components(normalized_input)
+        if components is None:
+            chunks = self.get_duration_components(self.split_words(normalized_input), self.time_units)
+            if chunks and all(self.is_plain_number(number_words) for number_words, _ in chunks):
+                components = [(self.compose_number(number_words), unit) for number_words, unit in chunks]
+        if components is None:
+            value = self.parse_num(duration_string, expect='[time]')
+            if value.min_val.unitless:
+                raise ValueError("No duration found in the given string!")
+            if value.min_val.m != value.max_val.m:
+                raise ValueError("The given string contains a range of durations!")
+            components = [(value.min_val.m, value.min_val._units)]
+
+        return sum(self.ureg.convert(value, unit, 'second') for value, unit in components)
+
+    def parse_timedelta(self,
+                        duration_string: str) -> timedelta:
+        """
+        Parses a duration (e.g. "2 hours 30 minutes", "1:02:03" or "ninety minutes") into a timedelta.
+        :param duration_string: A string containing a duration.
+        :return: The duration as a datetime.timedelta.
+        """
+
+        return timedelta(seconds=self.duration_seconds(duration_string))
+
+    def may_contain_number(self,
+                           number_string: Union[str, int, float]) -> bool:
+        """
+        Cheaply checks whether parse_num could accept a string, e.g. to skip the many rows of a text corpus that hold
+        no quantity at all. There are no false negatives: whenever this returns False, parse_num raises.
+        :param number_string: The string to check.
+        :return: False if parse_num would raise on the string, True if it might not.
+        """
+
+        if type(number_string) in [int, float]:
+            return True
+        if self.number_word_expression.search(number_string):
+            return True
+        if not self.range_word_expression.search(number_string):
+            return False
+        return self.accepts_connectives(number_string)
+
+    def accepts_connectives(self,
+                            number_string: str) -> bool:
+        """
+        Checks whether parse_num accepts a string whose only relevant words are range and negative denoters, which it
+        reads as zero (e.g. "salt and pepper") unless they split a range whose sides it cannot parse (e.g. "go to bed").
+        Mirrors the steps of parse_num without looking up any units.
+        :param number_string: A string without digits or number words.
+        :return: Whether parse_num returns a value for the string.
+        """
+
+        try:
+            clean_words = self.split_words(self.normalize_input(number_string))
+        except (tokenize.TokenError, SyntaxError):
+            return False
+        if len(clean_words) == 0:
+            return False
+
+        range_denoter, min_number_words, max_number_words = self.get_number_range(' '.join(clean_words))
+        if range_denoter:
+            return len(min_number_words) > 0 and len(max_number_words) > 0 and \
+                   self.may_contain_number(' '.join(min_number_words)) and \
+                   self.may_contain_number(' '.join(max_number_words))
+
+        # Removing unit words never adds relevant words, so the unit search can be skipped
+        final_words = [word for word in clean_words if self.is_relevant_word(word)]
+        while final_words and final_words[0] in self.negative_denoters:
+            final_words.pop(0)
+        return len(final_words) > 0
+
+    def find_nums(self,
+                  text: Union[str, Iterable[str]]) -> Iterator[Tuple[int, int, RangeValue]]:
+        """
+        Finds every number, range and quantity in a document (e.g. "It weighs 5 kg and takes two to three hours").
+        The document is scanned once, a line at a time, and only the candidate spans are handed to parse_num.
+        Spans do not cross line breaks.
+        :param text: The document, either as a string or as an iterable of chunks (e.g. an open file), which is
+                     consumed lazily so memory use does not grow with the length of the document.
+        :return: A generator of the start offset, end offset and parsed value of every span, in document order.
+        """
+
+        offset = 0
+        for segment in self.iter_segments([text] if isinstance(text, str) else text):
+            yield from self.scan_segment(segment, offset)
+            offset += len(segment)
+
+    def iter_segments(self,
+                      chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Regroups a stream of text chunks into lines, splitting lines longer than MAX_SEGMENT_LENGTH at whitespace.
+        :param chunks: The chunks of text.
+        :return: A generator of consecutive segments that add up to the whole text.
+        """
+
+        buffer = ''
+        for chunk in chunks:
+            buffer += chunk
+            position = 0
+            while True:
+                end = buffer.find('\n', position, position + MAX_SEGMENT_LENGTH) + 1
+                if not end and len(buffer) - position > MAX_SEGMENT_LENGTH:
+                    # A very long line, so cut it after the last whitespace that leaves no word split in two
+                    end = max(buffer.rfind(' ', position, position + MAX_SEGMENT_LENGTH),
+                              buffer.rfind('\t', position, position + MAX_SEGMENT_LENGTH)) + 1 or position + MAX_SEGMENT_LENGTH
+                if not end:
+                    break
+                yield buffer[position:end]
+                position = end
+            buffer = buffer[position:]
+        if buffer:
+            yield buffer
+
+    def scan_segment(self,
+                     segment: str,
+                     offset: int = 0) -> Iterator[Tuple[int, int, RangeValue]]:
+        """
+        Finds the numbers, ranges and quantities in a single line of text.
+        :param segment: The line of text.
+        :param offset: The offset of the line in the document, added to the offsets of the spans.
+        :return: A generator of the start offset, end offset and parsed value of every span.
+        """
+
+        tokens = [(match.start(), match.end()) for match in self.scan_expression.finditer(segment)]
+        words = [segment[start:end].lower() for start, end in tokens]
+        idx = 0
+        while idx < len(words):
+            end = self.match_quantity(words, idx)
+            if end is None:
+                idx += 1
+                continue
+            start_char, end_char = tokens[idx][0], tokens[end - 1][1]
+            try:
+                value = self.parse_num(segment[start_char:end_char])
+            except (ValueError, ArithmeticError, PintError, tokenize.TokenError):
+                idx += 1
+                continue
+            yield offset + start_char, offset + end_char, value
+            idx = end
+
+    def match_quantity(self,
+                       words: List[str],
+                       idx: int) -> Optional[int]:
+        """
+        Matches a number, range or quantity (e.g. "between 5 and 10 kg" or "2 hours and 30 minutes") in a list of words.
+        :param words: The lowercase tokens of a line.
+        :param idx: The index of the token to start matching at.
+        :return: The index one past the last token of the match, or None if no number starts at the given index.
+        """
+
+        has_prefix = words[idx] in ('between', 'from')
+        end = self.match_amount(words, idx + 1 if has_prefix else idx)
+        if end is None:
+            return None
+        end, unit = self.match_unit(words, end)
+
+        # A range, e.g. "5 to 10 kg", "5-10" or "between five and ten"
+        if end < len(words) and (words[end] in self.range_denoters or words[end] in ('-', '–')) and \
+                (words[end] != 'and' or has_prefix):
+            range_end = self.match_amount(words, end + 1)
+            if range_end is not None:
+                range_end, range_unit = self.match_unit(words, range_end)
+                # Two quantities in different units (e.g. "30 mph or 50 km/h") are not a range
+                if not (unit and range_unit and unit != range_unit):
+                    return range_end
+        if has_prefix:
+            return None
+
+        # A compound duration, e.g. "2 hours, 30 minutes and 15 seconds"
+        while unit and (unit in self.time_units or unit.rstrip('s') in self.time_units):
+            next_idx = end
+            while next_idx < len(words) and words[next_idx] in (',', 'and'):
+                next_idx += 1
+            next_end = self.match_amount(words, next_idx)
+            if next_end is None:
+                break
+            next_end, unit = self.match_unit(words, next_end)
+            if not unit or not (unit in self.time_units or unit.rstrip('s') in self.time_units):
+                break
+            end = next_end
+        return end
+
+    def match_amount(self,
+                     words: List[str],
+                     idx: int) -> Optional[int]:
+        """
+        Matches a single number (e.g. "-4.5 million", "$11" or "one hundred and thirty-five") in a list of words.
+        :param words: The lowercase tokens of a line.
+        :param idx: The index of the token to start matching at.
+        :return: The index one past the last token of the number, or None if no number starts at the given index.
+        """
+
+        while idx < len(words) - 1 and (words[idx] in self.negative_denoters or words[idx] == '$'):
+            idx += 1
+        if idx >= len(words) or not (words[idx][-1].isdigit() or words[idx] in self.number_words):
+            return None
+
+        end = idx + 1
+        while end < len(words):
+            previous, word = words[end - 1], words[end]
+            spelled = previous in self.number_words
+            if word in self.multipliers or word in self.measures:
+                end += 1
+            elif spelled and word in self.number_words:
+                end += 1
+            elif spelled and word == '-' and end + 1 < len(words) and words[end + 1] in self.number_words:
+                end += 2
+            elif previous in self.measures and word == 'and' and end + 1 < len(words) and words[end + 1] in self.number_words:
+                # e.g. "one hundred and five", as opposed to the range "between two and three"
+                end += 2
+            elif word in self.decimal_denoters and end + 1 < len(words) and words[end + 1] in self.decimal_words:
+                end += 2
+            else:
+                break
+        return end
+
+    def match_unit(self,
+                   words: List[str],
+                   idx: int) -> Tuple[int, Optional[str]]:
+        """
+        Matches a unit (e.g. "kg" or "miles per hour") at the start of a list of words, preferring the longest.
+        Words of unit_stop_words are not matched as units on their own.
+        :param words: The lowercase tokens of a line.
+        :param idx: The index of the token to start matching at.
+        :return: The index one past the last token of the unit and the unit, or the given index and None.
+        """
+
+        for gram_size in range(min(3, len(words) - idx), 0, -1):
+            gram_words = ['per' if word == '/' else word for word in words[idx:idx + gram_size]]
+            if not (gram_words[0][0].isalpha() or gram_words[0] == '$') or not all(word.isalpha() for word in gram_words[1:]):
+                continue
+            if gram_size == 1 and gram_words[0] in self.unit_stop_words:
+                continue
+            # Same spellings as has_unit_word, including removing the letter "s" when it is not at the end
+            grams = ['_'.join(gram_words)] + ['_'.join(gram_words[:j] + [gram_words[j].rstrip('s')] + gram_words[j + 1:])
+                                             for j in range(gram_size - 1)]
+            for gram in grams:
+                if self.ureg.has_unit_name(gram, True) or self.ureg.has_unit_name(gram, False):
+                    return idx + gram_size, gram
+        return idx, None
 
     def is_phrased_as_decimal_val(self,
                                   words: List[str]) -> bool:
@@ -446,23 +1401,25 @@ class NumParser(object):
 
     def has_unit_word(self,
                       words: List[str],
-                      case_sensitive: bool) -> Tuple[bool, str]:
+                      case_sensitive: bool,
+                      units: Optional[FrozenSet[str]] = None) -> Tuple[bool, str]:
         """
         Checks if a list of words has a word denoting units are present.
         :param words: The list of words to check.
         :param case_sensitive: Whether the unit search should be case_sensitive
+        :param units: Optionally only accept these units (e.g. the units of a single dimensionality)
         :return: the original span of the unit word, as well as the unit itself
         """
 
         for gram_size in range(len(words)-1, 0, -1):
             for i in range(len(words) - gram_size + 1):
                 gram = '_'.join(words[i:i+gram_size])
-                if self.ureg.parse_unit_name(gram, case_sensitive=case_sensitive):
+                if self.ureg.has_unit_name(gram, case_sensitive, units):
                     return (i,i+gram_size), gram
                 # Also try removing the letter "s" when it is not at the end
                 for j in range(gram_size - 1):
                     gram = '_'.join(words[i:i+j] + [words[i+j].rstrip('s')] + words[i+j+1:i+gram_size])
-                    if self.ureg.parse_unit_name(gram, case_sensitive=case_sensitive):
+                    if self.ureg.has_unit_name(gram, case_sensitive, units):
                         return (i,i+gram_size), gram
         return None, None
 
@@ -34,13 +34,60 @@ A class for modeling range values with units associated with them.
 
 Author(s): Marko Sterbentz / C3
 
-TODO: Add function to convert to other units (e.g. 5 to 10 cm ==> 1.97 to 3.94 inches)
 TODO: Improve handling of temperature units (e.g. 5 degrees Fahrenehit
 
 """
 
+import math
 import pint
+import operator
 from copy import deepcopy
+from numbers import Real
+from pint import DimensionalityError
+from pint.compat import zero_or_nan
+from pint.util import to_units_container
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+MARGIN = 0.0001
+
+def canonical_magnitude(quantity: pint.Quantity) -> Optional[Tuple[float, Optional[float]]]:
+    """
+    Computes the magnitude of a quantity expressed in its registry's root (base) units.
+    :param quantity: The quantity to convert.
+    :return: The root-unit magnitude and the multiplicative factor used to get there (None for offset units),
+             or None if the magnitude is not a plain real number.
+    """
+
+    magnitude = quantity._magnitude
+    if not isinstance(magnitude, Real):
+        return None
+    if not quantity._units:
+        return magnitude, 1
+    if not quantity._is_multiplicative:
+        # Offset units (e.g. degree_Fahrenheit) cannot be converted with a single factor
+        return quantity.to_root_units()._magnitude, None
+    factor, _ = quantity._REGISTRY._get_root_units(quantity._units)
+    return magnitude * factor, factor
+
+def _tolerant_eq(lhs: pint.Quantity, lhs_base: float, rhs: pint.Quantity, rhs_factor: float) -> bool:
+    """
+    Mirrors NumParser's Quantity.__eq__ for two multiplicative quantities of the same dimensionality.
+    """
+
+    if lhs._units == rhs._units:
+        return abs(lhs._magnitude - rhs._magnitude) <= MARGIN
+    return abs(lhs_base / rhs_factor - rhs._magnitude) <= MARGIN
+
+def _compare(lhs: pint.Quantity, lhs_base: float, rhs: pint.Quantity, rhs_base: float, op) -> bool:
+    """
+    Mirrors pint's Quantity.compare for two quantities of the same registry.
+    """
+
+    if lhs._units == rhs._units:
+        return op(lhs._magnitude, rhs._magnitude)
+    if lhs.dimensionality != rhs.dimensionality:
+        raise DimensionalityError(lhs._units, rhs._units, lhs.dimensionality, rhs.dimensionality)
+    return op(lhs_base, rhs_base)
 
 class RangeValue:
     def __init__(self,
@@ -71,6 +118,127 @@ class RangeValue:
             self.min_val.ito_base_units()
             self.max_val.ito_base_units()
 
+        self._canonicalize()
+
+    def _canonicalize(self):
+        """
+        Precomputes the root-unit magnitudes and dimensionality of the range so that comparisons
+        between RangeValues can be done on plain floats instead of converting units on every call.
+        """
+
+        min_val, max_val = self.min_val, self.max_val
+        self._dimensionality = min_val.dimensionality
+        min_canonical = canonical_magnitude(min_val)
+        max_canonical = canonical_magnitude(max_val)
+        self._canonical = min_canonical is not None and max_canonical is not None
+        self._base_min, self._min_factor = min_canonical if min_canonical else (None, None)
+        self._base_max, self._max_factor = max_canonical if max_canonical else (None, None)
+        # The tolerant equality only exists on NumParser's Quantity class, so it is only reproduced for that class
+        self._tolerant = self._canonical and self._min_factor is not None and self._max_factor is not None and \
+                         type(min_val) is type(max_val) and getattr(type(min_val), 'MARGIN', None) == MARGIN
+        # What the precomputed values were computed from (Quantities are mutable and may be shared between ranges)
+        self._source = (min_val, max_val, min_val._units, max_val._units, min_val._magnitude, max_val._magnitude)
+
+    def _refresh(self):
+        """
+        Computes the precomputed values again if the bounds (or their units or magnitudes) were replaced since, e.g.
+        when another RangeValue gave units to a unitless Quantity this one shares.
+        """
+
+        min_val, max_val = self.min_val, self.max_val
+        source = self._source
+        if min_val is not source[0] or max_val is not source[1] or \
+                min_val._units is not source[2] or max_val._units is not source[3] or \
+                min_val._magnitude is not source[4] or max_val._magnitude is not source[5]:
+            self._canonicalize()
+
+    @property
+    def dimensionality(self):
+        self._refresh()
+        return self._dimensionality
+
+    @property
+    def base_min(self) -> Optional[float]:
+        """
+        The minimum in root units (None if its magnitude is not a plain real number).
+        """
+
+        self._refresh()
+        return self._base_min
+
+    @property
+    def base_max(self) -> Optional[float]:
+        """
+        The maximum in root units (None if its magnitude is not a plain real number).
+        """
+
+        self._refresh()
+        return self._base_max
+
+    @property
+    def sort_key(self) -> Tuple[float, float]:
+        """
+        Key for sorting RangeValues of the same dimensionality, ordered by their root-unit minimum then maximum.
+        """
+
+        self._refresh()
+        return self._base_min, self._base_max
+
+    def _fast_comparable(self, other: 'RangeValue') -> bool:
+        return self._canonical and other._canonical and self.min_val._REGISTRY is other.min_val._REGISTRY
+
+    def _fast_equatable(self, other: 'RangeValue') -> bool:
+        return self._tolerant and other._tolerant and type(self.min_val) is type(other.min_val)
+
+    def _compare_range(self, other: 'RangeValue', op) -> bool:
+        return _compare(self.min_val, self._base_min, other.min_val, other._base_min, op) and \
+               _compare(self.max_val, self._base_max, other.max_val, other._base_max, op)
+
+    def _as_range(self, other) -> Optional['RangeValue']:
+        """
+        Wraps a scalar Quantity of the same Quantity class so it can use the precomputed comparison paths.
+        Also brings the precomputed values of both sides up to date.
+        """
+
+        self._refresh()
+        if type(other) == RangeValue:
+            other._refresh()
+            return other
+        if type(other) is type(self.min_val):
+            single = RangeValue.__new__(RangeValue)
+            single.min_val = single.max_val = other
+            single._canonicalize()
+            return single
+        return None
+
+    def _compare_number(self, base: float, other, op):
+        """
+        Compares one bound against a plain number, or returns NotImplemented if the precomputed values cannot be used.
+        """
+
+        if self._canonical and isinstance(other, Real) and not self._dimensionality:
+            return op(base, other)
+        return NotImplemented
+
+    def to(self, unit) -> 'RangeValue':
+        """
+        Converts the range to other units (e.g. 5 to 10 cm ==> 1.97 to 3.94 inch).
+        :param unit: The destination units (str, Unit or UnitsContainer).
+        :return: A new RangeValue expressed in the destination units.
+        """
+
+        registry = self.min_val._REGISTRY
+        if not hasattr(registry, 'get_conversion'):
+            return RangeValue(self.min_val.to(unit), self.max_val.to(unit))
+
+        units = to_units_container(unit, registry)
+        if not (registry.is_affine(self.min_val._units) and registry.is_affine(units)):
+            return RangeValue(self.min_val.to(units), self.max_val.to(units))
+        factor, offset = registry.get_conversion(self.min_val._units, units)
+        Quantity = type(self.min_val)
+        return RangeValue(Quantity(self.min_val._magnitude * factor + offset, units),
+                          Quantity(self.max_val._magnitude * factor + offset, units))
+
     def __repr__(self):
         return '<RangeValue({}, {})>'.format(self.min_val.__repr__(), self.max_val.__repr__())
 
@@ -87,41 +255,104 @@ class RangeValue:
                 return str(self.min_val.m) + ' to ' + str(self.max_val.m) + ' ' + str(self.min_val.units)
 
     def __key(self):
-        return (self.min_val.m, str(self.min_val.units), self.max_val.m, str(self.max_val.units))
+        return (self.min_val.m, self.min_val._units, self.max_val.m, self.max_val._units)
 
     def __hash__(self):
         return hash(self.__key())
 
+    def canonical_key(self, tolerance: float = MARGIN, scale: float = 1) -> Tuple[Hashable, int, int]:
+        """
+        Builds a hashable key from the dimensionality and the root-unit magnitudes quantized to the given tolerance,
+        so that equal values expressed in different units (e.g. "2 m" and "200 cm") share a key.
+        Values within the tolerance of each other may still straddle a bucket boundary, which is why unique()
+        and hash_join() also probe the neighbouring buckets. __eq__ allows MARGIN in the units of the value compared
+        against (e.g. 0.0001 km, which is 0.1 m), so the keys of values in units larger than the root units only agree
+        with __eq__ when scaled by the factor of those units (see root_factor).
+        :param tolerance: The width of a quantization bucket, in the units the scale stands for.
+        :param scale: The root-unit factor of those units (1 for root units).
+        :return: A tuple of (dimensionality, quantized minimum, quantized maximum).
+        """
+
+        width = tolerance * scale
+        return self.dimensionality, round(self.base_min / width), round(self.base_max / width)
+
+    @property
+    def root_factor(self) -> float:
+        """
+        The factor that converts the units of the range to root units (1 for offset units, which are never scaled up).
+        """
+
+        self._refresh()
+        return max(self._min_factor or 1, self._max_factor or 1)
+
     ########################################################
     # COMPARISON OPERATORS
     ########################################################
-    # TODO: Add unit tests for the RangeValue vs RangeValue cases
     # TODO: Might need to special case this for integer/floats vs. pint.Quantity so we look at just the min_val.magnitude when comparing
     def __eq__(self, other):
+        other_range = self._as_range(other)
+        if other_range is not None and self._fast_equatable(other_range):
+            if self._dimensionality != other_range._dimensionality:
+                return False
+            return _tolerant_eq(self.min_val, self._base_min, other_range.min_val, other_range._min_factor) and \
+                   _tolerant_eq(self.max_val, self._base_max, other_range.max_val, other_range._max_factor)
+        if self._tolerant and isinstance(other, Real) and not zero_or_nan(other, True):
+            if self._dimensionality:
+                return False
+            return abs(self._base_min - other) <= MARGIN and abs(self._base_max - other) <= MARGIN
+
         if type(other) == RangeValue:
             return self.min_val == other.min_val and self.max_val == other.max_val
         else:
             return self.min_val == other and self.max_val == other
 
     def __ge__(self, other):
+        other_range = self._as_range(other)
+        if other_range is not None and self._fast_comparable(other_range):
+            return self._compare_range(other_range, operator.ge)
+        result = self._compare_number(self._base_min, other, operator.ge)
+        if result is not NotImplemented:
+            return result
+
         if type(other) == RangeValue:
             return self.min_val >= other.min_val and self.max_val >= other.max_val
         else:
             return self.min_val >= other
 
     def __gt__(self, other):
+        other_range = self._as_range(other)
+        if other_range is not None and self._fast_comparable(other_range):
+            return self._compare_range(other_range, operator.gt)
+        result = self._compare_number(self._base_min, other, operator.gt)
+        if result is not NotImplemented:
+            return result
+
         if type(other) == RangeValue:
             return self.min_val > other.min_val and self.max_val > other.max_val
         else:
             return self.min_val > other
 
     def __le__(self, other):
+        other_range = self._as_range(other)
+        if other_range is not None and self._fast_comparable(other_range):
+            return self._compare_range(other_range, operator.le)
+        result = self._compare_number(self._base_max, other, operator.le)
+        if result is not NotImplemented:
+            return result
+
         if type(other) == RangeValue:
             return self.min_val <= other.min_val and self.max_val <= other.max_val
         else:
             return self.max_val <= other
 
     def __lt__(self, other):
+        other_range = self._as_range(other)
+        if other_range is not None and self._fast_comparable(other_range):
+            return self._compare_range(other_range, operator.lt)
+        result = self._compare_number(self._base_max, other, operator.lt)
+        if result is not NotImplemented:
+            return result
+
         if type(other) == RangeValue:
             return self.min_val < other.min_val and self.max_val < other.max_val
         else:
@@ -203,3 +434,115 @@ class RangeValue:
 
     def __pos__(self):
         return RangeValue(self.min_val, self.max_val)
+
+
+def convert_all(values: Iterable[RangeValue],
+                unit) -> List[RangeValue]:
+    """
+    Converts many RangeValues to the same units, resolving each distinct source unit's conversion only once
+    and applying it to all the values in those units with one vectorized step.
+    :param values: The RangeValues to convert. They must share a unit registry.
+    :param unit: The destination units (str, Unit or UnitsContainer).
+    :return: The converted RangeValues, in their original order.
+    """
+
+    values = list(values)
+    if not values:
+        return []
+    registry = values[0].min_val._REGISTRY
+    if not hasattr(registry, 'convert_array'):
+        return [value.to(unit) for value in values]
+
+    units = to_units_container(unit, registry)
+    Quantity = type(values[0].min_val)
+    groups: Dict[Hashable, List[int]] = {}
+    for idx, value in enumerate(values):
+        groups.setdefault(value.min_val._units, []).append(idx)
+
+    converted: List[Optional[RangeValue]] = [None] * len(values)
+    for src, indices in groups.items():
+        min_vals = registry.convert_array([values[idx].min_val._magnitude for idx in indices], src, units)
+        max_vals = registry.convert_array([values[idx].max_val._magnitude for idx in indices], src, units)
+        for idx, min_val, max_val in zip(indices, min_vals.tolist(), max_vals.tolist()):
+            converted[idx] = RangeValue(Quantity(min_val, units), Quantity(max_val, units))
+    return converted
+
+def _neighbouring_keys(key: Tuple[Hashable, int, int]) -> Iterator[Tuple[Hashable, int, int]]:
+    dimensionality, min_bucket, max_bucket = key
+    yield key
+    for min_offset in (-1, 0, 1):
+        for max_offset in (-1, 0, 1):
+            if min_offset or max_offset:
+                yield dimensionality, min_bucket + min_offset, max_bucket + max_offset
+
+class _BucketIndex(object):
+    """
+    Indexes RangeValues by canonical_key for unique() and hash_join(). Each value is quantized on a grid of the width
+    of the tolerance in its own units (rounded up to a power of two of root units), since that is how far __eq__ lets
+    other values be from it. A value in large units (e.g. light-years) therefore only coarsens the grid of the values
+    in units of its scale, rather than every value of its dimensionality. Lookups probe the grid of every scale
+    present for the dimensionality of the value looked up.
+    """
+
+    def __init__(self, tolerance: float):
+        self.tolerance = tolerance
+        self.buckets: Dict[Tuple[int, Tuple[Hashable, int, int]], List[RangeValue]] = {}
+        #: The scales (exponents of two) of the grids of each dimensionality
+        self.scales: Dict[Hashable, Set[int]] = {}
+
+    def __len__(self):
+        return len(self.buckets)
+
+    def add(self, value: RangeValue) -> None:
+        scale = math.ceil(math.log2(value.root_factor))
+        self.buckets.setdefault((scale, value.canonical_key(self.tolerance, 2.0 ** scale)), []).append(value)
+        self.scales.setdefault(value.dimensionality, set()).add(scale)
+
+    def matches(self, value: RangeValue) -> Iterator[RangeValue]:
+        """
+        :return: The indexed values equal to the value (as defined by value == indexed value), in the order indexed
+                 within each bucket.
+        """
+
+        for scale in sorted(self.scales.get(value.dimensionality, ())):
+            for neighbour in _neighbouring_keys(value.canonical_key(self.tolerance, 2.0 ** scale)):
+                for indexed in self.buckets.get((scale, neighbour), ()):
+                    if value == indexed:
+                        yield indexed
+
+def unique(values: Iterable[RangeValue],
+           tolerance: float = MARGIN) -> List[RangeValue]:
+    """
+    Removes duplicate values (as defined by RangeValue.__eq__) in linear time, keeping the first occurrence of each.
+    :param values: The RangeValues to deduplicate.
+    :param tolerance: The quantization tolerance passed to RangeValue.canonical_key, in the units of the values.
+    :return: The distinct values, in their original order.
+    """
+
+    index = _BucketIndex(tolerance)
+    distinct = []
+    for value in values:
+        if next(index.matches(value), None) is not None:
+            continue
+        index.add(value)
+        distinct.append(value)
+    return distinct
+
+def hash_join(left: Iterable[RangeValue],
+              right: Iterable[RangeValue],
+              tolerance: float = MARGIN) -> Iterator[Tuple[RangeValue, RangeValue]]:
+    """
+    Pairs up equal values from two collections by hashing the right side on its canonical key.
+    :param left: The values to look up.
+    :param right: The values to index.
+    :param tolerance: The quantization tolerance passed to RangeValue.canonical_key, in the units of the values.
+    :return: An iterator of (left value, right value) pairs that compare equal.
+    """
+
+    index = _BucketIndex(tolerance)
+    for value in right:
+        index.add(value)
+
+    for value in left:
+        for match in index.matches(value):
+            yield value, match
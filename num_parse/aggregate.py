@@ -0,0 +1,199 @@
+"""
+Aggregate
+
+Vectorized aggregate functions (total, mean, minimum, maximum, span) over collections of RangeValues. They are named
+so as not to shadow the builtins sum, min and max.
+
+Rather than folding the RangeValue operators pairwise, every distinct source unit in the collection is converted
+once to a common unit and the magnitudes are reduced with NumPy. The common unit is the units of the first value
+that has any (the same unit the left-to-right fold of `+` would end up in), and unitless values adopt it just like
+they do in RangeValue.__add__.
+
+Example:
+    from num_parse import aggregate
+    aggregate.total([num_parser.parse_num("1 m"), num_parser.parse_num("50 cm")])   # returns 1.5 meter
+    aggregate.span([num_parser.parse_num("1 to 2 m"), num_parser.parse_num("5 m")]) # returns 1 to 5 meter
+
+"""
+
+import operator
+import numpy as np
+from functools import reduce
+from pint.util import to_units_container
+from typing import Callable, Dict, Hashable, Iterable, List, Tuple, Union
+from num_parse.RangeValue import RangeValue
+
+__all__ = ['group_by_dimensionality', 'total', 'mean', 'minimum', 'maximum', 'span']
+
+def group_by_dimensionality(values: Iterable[RangeValue]) -> Dict[Hashable, List[RangeValue]]:
+    """
+    Splits a collection of RangeValues by their dimensionality.
+    :param values: The RangeValues to group.
+    :return: A dictionary mapping each dimensionality to the values that have it, in their original order.
+    """
+
+    groups = {}
+    for value in values:
+        groups.setdefault(value.dimensionality, []).append(value)
+    return groups
+
+def _common_units(values: List[RangeValue], unit=None):
+    registry = values[0].min_val._REGISTRY
+    if unit is not None:
+        return to_units_container(unit, registry)
+    for value in values:
+        if value.min_val._units and registry._get_root_units(value.min_val._units)[1]:
+            return value.min_val._units
+    return values[0].min_val._units
+
+def _columns(values: List[RangeValue], units) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converts the bounds of every value to the given units, once per distinct source unit.
+    :return: The minimum and maximum magnitudes as NumPy arrays.
+    """
+
+    registry = values[0].min_val._REGISTRY
+    target_is_unitless = not registry._get_root_units(units)[1]
+    groups = {}
+    for idx, value in enumerate(values):
+        groups.setdefault(value.min_val._units, []).append(idx)
+
+    # Keep integers exact when nothing needs converting, the same way the Quantity operators would. They are kept as
+    # Python integers, since int64 would overflow for values (or totals) of 2**63 and above
+    all_ints = len(groups) == 1 and units in groups and \
+               all(type(value.min_val._magnitude) is int and type(value.max_val._magnitude) is int for value in values)
+    dtype = object if all_ints else float
+    min_vals = np.empty(len(values), dtype=dtype)
+    max_vals = np.empty(len(values), dtype=dtype)
+    for src, indices in groups.items():
+        mins = [values[idx].min_val._magnitude for idx in indices]
+        maxs = [values[idx].max_val._magnitude for idx in indices]
+        if src == units or (not target_is_unitless and not registry._get_root_units(src)[1]):
+            # Same units, or unitless values which adopt the units of the others
+            min_vals[indices] = mins
+            max_vals[indices] = maxs
+        else:
+            min_vals[indices] = registry.convert_array(mins, src, units)
+            max_vals[indices] = registry.convert_array(maxs, src, units)
+    return min_vals, max_vals
+
+def _aggregate(values: Iterable[RangeValue],
+               reducer: Callable[[List[RangeValue], object], RangeValue],
+               unit,
+               grouped: bool) -> Union[RangeValue, Dict[Hashable, RangeValue]]:
+    if grouped:
+        return {dimensionality: reducer(group, unit) for dimensionality, group in group_by_dimensionality(values).items()}
+
+    values = list(values)
+    if len(values) == 0:
+        raise ValueError("Cannot aggregate an empty collection of RangeValues!")
+    return reducer(values, unit)
+
+def _build(values: List[RangeValue], units, min_val, max_val) -> RangeValue:
+    Quantity = type(values[0].min_val)
+    return RangeValue(Quantity(_scalar(min_val), units), Quantity(_scalar(max_val), units))
+
+def _scalar(value):
+    # Reductions of float arrays give NumPy scalars, those of object arrays the Python objects themselves
+    return value.item() if isinstance(value, np.generic) else value
+
+def _is_multiplicative(values: List[RangeValue], units) -> bool:
+    registry = values[0].min_val._REGISTRY
+    return all(registry._units[registry.get_name(name)].is_multiplicative for name in units)
+
+def _sum(values: List[RangeValue], unit) -> RangeValue:
+    units = _common_units(values, unit)
+    if not _is_multiplicative(values, units):
+        # Offset units have their own addition rules, so defer to the operators
+        return reduce(operator.add, values)
+    min_vals, max_vals = _columns(values, units)
+    return _build(values, units, min_vals.sum(), max_vals.sum())
+
+def _mean(values: List[RangeValue], unit) -> RangeValue:
+    units = _common_units(values, unit)
+    if not _is_multiplicative(values, units):
+        return reduce(operator.add, values) * (1 / len(values))
+    min_vals, max_vals = _columns(values, units)
+    return _build(values, units, min_vals.mean(), max_vals.mean())
+
+def _min(values: List[RangeValue], unit) -> RangeValue:
+    units = _common_units(values, unit)
+    min_vals, max_vals = _columns(values, units)
+    return _build(values, units, min_vals.min(), max_vals.min())
+
+def _max(values: List[RangeValue], unit) -> RangeValue:
+    units = _common_units(values, unit)
+    min_vals, max_vals = _columns(values, units)
+    return _build(values, units, min_vals.max(), max_vals.max())
+
+def _span(values: List[RangeValue], unit) -> RangeValue:
+    units = _common_units(values, unit)
+    min_vals, max_vals = _columns(values, units)
+    return _build(values, units, min_vals.min(), max_vals.max())
+
+def total(values: Iterable[RangeValue],
+          unit=None,
+          grouped: bool = False) -> Union[RangeValue, Dict[Hashable, RangeValue]]:
+    """
+    Adds up a collection of RangeValues, bound by bound.
+    :param values: An iterable or column of RangeValues.
+    :param unit: Optional units for the result. Defaults to the units of the first value that has any.
+    :param grouped: Whether to aggregate each dimensionality separately and return a dictionary of results.
+    :return: The total as a RangeValue (or a dictionary of them, keyed by dimensionality).
+    """
+
+    return _aggregate(values, _sum, unit, grouped)
+
+def mean(values: Iterable[RangeValue],
+         unit=None,
+         grouped: bool = False) -> Union[RangeValue, Dict[Hashable, RangeValue]]:
+    """
+    Averages a collection of RangeValues, bound by bound.
+    :param values: An iterable or column of RangeValues.
+    :param unit: Optional units for the result. Defaults to the units of the first value that has any.
+    :param grouped: Whether to aggregate each dimensionality separately and return a dictionary of results.
+    :return: The mean as a RangeValue (or a dictionary of them, keyed by dimensionality).
+    """
+
+    return _aggregate(values, _mean, unit, grouped)
+
+def minimum(values: Iterable[RangeValue],
+            unit=None,
+            grouped: bool = False) -> Union[RangeValue, Dict[Hashable, RangeValue]]:
+    """
+    Finds the smallest minimum and smallest maximum of a collection of RangeValues.
+    For single values (not ranges) this is the same as the builtin min().
+    :param values: An iterable or column of RangeValues.
+    :param unit: Optional units for the result. Defaults to the units of the first value that has any.
+    :param grouped: Whether to aggregate each dimensionality separately and return a dictionary of results.
+    :return: The minimum as a RangeValue (or a dictionary of them, keyed by dimensionality).
+    """
+
+    return _aggregate(values, _min, unit, grouped)
+
+def maximum(values: Iterable[RangeValue],
+            unit=None,
+            grouped: bool = False) -> Union[RangeValue, Dict[Hashable, RangeValue]]:
+    """
+    Finds the largest minimum and largest maximum of a collection of RangeValues.
+    For single values (not ranges) this is the same as the builtin max().
+    :param values: An iterable or column of RangeValues.
+    :param unit: Optional units for the result. Defaults to the units of the first value that has any.
+    :param grouped: Whether to aggregate each dimensionality separately and return a dictionary of results.
+    :return: The maximum as a RangeValue (or a dictionary of them, keyed by dimensionality).
+    """
+
+    return _aggregate(values, _max, unit, grouped)
+
+def span(values: Iterable[RangeValue],
+         unit=None,
+         grouped: bool = False) -> Union[RangeValue, Dict[Hashable, RangeValue]]:
+    """
+    Finds the range covering every value in a collection of RangeValues (from the lowest minimum to the highest maximum).
+    :param values: An iterable or column of RangeValues.
+    :param unit: Optional units for the result. Defaults to the units of the first value that has any.
+    :param grouped: Whether to aggregate each dimensionality separately and return a dictionary of results.
+    :return: The covering range as a RangeValue (or a dictionary of them, keyed by dimensionality).
+    """
+
+    return _aggregate(values, _span, unit, grouped)
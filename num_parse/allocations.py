@@ -0,0 +1,222 @@
+"""
+Allocations
+
+Allocation profiling of parse_num with tracemalloc, for keeping the memory churn of parsing in check.
+
+Two things are measured:
+1. The allocations of each parse: the peak memory a parse_num call allocates on top of what was allocated before it
+   (the token lists, TokenInfo objects, joined strings of recursive calls and the Quantity and RangeValue objects of
+   the result), and the blocks and bytes it leaves behind.
+2. The growth of long runs: how much memory stays allocated as more and more inputs are parsed, along with the sizes
+   of the registry tables that grow with the inputs, such as the UnitDefinitions that looking up a prefixed unit
+   (e.g. "kilofeet") inserts into the registry's units, and its caches.
+
+tracemalloc slows Python down considerably, so the profiler is meant for tests and benchmarks rather than production.
+
+Example:
+    profiler = AllocationProfiler(num_parser)
+    profiler.profile_inputs(["5 to 10 kg", "two hundred"])     # AllocationStats per input
+    profiler.track_growth(corpus_texts, every=1000)            # GrowthSamples every 1000 inputs
+    registry_sizes(num_parser)                                  # {"units": 926, "cache.root_units": 387, ...}
+
+"""
+
+import gc
+import tracemalloc
+from typing import Dict, Iterable, List, Optional, Sequence
+from num_parse.NumParser import NumParser
+
+def registry_sizes(num_parser: NumParser) -> Dict[str, int]:
+    """
+    :param num_parser: The parser whose registry to measure.
+    :return: The number of entries of every table of the registry that parsing can grow.
+    """
+
+    ureg = num_parser.ureg
+    sizes = {
+        'units': len(ureg._units),
+        'units_casei': len(ureg._units_casei),
+        'unit_index': len(ureg._unit_index),
+        'conversion_cache': len(ureg._conversion_cache),
+    }
+    for name, cache in vars(ureg._cache).items():
+        if hasattr(cache, '__len__'):
+            sizes['cache.' + name] = len(cache)
+    return sizes
+
+class AllocationStats(object):
+    """
+    The allocations of parsing one input, averaged over the repetitions it was measured with.
+    """
+
+    def __init__(self,
+                 text: str,
+                 peak_bytes: float,
+                 retained_blocks: float,
+                 retained_bytes: float):
+        self.text = text
+        #: The most memory a call held at any time, on top of what was allocated before it
+        self.peak_bytes = peak_bytes
+        #: The blocks and bytes that are still allocated after a call
+        self.retained_blocks = retained_blocks
+        self.retained_bytes = retained_bytes
+
+    def __repr__(self):
+        return '<AllocationStats({!r}, peak={:.0f} B, retained={:.1f} blocks / {:.0f} B)>'.format(
+            self.text, self.peak_bytes, self.retained_blocks, self.retained_bytes)
+
+class GrowthSample(object):
+    """
+    The memory allocated after a number of inputs of a long run.
+    """
+
+    def __init__(self,
+                 parses: int,
+                 traced_bytes: int,
+                 registry: Dict[str, int]):
+        self.parses = parses
+        self.traced_bytes = traced_bytes
+        self.registry = registry
+
+    def __repr__(self):
+        return '<GrowthSample(parses={}, traced={} B, units={})>'.format(self.parses, self.traced_bytes, self.registry['units'])
+
+class AllocationProfiler(object):
+
+    def __init__(self,
+                 num_parser: NumParser):
+        """
+        :param num_parser: The parser to profile.
+        """
+
+        self.num_parser = num_parser
+
+    def _parse(self, text) -> None:
+        try:
+            self.num_parser.parse_num(text)
+        except Exception:
+            pass
+
+    def profile_input(self,
+                      text: str,
+                      repeat: int = 5,
+                      warmup: int = 10) -> AllocationStats:
+        """
+        Measures the allocations of parsing an input.
+        :param text: The input.
+        :param repeat: How many calls to average over.
+        :param warmup: How many calls to make before measuring, so that caches filled by the first calls (e.g. of the
+                       registry) are not counted against every call.
+        :return: The allocations per call.
+        """
+
+        started = not tracemalloc.is_tracing()
+        # tracemalloc.reset_peak needs Python 3.9. Before it the peak is only reset by restarting tracing, which also
+        # drops the traces the retained memory is measured with, so the peaks are measured in repetitions of their own
+        can_reset_peak = hasattr(tracemalloc, 'reset_peak')
+        if not (can_reset_peak or started):
+            raise RuntimeError("Profiling while tracemalloc is already tracing needs Python 3.9 or later!")
+        if started:
+            tracemalloc.start()
+        try:
+            # Warm up while tracing: entries that caches replace during the measurement would otherwise look retained
+            # when the entries they replace were allocated before tracing started
+            for _ in range(warmup):
+                self._parse(text)
+            gc.collect()
+            peak_total = 0
+            if not can_reset_peak:
+                for _ in range(repeat):
+                    tracemalloc.stop()
+                    tracemalloc.start()
+                    self._parse(text)
+                    peak_total += tracemalloc.get_traced_memory()[1]
+                # Warm up again, for the traces restarting dropped
+                for _ in range(warmup):
+                    self._parse(text)
+                gc.collect()
+            before = tracemalloc.take_snapshot()
+            for _ in range(repeat):
+                if can_reset_peak:
+                    baseline = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.reset_peak()
+                self._parse(text)
+                if can_reset_peak:
+                    peak_total += tracemalloc.get_traced_memory()[1] - baseline
+            gc.collect()
+            after = tracemalloc.take_snapshot()
+        finally:
+            if started:
+                tracemalloc.stop()
+
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        differences = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'filename')
+        retained_blocks = sum(difference.count_diff for difference in differences)
+        retained_bytes = sum(difference.size_diff for difference in differences)
+        return AllocationStats(text, peak_total / repeat, retained_blocks / repeat, retained_bytes / repeat)
+
+    def profile_inputs(self,
+                       texts: Iterable[str],
+                       repeat: int = 5,
+                       warmup: int = 10) -> List[AllocationStats]:
+        """
+        Measures the allocations of parsing each of a list of inputs (see profile_input).
+        """
+
+        return [self.profile_input(text, repeat, warmup) for text in texts]
+
+    def profile_categories(self,
+                           categories: Dict[str, Sequence[str]],
+                           repeat: int = 5,
+                           warmup: int = 10) -> Dict[str, AllocationStats]:
+        """
+        Measures the average allocations of parsing the inputs of each category.
+        :param categories: The inputs of each category, by name.
+        :return: The average allocations per call of each category.
+        """
+
+        results = {}
+        for category, texts in categories.items():
+            stats = self.profile_inputs(texts, repeat, warmup)
+            results[category] = AllocationStats(
+                category,
+                sum(stat.peak_bytes for stat in stats) / len(stats),
+                sum(stat.retained_blocks for stat in stats) / len(stats),
+                sum(stat.retained_bytes for stat in stats) / len(stats))
+        return results
+
+    def track_growth(self,
+                     texts: Iterable[str],
+                     every: int = 1000,
+                     limit: Optional[int] = None) -> List[GrowthSample]:
+        """
+        Parses a long run of inputs and samples the memory still allocated (and the sizes of the registry tables) as it
+        goes, so steady growth (a leak) or growth of the registry can be told apart from churn.
+        :param texts: The inputs, e.g. the texts of a generated corpus.
+        :param every: How many inputs to parse between samples.
+        :param limit: Optionally stop after this many inputs.
+        :return: The samples, starting with one before the first input.
+        """
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            gc.collect()
+            samples = [GrowthSample(0, tracemalloc.get_traced_memory()[0], registry_sizes(self.num_parser))]
+            parses = 0
+            for text in texts:
+                if limit is not None and parses >= limit:
+                    break
+                self._parse(text)
+                parses += 1
+                if parses % every == 0:
+                    gc.collect()
+                    samples.append(GrowthSample(parses, tracemalloc.get_traced_memory()[0], registry_sizes(self.num_parser)))
+            if parses % every:
+                gc.collect()
+                samples.append(GrowthSample(parses, tracemalloc.get_traced_memory()[0], registry_sizes(self.num_parser)))
+        finally:
+            if started:
+                tracemalloc.stop()
+        return samples
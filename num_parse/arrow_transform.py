@@ -0,0 +1,140 @@
+"""
+Arrow Transform
+
+Parsing of string columns of Arrow record batches (e.g. read from Parquet files) without converting whole columns to
+Python objects.
+
+Every batch is parsed once per dictionary entry: dictionary-encoded columns are parsed entry by entry, and other string
+columns are dictionary-encoded first (in Arrow), so repeated values are only parsed once per batch. The results of the
+entries are built into a struct array, which Arrow spreads over the rows with the dictionary indices. Consecutive
+batches with the same dictionary (like the batches of a row group of a Parquet file read with read_dictionary) share the
+results of its entries, which are only parsed for the first of them.
+
+STRUCT FIELDS (see PARSED_TYPE):
+1. "min" and "max": the bounds, as float64
+2. "unit": the units of the bounds (e.g. "meter", "dimensionless")
+3. "base_min" and "base_max": the bounds in root units (e.g. meters for inches and kelvin for degrees Celsius)
+4. "error": the name of the exception parse_num raised (with every other field null), or null if it parsed
+
+Null values give null structs.
+
+pyarrow is an optional dependency: it is only needed by this module, which the rest of the package never imports.
+
+Example:
+    import pyarrow.parquet as pq
+    from num_parse.arrow_transform import transform_batches
+    batches = pq.ParquetFile("listings.parquet").iter_batches(columns=["price"])
+    for batch in transform_batches(batches, "price", num_parser):
+        ...                                     # batch has a "price_parsed" struct column
+
+"""
+
+from typing import Iterable, Iterator, List, Optional, Union
+import pyarrow as pa
+from num_parse.NumParser import NumParser
+from num_parse.columns import parse_column
+
+PARSED_TYPE = pa.struct([
+    ('min', pa.float64()),
+    ('max', pa.float64()),
+    ('unit', pa.string()),
+    ('base_min', pa.float64()),
+    ('base_max', pa.float64()),
+    ('error', pa.string()),
+])
+
+def parse_values(num_parser: NumParser,
+                 values: List) -> pa.StructArray:
+    """
+    Parses a list of distinct values.
+    :param num_parser: The parser to parse the values with.
+    :param values: The values, as Python objects (None for nulls).
+    :return: A struct array of PARSED_TYPE with one entry per value.
+    """
+
+    fields = {name: [None] * len(values) for name in PARSED_TYPE.names}
+    results = parse_column(num_parser, values, errors='return')
+    for idx, (value, result) in enumerate(zip(values, results)):
+        if value is None:
+            continue
+        if isinstance(result, Exception):
+            fields['error'][idx] = type(result).__name__
+            continue
+        fields['min'][idx] = float(result.min_val.magnitude)
+        fields['max'][idx] = float(result.max_val.magnitude)
+        fields['unit'][idx] = str(result.min_val.units)
+        fields['base_min'][idx] = None if result.base_min is None else float(result.base_min)
+        fields['base_max'][idx] = None if result.base_max is None else float(result.base_max)
+    mask = pa.array([value is None for value in values], pa.bool_())
+    return pa.StructArray.from_arrays([pa.array(fields[field.name], field.type) for field in PARSED_TYPE],
+                                      fields=list(PARSED_TYPE), mask=mask)
+
+class DictionaryCache(object):
+    """
+    Keeps the parsed entries of the last dictionary parse_array parsed, for the next arrays with the same dictionary.
+    """
+
+    def __init__(self):
+        self.dictionary: Optional[pa.Array] = None
+        self.parsed: Optional[pa.StructArray] = None
+
+    def parse(self,
+              num_parser: NumParser,
+              dictionary: pa.Array) -> pa.StructArray:
+        if self.dictionary is None or not (self.dictionary is dictionary or self.dictionary.equals(dictionary)):
+            self.parsed = parse_values(num_parser, dictionary.to_pylist())
+            self.dictionary = dictionary
+        return self.parsed
+
+def parse_array(num_parser: NumParser,
+                array: Union[pa.Array, pa.ChunkedArray],
+                cache: Optional[DictionaryCache] = None) -> Union[pa.StructArray, pa.ChunkedArray]:
+    """
+    Parses every value of an Arrow array, parsing each dictionary entry once.
+    :param num_parser: The parser to parse the values with.
+    :param array: A string (or dictionary-encoded string) array. Chunked arrays are parsed chunk by chunk.
+    :param cache: Optionally reuse the parsed entries of the last dictionary parsed with this cache.
+    :return: A struct array of PARSED_TYPE with one entry per value.
+    """
+
+    cache = cache or DictionaryCache()
+    if isinstance(array, pa.ChunkedArray):
+        return pa.chunked_array([parse_array(num_parser, chunk, cache) for chunk in array.chunks], PARSED_TYPE)
+    if not pa.types.is_dictionary(array.type):
+        array = array.dictionary_encode()
+    return cache.parse(num_parser, array.dictionary).take(array.indices)
+
+def transform_batch(batch: pa.RecordBatch,
+                    column: str,
+                    num_parser: NumParser,
+                    output: Optional[str] = None,
+                    cache: Optional[DictionaryCache] = None) -> pa.RecordBatch:
+    """
+    Parses a string column of a record batch.
+    :param batch: The record batch.
+    :param column: The name of the column to parse.
+    :param num_parser: The parser to parse the values with.
+    :param output: The name of the struct column to add. Defaults to the name of the column followed by "_parsed".
+    :param cache: Optionally reuse the parsed entries of the dictionary of the last batch parsed with this cache.
+    :return: The record batch with the struct column of PARSED_TYPE added after its other columns.
+    """
+
+    parsed = parse_array(num_parser, batch.column(column), cache)
+    return pa.RecordBatch.from_arrays(batch.columns + [parsed],
+                                      schema=batch.schema.append(pa.field(output or column + '_parsed', PARSED_TYPE)))
+
+def transform_batches(batches: Iterable[pa.RecordBatch],
+                      column: str,
+                      num_parser: Optional[NumParser] = None,
+                      output: Optional[str] = None) -> Iterator[pa.RecordBatch]:
+    """
+    Parses a string column of a stream of record batches, batch by batch (see transform_batch).
+    :param batches: The record batches, e.g. ParquetFile.iter_batches() or a RecordBatchReader.
+    :param num_parser: The parser to parse the values with. Defaults to a new NumParser.
+    :return: The record batches with the struct column added, in order.
+    """
+
+    num_parser = num_parser or NumParser()
+    cache = DictionaryCache()
+    for batch in batches:
+        yield transform_batch(batch, column, num_parser, output, cache)
@@ -0,0 +1,224 @@
+"""
+Columns
+
+Parsing of whole columns of values that come from one source and so almost always share one shape, e.g. "<int> mg",
+"<float> to <float> hours" or "$<int>".
+
+The shape of the column is inferred from a sample: every value is reduced to a signature (its text with the numbers
+taken out) and the dominant signature is compiled into a ColumnTemplate. A template matches a value with a single
+regular expression and builds the RangeValue straight from the numbers it captured and the unit parse_num resolved for
+the sample, skipping the tokenizer, the unit search and the range detection. Values that do not match the template go
+through parse_num as usual.
+
+A template is only used after it has produced exactly the same values as parse_num for every sample value of its shape,
+so the results of parse_column are the same as calling parse_num on every value.
+
+Example:
+    from num_parse.columns import parse_column
+    parse_column(num_parser, ["5 mg", "10 mg", "12.5 mg", "n/a"], errors="coerce")
+    parse_column(num_parser, ["1.234,5 kg", "12,5 kg"], number_format="detect")     # European decimal commas
+
+"""
+
+import re
+from collections import Counter
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+from num_parse.NumParser import NumParser
+from num_parse.number_formats import NumberFormat, detect_number_format, get_number_format
+from num_parse.RangeValue import RangeValue
+import tokenize
+
+# The number forms the templates capture: integers without leading zeros (optionally grouped with commas) and
+# decimals, with an optional minus sign. Anything else in a value is part of its signature.
+NUMBER_PATTERN = r'-?(?:0|[1-9]\d{0,2}(?:,\d{3})+|[1-9]\d*)(?:\.\d+)?'
+
+_NUMBER = re.compile(NUMBER_PATTERN)
+_WHITESPACE = re.compile(r'\s+')
+
+def signature(value: str) -> Tuple[str, ...]:
+    """
+    Reduces a value to its shape.
+    :param value: The value, e.g. "5 to 10 mg".
+    :return: The text around its numbers with whitespace collapsed, e.g. ("", " to ", " mg").
+    """
+
+    return tuple(_WHITESPACE.sub(' ', piece) for piece in _NUMBER.split(value.strip()))
+
+def _same_value(lhs: RangeValue, rhs: RangeValue) -> bool:
+    return all(type(left._magnitude) is type(right._magnitude) and left._magnitude == right._magnitude and
+               left._units == right._units for left, right in ((lhs.min_val, rhs.min_val), (lhs.max_val, rhs.max_val)))
+
+class ColumnTemplate(object):
+    """
+    A compiled matcher for the values of one signature.
+    """
+
+    def __init__(self,
+                 num_parser: NumParser,
+                 pieces: Tuple[str, ...],
+                 unit_string: Optional[str],
+                 max_unit_string: Optional[str] = None):
+        """
+        :param num_parser: The parser whose Quantity class the values are built with.
+        :param pieces: The signature of the values, which holds one or two numbers.
+        :param unit_string: The unit parse_num finds in the values, if any.
+        :param max_unit_string: For ranges, the unit parse_num finds after the second number, if any.
+        """
+
+        self.num_parser = num_parser
+        self.pieces = pieces
+        self.unit_string = unit_string
+        self.max_unit_string = max_unit_string
+        # Resolve the units once instead of on every value
+        self.units = num_parser.Quantity(1, unit_string)._units
+        self.max_units = num_parser.Quantity(1, max_unit_string or unit_string)._units
+        literals = [r'\s+'.join(map(re.escape, piece.split(' '))) for piece in pieces]
+        self.expression = re.compile(r'\s*' + '({})'.format(NUMBER_PATTERN).join(literals) + r'\s*')
+
+    @property
+    def is_range(self) -> bool:
+        return len(self.pieces) == 3
+
+    def match(self,
+              value: str) -> Optional[RangeValue]:
+        """
+        Parses a value of the template's shape.
+        :param value: The value to parse.
+        :return: The same value as parse_num, or None if the value does not have the template's shape.
+        """
+
+        match = self.expression.fullmatch(value)
+        if not match:
+            return None
+        numbers = [float(number) if '.' in number else int(number) for number in
+                   (group.replace(',', '') for group in match.groups())]
+        if not self.is_range:
+            return RangeValue(self.num_parser.Quantity(numbers[0], self.units))
+        # As in parse_num, a unitless side of the range takes the unit found in the whole value
+        return RangeValue(self.num_parser.Quantity(numbers[0], self.units),
+                          self.num_parser.Quantity(numbers[1], self.max_units))
+
+def infer_template(num_parser: NumParser,
+                   sample: Iterable[str],
+                   min_share: float = 0.5) -> Optional[ColumnTemplate]:
+    """
+    Infers the dominant shape of a column and compiles it into a template.
+    :param num_parser: The parser the column is parsed with.
+    :param sample: A sample of the values in the column.
+    :param min_share: The share of the sample the dominant shape must account for.
+    :return: The template, or None if no shape dominates or its values cannot be parsed without parse_num.
+    """
+
+    sample = [value for value in sample if isinstance(value, str)]
+    if not sample:
+        return None
+    pieces, count = Counter(signature(value) for value in sample).most_common(1)[0]
+    if count < min_share * len(sample) or len(pieces) not in (2, 3):
+        return None
+    values = [value for value in sample if signature(value) == pieces]
+
+    template = _compile_template(num_parser, pieces, values[0])
+    if template is None:
+        return None
+
+    # Only keep the template if it reproduces parse_num on everything it would have matched in the sample
+    for value in values:
+        try:
+            expected = num_parser.parse_num(value)
+        except Exception:
+            return None
+        actual = template.match(value)
+        if actual is None or not _same_value(actual, expected):
+            return None
+    return template
+
+def _compile_template(num_parser: NumParser,
+                      pieces: Tuple[str, ...],
+                      value: str) -> Optional[ColumnTemplate]:
+    """
+    Works out, from one value of a signature, which path parse_num takes for the values of that signature and the
+    units it resolves along the way. Returns None for signatures whose values take any other path.
+    """
+
+    normalized_input = num_parser.normalize_input(value)
+    if num_parser.clock_expression.match(normalized_input):
+        return None
+    try:
+        clean_words = num_parser.split_words(normalized_input)
+    except (tokenize.TokenError, SyntaxError):
+        return None
+    # The words the tokenizer splits each number into, e.g. ["-", "1000"] for "-1,000"
+    number_words = [['-', number[1:]] if number.startswith('-') else [number]
+                    for number in (number.replace(',', '') for number in _NUMBER.findall(value))]
+
+    unit_span, unit_string = num_parser.has_unit_word(clean_words, True)
+    if not unit_string:
+        unit_span, unit_string = num_parser.has_unit_word(clean_words, False)
+    range_denoter, min_number_words, max_number_words = num_parser.get_number_range(' '.join(clean_words))
+
+    if len(pieces) == 2:
+        if range_denoter:
+            return None
+        if unit_string:
+            if num_parser.get_duration_components(clean_words, num_parser.time_units):
+                return None
+            clean_words = clean_words[:unit_span[0]] + clean_words[unit_span[1]:]
+        # The number has to be the only relevant word left
+        if [word for word in clean_words if num_parser.is_relevant_word(word)] != number_words[0]:
+            return None
+        return ColumnTemplate(num_parser, pieces, unit_string)
+
+    if not range_denoter or min_number_words != number_words[0] or \
+            max_number_words[:len(number_words[1])] != number_words[1]:
+        return None
+    max_unit_string = None
+    if len(max_number_words) > len(number_words[1]):
+        _, max_unit_string = num_parser.has_unit_word(max_number_words, True)
+        if not max_unit_string:
+            _, max_unit_string = num_parser.has_unit_word(max_number_words, False)
+        if not max_unit_string:
+            return None
+    return ColumnTemplate(num_parser, pieces, unit_string, max_unit_string)
+
+def parse_column(num_parser: NumParser,
+                 values: Sequence[str],
+                 sample_size: int = 100,
+                 errors: str = 'raise',
+                 number_format: Optional[Union[str, NumberFormat]] = None) -> List[Optional[Union[RangeValue, Exception]]]:
+    """
+    Parses every value of a column, with the same results as calling parse_num on each value.
+    :param num_parser: The parser to parse the column with.
+    :param values: The values of the column.
+    :param sample_size: How many values to infer the shape (and number format) of the column from.
+    :param errors: "raise" to raise the error of the first value parse_num rejects, "coerce" to return None for it, or
+                   "return" to return the error itself in its place.
+    :param number_format: How the numbers in the column are written: None for the American form parse_num assumes,
+                          the name of a format in number_formats.NUMBER_FORMATS (e.g. "eu"), a NumberFormat, or
+                          "detect" to detect the format from the sample. The values are rewritten into the American
+                          form before they are parsed.
+    :return: The parsed values, in order.
+    """
+
+    if errors not in ('raise', 'coerce', 'return'):
+        raise ValueError("errors must be 'raise', 'coerce' or 'return'!")
+    if number_format == 'detect':
+        number_format = detect_number_format(values[:sample_size])
+    elif number_format is not None:
+        number_format = get_number_format(number_format)
+    if number_format is not None and not number_format.is_american:
+        values = [number_format.to_american(value) if isinstance(value, str) else value for value in values]
+    template = infer_template(num_parser, values[:sample_size])
+
+    results = []
+    for value in values:
+        result = template.match(value) if template is not None and isinstance(value, str) else None
+        if result is None:
+            try:
+                result = num_parser.parse_num(value)
+            except Exception as e:
+                if errors == 'raise':
+                    raise
+                if errors == 'return':
+                    result = e
+        results.append(result)
+    return results
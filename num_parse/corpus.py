@@ -0,0 +1,309 @@
+"""
+Corpus
+
+Generation of synthetic, labeled corpora of number phrases for benchmarking and accuracy testing.
+
+The phrases are built from the same vocabulary the parser uses (the number words in word_to_num_values, the denoters
+of NumParser and the units defined in basic_units.txt), and every phrase is labeled with the value it means, worked
+out from how it was built rather than by parsing it. A corpus is reproducible from its seed, and is generated and
+written one phrase at a time, so corpora of millions of phrases never have to fit in memory.
+
+CATEGORIES:
+1. "numeric": plain numbers, e.g. "1,204" or "37.25"
+2. "spelled": spelled out numbers, e.g. "one hundred and forty two"
+3. "mixed": numbers followed by a multiplier, e.g. "4.5 million"
+4. "negative": negated numbers, e.g. "minus 12" or "negative three"
+5. "decimal": spelled out decimals, e.g. "two point three"
+6. "range": ranges, optionally with a unit, e.g. "between 5 and 10 kg"
+7. "unit": numbers with a unit, e.g. "twelve meters"
+8. "duration": compound durations, e.g. "2 hours, 30 minutes and 15 seconds" (labeled in the last unit)
+9. "junk": phrases without a number, which parse_num should reject
+
+FORMAT:
+Each phrase is a JSON object on its own line, with the keys "text", "category", "min", "max", "unit" (the pint name of
+the unit, or null) and "error" (true for junk, whose min, max and unit are null).
+
+Example:
+    from num_parse.corpus import CorpusGenerator
+    generator = CorpusGenerator(num_parser, seed=7, mix={"unit": 2, "range": 1})
+    generator.write("corpus.jsonl", 1000000)
+    for record in read_corpus("corpus.jsonl"): ...
+
+"""
+
+import json
+import random
+from decimal import Decimal
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from pint.definitions import UnitDefinition
+from num_parse.NumParser import NumParser
+from num_parse.unit_definitions.profiles import DEFAULT_UNITS_PATH, parse_definitions
+
+CATEGORIES = ('numeric', 'spelled', 'mixed', 'negative', 'decimal', 'range', 'unit', 'duration', 'junk')
+
+# The units compound durations are built from, largest first
+DURATION_UNITS = ('week', 'day', 'hour', 'minute', 'second')
+
+# Words without a number or unit in them for the junk phrases
+JUNK_WORDS = ('the', 'cat', 'sat', 'on', 'mat', 'blue', 'quickly', 'house', 'river', 'green', 'happy', 'walk',
+              'window', 'yesterday', 'because', 'under', 'music', 'table', 'bright', 'slowly', 'garden', 'paper')
+
+# Range denoters that need a word in front of the first number
+_RANGE_PREFIXES = {'and': 'between', 'until': 'from'}
+
+Record = Dict[str, Union[str, int, float, bool, None]]
+
+def _number(value: Decimal) -> Union[int, float]:
+    return int(value) if value == value.to_integral_value() else float(value)
+
+class CorpusGenerator(object):
+
+    def __init__(self,
+                 num_parser: NumParser,
+                 seed: int = 0,
+                 mix: Optional[Dict[str, float]] = None,
+                 units_path: Union[str, Path] = DEFAULT_UNITS_PATH):
+        """
+        :param num_parser: The parser whose vocabulary (number words, denoters and units) the phrases are built from.
+        :param seed: The seed of the random generator. The same seed, mix and units give the same corpus.
+        :param mix: The relative weight of each category in CATEGORIES, e.g. {"unit": 2, "range": 1}. Categories
+                    left out are not generated. Defaults to all categories, equally weighted.
+        :param units_path: The unit definitions file the units of the phrases are drawn from.
+        """
+
+        mix = dict.fromkeys(CATEGORIES, 1) if mix is None else mix
+        unknown = set(mix) - set(CATEGORIES)
+        if unknown:
+            raise ValueError("Unknown categories {}! Expected some of {}.".format(sorted(unknown), CATEGORIES))
+        self.categories = [category for category in CATEGORIES if mix.get(category, 0) > 0]
+        if not self.categories:
+            raise ValueError("The mix has to give at least one category a positive weight!")
+        self.cum_weights = list(accumulate(mix[category] for category in self.categories))
+        self.seed = seed
+        self.random = random.Random(seed)
+
+        self.num_parser = num_parser
+        self.ones = {value: word for word, value in num_parser.number_words.items()
+                     if isinstance(value, int) and value < 20 and word != 'dozen'}
+        self.tens = {value: word for word, value in num_parser.number_words.items()
+                     if isinstance(value, int) and 20 <= value < 100}
+        self.scales = sorted(((value, word) for word, value in num_parser.measures.items()
+                              if value > 100 and word in num_parser.number_words), reverse=True)
+        self.multipliers = [(word, num_parser.measures[word]) for word in num_parser.multipliers]
+        self.units = self.load_units(units_path)
+        self.time_units = {name: [unit for unit in self.units if unit[0] == name] for name in DURATION_UNITS}
+        self.seconds = {name: num_parser.ureg.convert(1, name, 'second') for name in DURATION_UNITS}
+
+    def load_units(self,
+                   units_path: Union[str, Path]) -> List[Tuple[str, str, bool]]:
+        """
+        Collects the single word spellings (names, symbols and aliases) of the units in a definitions file that the
+        parser resolves back to the same unit once lowercased, as parse_num does. Multi-word units are left out, as
+        parse_num tends to find a unit in their first word.
+        :param units_path: The unit definitions file.
+        :return: The name, spelling and whether the spelling takes a plural "s", of each spelling.
+        """
+
+        definitions = []
+        for _, definition in parse_definitions(units_path).iter_definitions():
+            if hasattr(definition, 'units'):
+                definitions.extend(unit for _, unit in definition.units)
+            elif isinstance(definition, UnitDefinition):
+                definitions.append(definition)
+
+        ureg = self.num_parser.ureg
+        units = []
+        for definition in definitions:
+            # Skip dimensionless and logarithmic units (e.g. percent and decibels), whose values parse_num treats
+            # differently from the number in the phrase
+            if definition.converter.is_logarithmic or not ureg.get_dimensionality(definition.name):
+                continue
+            words = (definition.name,) + tuple(definition.aliases)
+            for spelling in words + (definition.symbol,):
+                if not spelling or len(spelling) < 2 or not spelling.isalpha():
+                    continue
+                spelling = spelling.lower()
+                if spelling in self.num_parser.number_words or spelling in self.num_parser.range_denoters:
+                    continue
+                try:
+                    units_container = ureg.parse_units(spelling)._units
+                except Exception:
+                    continue
+                if dict(units_container) == {definition.name: 1}:
+                    units.append((definition.name, spelling, spelling in words and len(spelling) > 2))
+        return units
+
+    def generate(self,
+                 size: int) -> Iterator[Record]:
+        """
+        :param size: The number of phrases to generate.
+        :return: A generator of the labeled phrases.
+        """
+
+        for _ in range(size):
+            yield self.phrase(self.random.choices(self.categories, cum_weights=self.cum_weights)[0])
+
+    def write(self,
+              path: Union[str, Path],
+              size: int) -> int:
+        """
+        Writes a corpus to a file, one JSON object per line, without holding it in memory.
+        :param path: The file to write.
+        :param size: The number of phrases to generate.
+        :return: The number of phrases written.
+        """
+
+        count = 0
+        with open(path, 'w', encoding='utf-8') as corpus_file:
+            for record in self.generate(size):
+                corpus_file.write(json.dumps(record) + '\n')
+                count += 1
+        return count
+
+    def phrase(self,
+               category: str) -> Record:
+        """
+        Generates a single labeled phrase.
+        :param category: The category of the phrase, one of CATEGORIES.
+        :return: The phrase, with its label.
+        """
+
+        if category == 'junk':
+            return {'text': self.junk(), 'category': category, 'min': None, 'max': None, 'unit': None, 'error': True}
+        text, min_value, max_value, unit = getattr(self, category)()
+        return {'text': text, 'category': category, 'min': _number(min_value), 'max': _number(max_value),
+                'unit': unit, 'error': False}
+
+    def integer(self) -> int:
+        # Spread the magnitudes evenly between one and nine digits
+        return self.random.randrange(10 ** self.random.randrange(1, 10))
+
+    def spell(self,
+              value: int) -> str:
+        """
+        Spells out a non-negative integer in American English, e.g. 142 as "one hundred and forty two".
+        """
+
+        if value == 0:
+            return self.ones[0]
+        words = []
+        for scale, scale_word in self.scales:
+            if value >= scale:
+                words.extend(self.spell(value // scale).split() + [scale_word])
+                value %= scale
+        if value >= 100:
+            words.extend([self.ones[value // 100], 'hundred'])
+            value %= 100
+            if value and self.random.random() < 0.5:
+                words.append('and')
+        if value >= 20:
+            words.append(self.tens[value - value % 10])
+            value %= 10
+        if value:
+            words.append(self.ones[value])
+        return ' '.join(words)
+
+    def amount(self) -> Tuple[str, Decimal]:
+        """
+        :return: A numeric or spelled out number, and its value.
+        """
+
+        value = self.integer()
+        return self.spell(value) if self.random.random() < 0.5 else str(value), Decimal(value)
+
+    def numeric(self) -> Tuple[str, Decimal, Decimal, None]:
+        value = self.integer()
+        if self.random.random() < 0.3:
+            value = Decimal(value) + Decimal(self.random.randrange(1, 100)) / 100
+            text = str(value)
+        else:
+            text = '{:,}'.format(value) if self.random.random() < 0.5 else str(value)
+        return text, Decimal(value), Decimal(value), None
+
+    def spelled(self) -> Tuple[str, Decimal, Decimal, None]:
+        value = self.integer()
+        return self.spell(value), Decimal(value), Decimal(value), None
+
+    def mixed(self) -> Tuple[str, Decimal, Decimal, None]:
+        word, multiplier = self.random.choice(self.multipliers)
+        value = Decimal(self.random.randrange(1, 1000))
+        if self.random.random() < 0.3:
+            value += Decimal(self.random.randrange(1, 10)) / 10
+        return '{} {}'.format(value, word), value * multiplier, value * multiplier, None
+
+    def negative(self) -> Tuple[str, Decimal, Decimal, None]:
+        denoter = self.random.choice(self.num_parser.negative_denoters)
+        if denoter == '-':
+            value = self.integer()
+            return '-' + str(value), Decimal(-value), Decimal(-value), None
+        text, value = self.amount()
+        return '{} {}'.format(denoter, text), -value, -value, None
+
+    def decimal(self) -> Tuple[str, Decimal, Decimal, None]:
+        whole = self.random.randrange(100)
+        digits = [self.random.choice(self.num_parser.decimal_words) for _ in range(self.random.randrange(1, 4))]
+        value = Decimal('{}.{}'.format(whole, ''.join(str(self.num_parser.number_words[digit]) for digit in digits)))
+        return '{} point {}'.format(self.spell(whole), ' '.join(digits)), value, value, None
+
+    def range(self) -> Tuple[str, Decimal, Decimal, Optional[str]]:
+        (min_text, min_value), (max_text, max_value) = sorted((self.amount(), self.amount()), key=lambda side: side[1])
+        if min_value == max_value:
+            max_value += 1
+            max_text = str(max_value)
+        denoter = self.random.choice(self.num_parser.range_denoters + ['-'])
+        if denoter == '-':
+            min_text, max_text = str(min_value), str(max_value)
+            text = '{}-{}'.format(min_text, max_text)
+        else:
+            text = ' '.join(filter(None, (_RANGE_PREFIXES.get(denoter), min_text, denoter, max_text)))
+        unit = None
+        if self.random.random() < 0.5:
+            unit, spelling = self.unit_spelling(True)
+            text += ' ' + spelling
+        return text, min_value, max_value, unit
+
+    def unit(self) -> Tuple[str, Decimal, Decimal, str]:
+        text, value = self.amount()
+        unit, spelling = self.unit_spelling(value != 1)
+        return '{} {}'.format(text, spelling), value, value, unit
+
+    def unit_spelling(self,
+                      plural: bool) -> Tuple[str, str]:
+        return self.spell_unit(self.random.choice(self.units), plural)
+
+    def spell_unit(self,
+                   unit: Tuple[str, str, bool],
+                   plural: bool) -> Tuple[str, str]:
+        name, spelling, takes_plural = unit
+        return name, spelling + 's' if plural and takes_plural and self.random.random() < 0.5 else spelling
+
+    def duration(self) -> Tuple[str, Decimal, Decimal, str]:
+        names = [name for name in DURATION_UNITS if self.time_units[name]]
+        names = sorted(self.random.sample(names, self.random.randrange(2, 5)), key=DURATION_UNITS.index)
+        parts = []
+        total = 0
+        for name in names:
+            value = self.random.randrange(1, 60)
+            _, spelling = self.spell_unit(self.random.choice(self.time_units[name]), value != 1)
+            parts.append('{} {}'.format(value, spelling))
+            total += value * self.seconds[name] // self.seconds[names[-1]]
+        separator = self.random.choice((' ', ', '))
+        text = separator.join(parts[:-1]) + self.random.choice((separator, ' and ', ', and ')) + parts[-1]
+        return text, Decimal(total), Decimal(total), names[-1]
+
+    def junk(self) -> str:
+        return ' '.join(self.random.choice(JUNK_WORDS) for _ in range(self.random.randrange(1, 6)))
+
+def read_corpus(path: Union[str, Path]) -> Iterator[Record]:
+    """
+    Reads a corpus written by CorpusGenerator.write one phrase at a time.
+    :param path: The file to read.
+    :return: A generator of the labeled phrases.
+    """
+
+    with open(path, encoding='utf-8') as corpus_file:
+        for line in corpus_file:
+            if line.strip():
+                yield json.loads(line)
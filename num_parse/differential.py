@@ -0,0 +1,328 @@
+"""
+Differential
+
+A differential harness that runs the reference engine (num_parse.reference) and the accelerated engines over the same
+corpora and reports every input on which they disagree, along with how fast each engine is.
+
+An engine parses a batch of corpus records (see num_parse.corpus) and returns one outcome per record: the value it
+parsed or the exception it raised. Outcomes agree when they are both values with magnitudes of the same type and value
+and the same units, or both exceptions of the same type. Otherwise the divergence is classified as:
+1. "exception": only one of the engines raised, or they raised different types of exceptions
+2. "unit": the values have different units
+3. "value": the values have the same units but different magnitudes (or types of magnitudes)
+4. "operator": the values agree, but comparing them to other values the engines agreed on gives different results (or
+   different types of exceptions) with the comparison operators of RangeValue than with the original operators of
+   reference.REFERENCE_OPERATORS
+
+Every value is compared (both ways, and to the minimum magnitude of the other value as a plain number) to the value of
+the record before it and to the last value of the same dimensionality before it, with every comparison operator.
+
+ENGINES (see default_engines):
+1. "parse_num": NumParser.parse_num on every input
+2. "prefilter": NumParser.parse_num behind the NumParser.may_contain_number prefilter
+3. "columns": the column templates of num_parse.columns, falling back to parse_num like parse_column
+
+Example:
+    from num_parse.corpus import CorpusGenerator
+    from num_parse.differential import compare_engines
+    report = compare_engines(CorpusGenerator(num_parser).generate(10000))
+    print(report.summary())
+
+"""
+
+import math
+import operator
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from num_parse.NumParser import NumParser
+from num_parse.RangeValue import RangeValue
+from num_parse.columns import infer_template
+from num_parse.corpus import Record
+from num_parse.reference import REFERENCE_OPERATORS, ReferenceNumParser
+
+Outcome = Union[RangeValue, BaseException]
+Engine = Callable[[Sequence[Record]], List[Outcome]]
+
+#: The comparison operators of RangeValue, by symbol (see reference.REFERENCE_OPERATORS for the original ones)
+OPERATORS = {
+    '==': operator.eq,
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+}
+
+def per_input(parse: Callable[[Union[str, int, float], Optional[str]], RangeValue]) -> Engine:
+    """
+    Turns a function that parses a single input (like parse_num) into an engine.
+    :param parse: The function, called with the text and the expected dimensionality of each record.
+    :return: The engine.
+    """
+
+    def engine(records):
+        outcomes = []
+        for record in records:
+            try:
+                outcomes.append(parse(record['text'], record.get('expect')))
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+    return engine
+
+def prefilter_engine(num_parser: NumParser) -> Engine:
+    def parse(text, expect):
+        if isinstance(text, str) and not num_parser.may_contain_number(text):
+            raise ValueError("The prefilter rejected the input!")
+        return num_parser.parse_num(text, expect)
+    return per_input(parse)
+
+def columns_engine(num_parser: NumParser,
+                   sample_size: int = 100) -> Engine:
+    """
+    Parses each batch of records as a column, with the template inferred from its first values. Records that expect a
+    dimensionality (which parse_column does not take) bypass the template.
+    """
+
+    def engine(records):
+        texts = [record['text'] for record in records]
+        template = infer_template(num_parser, texts[:sample_size])
+        outcomes = []
+        for record, text in zip(records, texts):
+            expect = record.get('expect')
+            result = template.match(text) if template is not None and not expect and isinstance(text, str) else None
+            if result is None:
+                try:
+                    result = num_parser.parse_num(text, expect)
+                except Exception as e:
+                    result = e
+            outcomes.append(result)
+        return outcomes
+    return engine
+
+def default_engines(num_parser: Optional[NumParser] = None) -> Dict[str, Engine]:
+    """
+    :param num_parser: The parser to run the accelerated engines with. Defaults to a new NumParser.
+    :return: The accelerated engines of the package, by name.
+    """
+
+    num_parser = num_parser or NumParser()
+    return {
+        'parse_num': per_input(num_parser.parse_num),
+        'prefilter': prefilter_engine(num_parser),
+        'columns': columns_engine(num_parser),
+    }
+
+def _magnitudes_equal(lhs, rhs) -> bool:
+    if type(lhs) is not type(rhs):
+        return False
+    if isinstance(lhs, float) and math.isnan(lhs):
+        return math.isnan(rhs)
+    return bool(lhs == rhs)
+
+def classify(expected: Outcome,
+             actual: Outcome) -> Optional[str]:
+    """
+    Compares the outcomes of two engines on the same input.
+    :param expected: The outcome of the reference engine.
+    :param actual: The outcome of the other engine.
+    :return: None if the outcomes agree, otherwise the kind of divergence: "exception", "unit" or "value".
+    """
+
+    if isinstance(expected, BaseException) or isinstance(actual, BaseException):
+        return None if type(expected) is type(actual) else 'exception'
+    for lhs, rhs in ((expected.min_val, actual.min_val), (expected.max_val, actual.max_val)):
+        if lhs._units != rhs._units:
+            return 'unit'
+    for lhs, rhs in ((expected.min_val, actual.min_val), (expected.max_val, actual.max_val)):
+        if not _magnitudes_equal(lhs._magnitude, rhs._magnitude):
+            return 'value'
+    return None
+
+def _operator_outcome(function: Callable, lhs: RangeValue, rhs) -> Union[bool, BaseException]:
+    try:
+        return bool(function(lhs, rhs))
+    except Exception as e:
+        return e
+
+def classify_operators(expected: Tuple[RangeValue, object],
+                       actual: Tuple[RangeValue, object]) -> Optional[Tuple[str, Union[bool, BaseException], Union[bool, BaseException]]]:
+    """
+    Compares the results of the comparison operators on two pairs of operands that classify agreed on.
+    :param expected: The operands from the reference engine, compared with the original operators.
+    :param actual: The operands from the other engine, compared with the operators of RangeValue.
+    :return: None if every operator gives the same result (or raises the same type of exception), otherwise the
+             symbol of the first operator that does not and both of its results.
+    """
+
+    for symbol, function in OPERATORS.items():
+        expected_result = _operator_outcome(REFERENCE_OPERATORS[symbol], *expected)
+        actual_result = _operator_outcome(function, *actual)
+        if isinstance(expected_result, BaseException) or isinstance(actual_result, BaseException):
+            if type(expected_result) is not type(actual_result):
+                return symbol, expected_result, actual_result
+        elif expected_result != actual_result:
+            return symbol, expected_result, actual_result
+    return None
+
+def describe(outcome: Outcome) -> str:
+    if isinstance(outcome, BaseException):
+        return '{}: {}'.format(type(outcome).__name__, outcome)
+    return str(outcome)
+
+class Divergence(object):
+
+    def __init__(self,
+                 engine: str,
+                 record: Record,
+                 kind: str,
+                 expected: Outcome,
+                 actual: Outcome,
+                 comparison: Optional[str] = None):
+        """
+        :param comparison: For "operator" divergences, the comparison that diverged (e.g. "'5 m' < '2 km'"), whose
+                           results expected and actual are.
+        """
+
+        self.engine = engine
+        self.record = record
+        self.kind = kind
+        self.expected = expected
+        self.actual = actual
+        self.comparison = comparison
+
+    def __repr__(self):
+        return '<Divergence({}, {}, {}: expected {}, got {})>'.format(
+            self.engine, self.kind, self.comparison or repr(self.record['text']), describe(self.expected),
+            describe(self.actual))
+
+class DifferentialReport(object):
+
+    def __init__(self,
+                 engines: Sequence[str],
+                 max_divergences: int):
+        self.engines = list(engines)
+        self.max_divergences = max_divergences
+        self.records = 0
+        #: The divergences of each engine, up to max_divergences per engine
+        self.divergences: Dict[str, List[Divergence]] = {engine: [] for engine in self.engines}
+        #: How many divergences of each kind each engine had
+        self.counts: Dict[str, Dict[str, int]] = {engine: {'exception': 0, 'unit': 0, 'value': 0, 'operator': 0}
+                                                   for engine in self.engines}
+        #: The total time each engine (and the reference) took, in seconds
+        self.seconds: Dict[str, float] = dict.fromkeys(['reference'] + self.engines, 0.0)
+
+    @property
+    def agrees(self) -> bool:
+        return not any(sum(counts.values()) for counts in self.counts.values())
+
+    def throughput(self) -> Dict[str, float]:
+        """
+        :return: The inputs per second of each engine (and the reference).
+        """
+
+        return {engine: self.records / seconds if seconds else float('inf') for engine, seconds in self.seconds.items()}
+
+    def summary(self) -> str:
+        throughput = self.throughput()
+        lines = ['{} inputs'.format(self.records),
+                 '{:<12} {:>12} {:>9} {:>10} {:>6} {:>6} {:>9}'.format('engine', 'inputs/s', 'speedup', 'exception', 'unit',
+                                                                       'value', 'operator'),
+                 '{:<12} {:>12.0f} {:>8.2f}x'.format('reference', throughput['reference'], 1.0)]
+        for engine in self.engines:
+            counts = self.counts[engine]
+            lines.append('{:<12} {:>12.0f} {:>8.2f}x {:>10} {:>6} {:>6} {:>9}'.format(
+                engine, throughput[engine], throughput[engine] / throughput['reference'], counts['exception'],
+                counts['unit'], counts['value'], counts['operator']))
+        for engine in self.engines:
+            lines.extend('  ' + repr(divergence) for divergence in self.divergences[engine])
+        return '\n'.join(lines)
+
+def compare_engines(records: Iterable[Record],
+                    engines: Optional[Dict[str, Engine]] = None,
+                    reference: Optional[NumParser] = None,
+                    batch_size: int = 1000,
+                    max_divergences: int = 20) -> DifferentialReport:
+    """
+    Runs the reference engine and the accelerated engines over a corpus and compares their outcomes.
+    :param records: The corpus records (generated or read from a file with corpus.read_corpus), which are processed in
+                    batches, so corpora of any size can be compared.
+    :param engines: The engines to compare against the reference, by name. Defaults to default_engines().
+    :param reference: The reference parser. Defaults to a new ReferenceNumParser.
+    :param batch_size: How many records each engine parses at a time.
+    :param max_divergences: How many divergences to keep per engine (all of them are counted).
+    :return: The report of the divergences and the throughput of every engine.
+    """
+
+    engines = default_engines() if engines is None else engines
+    reference_engine = per_input((reference or ReferenceNumParser()).parse_num)
+    report = DifferentialReport(engines, max_divergences)
+
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            _compare_batch(batch, reference_engine, engines, report)
+            batch = []
+    if batch:
+        _compare_batch(batch, reference_engine, engines, report)
+    return report
+
+def _timed(engine: Engine, batch: List[Record]) -> Tuple[List[Outcome], float]:
+    start = time.perf_counter()
+    outcomes = engine(batch)
+    return outcomes, time.perf_counter() - start
+
+def _compare_batch(batch: List[Record],
+                   reference_engine: Engine,
+                   engines: Dict[str, Engine],
+                   report: DifferentialReport) -> None:
+    expected, seconds = _timed(reference_engine, batch)
+    report.records += len(batch)
+    report.seconds['reference'] += seconds
+    for name, engine in engines.items():
+        outcomes, seconds = _timed(engine, batch)
+        report.seconds[name] += seconds
+        agreed = []
+        for idx, (record, expected_outcome, outcome) in enumerate(zip(batch, expected, outcomes)):
+            kind = classify(expected_outcome, outcome)
+            if kind is not None:
+                _add_divergence(report, Divergence(name, record, kind, expected_outcome, outcome))
+            elif isinstance(outcome, RangeValue):
+                agreed.append(idx)
+        _compare_operators(name, batch, expected, outcomes, agreed, report)
+
+def _add_divergence(report: DifferentialReport, divergence: Divergence) -> None:
+    report.counts[divergence.engine][divergence.kind] += 1
+    if len(report.divergences[divergence.engine]) < report.max_divergences:
+        report.divergences[divergence.engine].append(divergence)
+
+def _compare_operators(name: str,
+                       batch: List[Record],
+                       expected: List[Outcome],
+                       outcomes: List[Outcome],
+                       agreed: List[int],
+                       report: DifferentialReport) -> None:
+    """
+    Compares every value the engine agreed on with the reference to the one before it and to the last one of the same
+    dimensionality before it.
+    """
+
+    last_of_dimensionality = {}
+    previous = None
+    for idx in agreed:
+        dimensionality = expected[idx].min_val.dimensionality
+        partners = {previous, last_of_dimensionality.get(dimensionality)} - {None}
+        for other in sorted(partners):
+            pairs = (((expected[idx], expected[other]), (outcomes[idx], outcomes[other]), (idx, other)),
+                     ((expected[other], expected[idx]), (outcomes[other], outcomes[idx]), (other, idx)),
+                     ((expected[idx], expected[other].min_val.m), (outcomes[idx], outcomes[other].min_val.m), (idx, None)))
+            for expected_pair, actual_pair, (lhs, rhs) in pairs:
+                divergence = classify_operators(expected_pair, actual_pair)
+                if divergence is not None:
+                    symbol, expected_result, actual_result = divergence
+                    comparison = '{!r} {} {}'.format(batch[lhs]['text'], symbol,
+                                                     repr(batch[rhs]['text']) if rhs is not None else repr(actual_pair[1]))
+                    _add_divergence(report, Divergence(name, batch[lhs], 'operator', expected_result, actual_result,
+                                                       comparison))
+        previous = idx
+        last_of_dimensionality[dimensionality] = idx
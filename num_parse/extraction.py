@@ -0,0 +1,225 @@
+"""
+Extraction
+
+Incremental extraction of the numbers in a document that is being edited (e.g. on every keystroke in an editor).
+
+An ExtractionSession splits the document into the same segments (lines) as NumParser.find_nums and keeps the spans
+found in each segment, keyed by a digest of the segment's content. An edit only re-splits the segments it touches, and
+only segments whose content has not been seen before are scanned again, so the parsing an edit does (which is most of
+its cost) does not depend on the length of the document. Each edit reports the spans it added, removed and changed.
+
+The bookkeeping of an edit does grow linearly with the document: the text is rebuilt (a copy of the document) and the
+start offsets of every segment after the edit are shifted (a Python loop over them, roughly 5 ms per 100,000 lines).
+benchmarks/bench_incremental.py reports how the latency of edits scales with the size of the document.
+
+Example:
+    session = ExtractionSession(num_parser, "It weighs 5 kg.\nIt takes 2 hours.\n")
+    changes = session.edit(10, 11, "6")     # changes.changed holds the old and new "5 kg" / "6 kg" spans
+    list(session.spans())                   # the spans of the whole document, same as num_parser.find_nums(session.text)
+
+"""
+
+import hashlib
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Iterator, List, Tuple
+from num_parse.NumParser import NumParser
+from num_parse.RangeValue import RangeValue
+
+Span = Tuple[int, int, RangeValue]
+
+def _digest(segment: str) -> bytes:
+    return hashlib.blake2b(segment.encode('utf-8'), digest_size=16).digest()
+
+def _common_prefix_length(a: str, b: str) -> int:
+    """
+    Finds the length of the longest common prefix of two strings by comparing slices, which runs at C speed.
+    """
+
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+class ExtractionChanges(object):
+    """
+    The spans added, removed and changed by an edit, with the offsets of the document before (removed) or after
+    (added) the edit. Changed spans are pairs of the old and new span at the same place in the document, e.g. "5 kg"
+    becoming "6 kg". Spans that merely moved because of text inserted or deleted before them are not reported.
+    """
+
+    def __init__(self,
+                 added: List[Span],
+                 removed: List[Span],
+                 changed: List[Tuple[Span, Span]]):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return '<ExtractionChanges(added={}, removed={}, changed={})>'.format(self.added, self.removed, self.changed)
+
+class ExtractionSession(object):
+
+    def __init__(self,
+                 num_parser: NumParser,
+                 text: str = '',
+                 max_unused: int = 1024):
+        """
+        :param num_parser: The parser to extract numbers with.
+        :param text: The initial contents of the document.
+        :param max_unused: How many results of segments no longer in the document to keep, so that undoing an edit
+                           does not scan them again.
+        """
+
+        self.num_parser = num_parser
+        self.max_unused = max_unused
+        self.text = ''
+        #: The segments of the document, their digests and their start offsets
+        self.segments = []
+        self.digests = []
+        self.starts = []
+        #: Map each digest to the spans found in the segment (relative to the segment start)
+        self.results = {}
+        #: How many times each digest occurs in the document
+        self.counts = {}
+        #: The digests no longer in the document whose results are kept, least recently dropped first
+        self.unused = OrderedDict()
+        if text:
+            self.edit(0, 0, text)
+
+    def spans(self) -> Iterator[Span]:
+        """
+        :return: A generator of the start offset, end offset and value of every span in the document.
+        """
+
+        for start, digest in zip(self.starts, self.digests):
+            for span_start, span_end, value in self.results[digest]:
+                yield start + span_start, start + span_end, value
+
+    def update(self,
+               text: str) -> ExtractionChanges:
+        """
+        Replaces the whole document, re-scanning only the part that differs from the current document.
+        :param text: The new contents of the document.
+        :return: The changes to the spans of the document.
+        """
+
+        prefix = _common_prefix_length(self.text, text)
+        suffix = _common_prefix_length(self.text[prefix:][::-1], text[prefix:][::-1])
+        return self.edit(prefix, len(self.text) - suffix, text[prefix:len(text) - suffix])
+
+    def edit(self,
+             start: int,
+             end: int,
+             replacement: str) -> ExtractionChanges:
+        """
+        Replaces the text between two offsets of the document.
+        :param start: The offset of the first replaced character.
+        :param end: The offset one past the last replaced character.
+        :param replacement: The text to insert.
+        :return: The changes to the spans of the document.
+        """
+
+        if not 0 <= start <= end <= len(self.text):
+            raise ValueError("The edit is outside the document!")
+
+        # The segments touched by the edit, extended to whole lines so the document is split the same way as by
+        # find_nums. Deleting a line break also touches the next line, which the edit joins.
+        first = max(bisect_right(self.starts, start) - 1, 0)
+        while first > 0 and not self.segments[first - 1].endswith('\n'):
+            first -= 1
+        last = bisect_right(self.starts, end)
+        while last < len(self.segments) and not self.segments[last - 1].endswith('\n'):
+            last += 1
+        region_start = self.starts[first] if self.segments else 0
+        region_end = self.starts[last - 1] + len(self.segments[last - 1]) if self.segments else 0
+
+        region = self.text[region_start:start] + replacement + self.text[end:region_end]
+        new_segments = list(self.num_parser.iter_segments([region]))
+        new_digests = [_digest(segment) for segment in new_segments]
+        delta = len(replacement) - (end - start)
+
+        old_spans = list(self._region_spans(first, last))
+        for digest in self.digests[first:last]:
+            self._release(digest)
+        new_starts = []
+        offset = region_start
+        for segment, digest in zip(new_segments, new_digests):
+            self._acquire(segment, digest)
+            new_starts.append(offset)
+            offset += len(segment)
+
+        self.text = self.text[:start] + replacement + self.text[end:]
+        self.segments[first:last] = new_segments
+        self.digests[first:last] = new_digests
+        self.starts[first:last] = new_starts
+        shifted = first + len(new_segments)
+        if delta:
+            self.starts[shifted:] = [segment_start + delta for segment_start in self.starts[shifted:]]
+
+        return self._compare(old_spans, list(self._region_spans(first, shifted)), start, end, delta)
+
+    def _region_spans(self, first: int, last: int) -> Iterator[Span]:
+        for idx in range(first, last):
+            start = self.starts[idx]
+            for span_start, span_end, value in self.results[self.digests[idx]]:
+                yield start + span_start, start + span_end, value
+
+    def _acquire(self, segment: str, digest: bytes) -> None:
+        if digest not in self.results:
+            if digest in self.unused:
+                self.results[digest] = self.unused.pop(digest)
+            else:
+                self.results[digest] = list(self.num_parser.scan_segment(segment))
+        self.counts[digest] = self.counts.get(digest, 0) + 1
+
+    def _release(self, digest: bytes) -> None:
+        self.counts[digest] -= 1
+        if not self.counts[digest]:
+            del self.counts[digest]
+            self.unused[digest] = self.results.pop(digest)
+            while len(self.unused) > self.max_unused:
+                self.unused.popitem(last=False)
+
+    @staticmethod
+    def _compare(old_spans: List[Span],
+                 new_spans: List[Span],
+                 start: int,
+                 end: int,
+                 delta: int) -> ExtractionChanges:
+        """
+        Pairs up the spans of the edited region before and after the edit by where they are in the document.
+        """
+
+        def moved(offset):
+            # Where an offset of the old document ends up after the edit
+            if offset <= start:
+                return offset
+            if offset >= end:
+                return offset + delta
+            return start
+
+        unmatched = list(new_spans)
+        removed, changed = [], []
+        for old_span in old_spans:
+            old_start, old_end = moved(old_span[0]), moved(old_span[1])
+            for idx, new_span in enumerate(unmatched):
+                if (new_span[0], new_span[1]) == (old_start, old_end) and str(new_span[2]) == str(old_span[2]):
+                    # Unchanged, at most moved
+                    del unmatched[idx]
+                    break
+                if new_span[0] < max(old_end, old_start + 1) and old_start < new_span[1]:
+                    del unmatched[idx]
+                    changed.append((old_span, new_span))
+                    break
+            else:
+                removed.append(old_span)
+        return ExtractionChanges(unmatched, removed, changed)
@@ -0,0 +1,374 @@
+"""
+Instrumentation
+
+Optional per-stage timing of parse_num, for finding out where the time of slow inputs goes.
+
+Instrumentation is attached to a NumParser with set_instrumentation, which wraps the stages of that parser (and the unit
+lookups of its registry) with timers. Nothing is wrapped while no instrumentation is attached, so parsers that are not
+instrumented run exactly the same code as before, at no cost.
+
+STAGES:
+1. "normalize_input": cleaning the input string
+2. "tokenize": splitting the normalized input into words
+3. "has_unit_word.case_sensitive" and "has_unit_word.case_insensitive": the two searches for a unit word
+4. "get_number_range": splitting ranges into their sides
+5. "parse_num.recursive": parse_num calls made by parse_num itself (for the sides of ranges, the parts of decimals and
+   the components of durations)
+6. "make_value": constructing the Quantity and RangeValue objects of the result
+
+The times of the stages are inclusive: the time of a recursive parse_num call also counts towards the stages it goes
+through. Besides the stages, the depth of the recursion and the number of unit lookups (names checked against the
+registry) are counted.
+
+The SlowInputLog keeps the slowest inputs a parser has seen, with the stages each of them went through when it was
+parsed, at a cost low enough to leave it attached in production. The inputs can be dumped as a corpus to replay in
+benchmarks.
+
+Example:
+    instrumentation = Instrumentation()
+    num_parser.set_instrumentation(instrumentation)
+    num_parser.parse_num("between two and three hours")
+    instrumentation.snapshot()      # {"parses": 1, "stages": {"tokenize": {"calls": 3, "seconds": ...}, ...}, ...}
+    num_parser.set_instrumentation(None)
+
+    slow_inputs = SlowInputLog(size=100)
+    num_parser.set_instrumentation(slow_inputs)
+    ...
+    slow_inputs.entries()           # the ParseProfiles of the 100 slowest inputs, slowest first
+    slow_inputs.dump("slow.jsonl")  # replay with: for record in corpus.read_corpus("slow.jsonl"): ...
+
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+STAGES = ('normalize_input', 'tokenize', 'has_unit_word.case_sensitive', 'has_unit_word.case_insensitive',
+          'get_number_range', 'parse_num.recursive', 'make_value')
+
+class ParseProfile(object):
+    """
+    The measurements of a single (top-level) parse_num call.
+    """
+
+    def __init__(self,
+                 number_string,
+                 expect: Optional[str] = None):
+        self.input = number_string
+        self.expect = expect
+        self.seconds = 0.0
+        #: Map each stage to its number of calls and total time in seconds
+        self.stages: Dict[str, List[float]] = {}
+        self.depth = 0
+        self.unit_lookups = 0
+        #: The name of the exception parse_num raised, or None if it returned a value
+        self.error: Optional[str] = None
+
+    def __repr__(self):
+        return '<ParseProfile({!r}, {:.1f} us, error={})>'.format(self.input, self.seconds * 1e6, self.error)
+
+def _attach_timers(num_parser,
+                   local: threading.local,
+                   clock: Callable[[], float],
+                   finish: Callable[[ParseProfile], None]) -> None:
+    """
+    Wraps the stages of a parser with timers, which measure every top-level parse_num call into a ParseProfile of its
+    own and pass it to finish right after the call.
+    :param num_parser: The parser.
+    :param local: Where to keep the profile of the call in progress and its recursion depth, per thread.
+    :param clock: The clock to time the calls and their stages with, in seconds.
+    :param finish: Called with the profile of every top-level call.
+    """
+
+    def record(stage, elapsed):
+        profile = getattr(local, 'profile', None)
+        if profile is not None:
+            totals = profile.stages.setdefault(stage, [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+
+    def timed(stage, function):
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(stage, clock() - start)
+        return wrapper
+
+    has_unit_word = num_parser.has_unit_word
+
+    def timed_has_unit_word(words, case_sensitive, units=None):
+        start = clock()
+        try:
+            return has_unit_word(words, case_sensitive, units)
+        finally:
+            record('has_unit_word.case_sensitive' if case_sensitive else 'has_unit_word.case_insensitive',
+                   clock() - start)
+
+    has_unit_name = num_parser.ureg.has_unit_name
+
+    def counted_has_unit_name(*args, **kwargs):
+        profile = getattr(local, 'profile', None)
+        if profile is not None:
+            profile.unit_lookups += 1
+        return has_unit_name(*args, **kwargs)
+
+    parse_num = num_parser.parse_num
+
+    def timed_parse_num(number_string, expect=None):
+        depth = getattr(local, 'depth', 0)
+        if depth == 0:
+            local.profile = ParseProfile(number_string, expect)
+        profile = local.profile
+        local.depth = depth + 1
+        profile.depth = max(profile.depth, depth + 1)
+        start = clock()
+        try:
+            return parse_num(number_string, expect)
+        except Exception as e:
+            if depth == 0:
+                profile.error = type(e).__name__
+            raise
+        finally:
+            elapsed = clock() - start
+            local.depth = depth
+            if depth:
+                record('parse_num.recursive', elapsed)
+            else:
+                local.profile = None
+                profile.seconds = elapsed
+                finish(profile)
+
+    num_parser.normalize_input = timed('normalize_input', num_parser.normalize_input)
+    num_parser.split_words = timed('tokenize', num_parser.split_words)
+    num_parser.has_unit_word = timed_has_unit_word
+    num_parser.get_number_range = timed('get_number_range', num_parser.get_number_range)
+    num_parser.make_value = timed('make_value', num_parser.make_value)
+    num_parser.parse_num = timed_parse_num
+    num_parser.ureg.has_unit_name = counted_has_unit_name
+
+class Instrumentation(object):
+
+    def __init__(self,
+                 callback: Optional[Callable[[ParseProfile], None]] = None):
+        """
+        :param callback: Optionally called with the ParseProfile of every top-level parse_num call, right after it.
+        """
+
+        self.callback = callback
+        self._lock = threading.Lock()
+        # The profile of the parse_num call in progress and its recursion depth, per thread
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clears the aggregate counters.
+        """
+
+        with self._lock:
+            self.parses = 0
+            self.errors = 0
+            self.seconds = 0.0
+            self.max_depth = 0
+            self.unit_lookups = 0
+            self.stages: Dict[str, List[float]] = {stage: [0, 0.0] for stage in STAGES}
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        :return: A copy of the aggregate counters over every parse_num call since the last reset.
+        """
+
+        with self._lock:
+            return {
+                'parses': self.parses,
+                'errors': self.errors,
+                'seconds': self.seconds,
+                'max_depth': self.max_depth,
+                'unit_lookups': self.unit_lookups,
+                'stages': {stage: {'calls': calls, 'seconds': seconds} for stage, (calls, seconds) in self.stages.items()},
+            }
+
+    def attach(self, num_parser) -> None:
+        """
+        Wraps the stages of a parser with timers. Use NumParser.set_instrumentation rather than calling this directly.
+        """
+
+        _attach_timers(num_parser, self._local, time.perf_counter, self._finish)
+
+    @staticmethod
+    def detach(num_parser) -> None:
+        """
+        Removes the timers of attach from a parser.
+        """
+
+        for name in ('normalize_input', 'split_words', 'has_unit_word', 'get_number_range', 'make_value', 'parse_num'):
+            num_parser.__dict__.pop(name, None)
+        num_parser.ureg.__dict__.pop('has_unit_name', None)
+
+    def _finish(self, profile: ParseProfile) -> None:
+        with self._lock:
+            self.parses += 1
+            self.errors += profile.error is not None
+            self.seconds += profile.seconds
+            self.max_depth = max(self.max_depth, profile.depth)
+            self.unit_lookups += profile.unit_lookups
+            for stage, (calls, seconds) in profile.stages.items():
+                totals = self.stages.setdefault(stage, [0, 0.0])
+                totals[0] += calls
+                totals[1] += seconds
+        if self.callback is not None:
+            self.callback(profile)
+
+class SlowInputLog(object):
+    """
+    Keeps the slowest inputs a parser has seen, along with how long they took, the stages the time went to and the
+    outcome of parsing them.
+
+    Every top-level parse_num call is timed stage by stage like with Instrumentation, but its ParseProfile is only
+    kept if the call was slower than the fastest input kept, and there are no aggregate counters to update (or lock)
+    otherwise. The stages of an input are those of the very call whose time is kept (cold caches included), so they
+    never add up to more than it apart from the nesting of parse_num.recursive. Without the breakdown, only the total
+    time of each call is measured.
+    """
+
+    def __init__(self,
+                 size: int = 100,
+                 breakdown: bool = True,
+                 clock: Callable[[], float] = time.perf_counter):
+        """
+        :param size: How many of the slowest inputs to keep.
+        :param breakdown: Whether to time the stages of every call, for the inputs kept.
+        :param clock: The clock parse_num calls (and their stages) are timed with, in seconds.
+        """
+
+        if size < 1:
+            raise ValueError("The log has to keep at least one input!")
+        self.size = size
+        self.breakdown = breakdown
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Map each kept (input, expect) pair to its profile. An input that keeps being slow is kept once, with its
+        # slowest time, rather than crowding out the other slow inputs.
+        self._kept = {}
+        # The time an input has to beat to be kept (once the log is full), read without the lock
+        self._threshold = 0.0
+
+    def __len__(self):
+        return len(self._kept)
+
+    def entries(self) -> List[ParseProfile]:
+        """
+        :return: The profiles of the kept inputs, slowest first.
+        """
+
+        with self._lock:
+            return sorted(self._kept.values(), key=lambda profile: profile.seconds, reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._kept = {}
+            self._threshold = 0.0
+
+    def dump(self,
+             path: Union[str, Path]) -> int:
+        """
+        Writes the kept inputs to a JSON lines file, slowest first, which corpus.read_corpus can read back to replay
+        them. Every line holds the "text" and "expect" arguments of the call, and the "seconds", "stages", "depth",
+        "unit_lookups" and "error" it was measured with.
+        :param path: The file to write.
+        :return: The number of inputs written.
+        """
+
+        entries = self.entries()
+        with open(path, 'w', encoding='utf-8') as log_file:
+            for profile in entries:
+                log_file.write(json.dumps({
+                    'text': profile.input,
+                    'expect': profile.expect,
+                    'seconds': profile.seconds,
+                    'stages': {stage: {'calls': calls, 'seconds': seconds} for stage, (calls, seconds) in profile.stages.items()},
+                    'depth': profile.depth,
+                    'unit_lookups': profile.unit_lookups,
+                    'error': profile.error,
+                }) + '\n')
+        return len(entries)
+
+    def attach(self, num_parser) -> None:
+        """
+        Times the parse_num calls of a parser. Use NumParser.set_instrumentation rather than calling this directly.
+        """
+
+        if self.breakdown:
+            _attach_timers(num_parser, self._local, self.clock, self._offer)
+            return
+
+        local = self._local
+        clock = self.clock
+        parse_num = num_parser.parse_num
+
+        def timed_parse_num(number_string, expect=None):
+            if getattr(local, 'active', False):
+                # A recursive call, which is part of the top-level one
+                return parse_num(number_string, expect)
+            local.active = True
+            error = None
+            start = clock()
+            try:
+                return parse_num(number_string, expect)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                elapsed = clock() - start
+                local.active = False
+                if elapsed > self._threshold:
+                    profile = ParseProfile(number_string, expect)
+                    profile.seconds = elapsed
+                    profile.error = error
+                    self._keep(profile)
+
+        num_parser.parse_num = timed_parse_num
+
+    @staticmethod
+    def detach(num_parser) -> None:
+        """
+        Removes the timers of attach from a parser.
+        """
+
+        Instrumentation.detach(num_parser)
+
+    def _offer(self, profile: ParseProfile) -> None:
+        if profile.seconds > self._threshold:
+            self._keep(profile)
+
+    def _keep(self, profile: ParseProfile) -> None:
+        try:
+            key = (profile.input, profile.expect)
+            hash(key)
+        except TypeError:
+            return
+        with self._lock:
+            kept = self._kept.get(key)
+            if kept is not None:
+                # Keep the slowest call of the input, along with its stages
+                if profile.seconds > kept.seconds:
+                    self._kept[key] = profile
+                    self._update_threshold()
+                return
+            if len(self._kept) >= self.size:
+                fastest = min(self._kept, key=lambda kept_key: self._kept[kept_key].seconds)
+                if self._kept[fastest].seconds >= profile.seconds:
+                    return
+                del self._kept[fastest]
+            self._kept[key] = profile
+            self._update_threshold()
+
+    def _update_threshold(self) -> None:
+        if len(self._kept) >= self.size:
+            self._threshold = min(profile.seconds for profile in self._kept.values())
+
@@ -0,0 +1,126 @@
+"""
+Number Formats
+
+Locale-specific ways of writing numbers, and their conversion to the American form that NumParser assumes.
+
+NumParser strips every comma from its input, which is right for "1,234.5" but turns the European "1.234,5" and "12,5"
+into other numbers. A NumberFormat rewrites the numbers of one locale into the American form before parsing, with a
+single precompiled expression. The format of a batch or a column is detected once from a sample with
+detect_number_format, rather than guessed for every value.
+
+FORMATS:
+1. "en" (the default): "1,234.5". Values are left untouched, so parsing is exactly the same as without a format.
+2. "eu": "1.234,5" and "12,5", with the digits optionally grouped by non-breaking, narrow non-breaking or thin spaces
+   ("1 234,5").
+3. "in": Indian grouping ("12,34,567.5") and the lakh (100,000) and crore (10,000,000) multipliers ("2.5 lakh").
+
+Example:
+    from num_parse.number_formats import detect_number_format
+    number_format = detect_number_format(["1.234,5 kg", "12,5 kg", "3 kg"])     # returns NUMBER_FORMATS["eu"]
+    num_parser.parse_num(number_format.to_american("1.234,5 kg"))               # returns 1234.5 kilogram
+
+"""
+
+import re
+from collections import Counter
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Union
+
+# Non-breaking, narrow non-breaking and thin spaces
+_SPACES = '\u00a0\u202f\u2009'
+
+class NumberFormat(object):
+
+    def __init__(self,
+                 name: str,
+                 group_separators: str,
+                 decimal_separator: str,
+                 multipliers: Optional[Dict[str, int]] = None):
+        """
+        :param name: The name of the format.
+        :param group_separators: The characters that can separate groups of thousands.
+        :param decimal_separator: The character that separates the fractional part.
+        :param multipliers: Number words of the locale that NumParser does not know, mapped to their value.
+        """
+
+        self.name = name
+        self.group_separators = group_separators
+        self.decimal_separator = decimal_separator
+        self.multipliers = multipliers or {}
+        self.is_american = group_separators == ',' and decimal_separator == '.' and not self.multipliers
+
+        group = '[{}]'.format(re.escape(group_separators))
+        decimal = re.escape(decimal_separator)
+        number = r'(?<![\d{0}{1}])(?:\d{{1,3}}(?:{2}\d{{3}})+(?:{1}\d+)?|\d+(?:{1}\d+)?)(?![\d{0}{1}]?\d)'.format(
+            re.escape(group_separators), decimal, group)
+        words = '|'.join(map(re.escape, sorted(self.multipliers, key=len, reverse=True)))
+        self.number_expression = re.compile(number + (r'(?:\s*\b({})\b)?'.format(words) if words else ''), re.IGNORECASE)
+        self.group_expression = re.compile(group)
+
+    def __repr__(self):
+        return '<NumberFormat({})>'.format(self.name)
+
+    def to_american(self,
+                    text: str) -> str:
+        """
+        Rewrites the numbers in a string into the American form, e.g. "1.234,5 kg" into "1234.5 kg" for "eu".
+        :param text: The string to rewrite.
+        :return: The string with every number in American form (without grouping separators).
+        """
+
+        if self.is_american:
+            return text
+        return self.number_expression.sub(self._rewrite, text)
+
+    def _rewrite(self, match) -> str:
+        number = self.group_expression.sub('', match.group(0) if match.lastindex is None else
+                                           match.group(0)[:match.start(1) - match.start(0)].rstrip())
+        if self.decimal_separator != '.':
+            number = number.replace(self.decimal_separator, '.')
+        if match.lastindex is None:
+            return number
+        value = Decimal(number) * self.multipliers[match.group(1).lower()]
+        return str(int(value)) if value == value.to_integral_value() else str(float(value))
+
+NUMBER_FORMATS = {
+    'en': NumberFormat('en', ',', '.'),
+    'eu': NumberFormat('eu', '.' + _SPACES, ','),
+    'in': NumberFormat('in', ',', '.', {'lakh': 10 ** 5, 'lakhs': 10 ** 5, 'crore': 10 ** 7, 'crores': 10 ** 7}),
+}
+
+# Evidence for each format that the other formats cannot explain
+_EVIDENCE = {
+    'en': re.compile(r'\d,\d{3}\.\d|\d\.(?:\d{1,2}|\d{4,})(?!\d)'),
+    'eu': re.compile(r'\d\.\d{3},\d|\d\.\d{3}\.\d{3}|\d,(?:\d{1,2}|\d{4,})(?!\d)|\d[' + _SPACES + r']\d{3}(?!\d)'),
+    'in': re.compile(r'(?<![\d,])\d{1,2},\d{2},\d{3}(?!\d)|\d\s*(?:lakh|crore)s?\b', re.IGNORECASE),
+}
+
+def get_number_format(number_format: Union[str, NumberFormat]) -> NumberFormat:
+    """
+    :param number_format: The name of a format in NUMBER_FORMATS, or a NumberFormat.
+    :return: The NumberFormat.
+    """
+
+    if isinstance(number_format, NumberFormat):
+        return number_format
+    try:
+        return NUMBER_FORMATS[number_format]
+    except KeyError:
+        raise ValueError("Unknown number format {}! Expected one of {}.".format(number_format, sorted(NUMBER_FORMATS)))
+
+def detect_number_format(sample: Iterable[str]) -> NumberFormat:
+    """
+    Detects how the numbers in a batch of values are written, from a sample of them.
+    :param sample: A sample of the values.
+    :return: The format most of the unambiguous values are written in, defaulting to "en".
+    """
+
+    votes = Counter()
+    for value in sample:
+        if isinstance(value, str):
+            votes.update(name for name, expression in _EVIDENCE.items() if expression.search(value))
+    if votes['eu'] > votes['en'] + votes['in']:
+        return NUMBER_FORMATS['eu']
+    if votes['in'] > 0 and votes['in'] >= votes['eu']:
+        return NUMBER_FORMATS['in']
+    return NUMBER_FORMATS['en']
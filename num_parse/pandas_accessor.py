@@ -0,0 +1,196 @@
+"""
+Pandas Accessor
+
+A pandas extension for parsing columns of a DataFrame: importing this module registers a "num" accessor on Series.
+
+Rather than calling parse_num on every row (as Series.apply does), the accessor factorizes the column and parses every
+distinct value once, with num_parse.columns.parse_column, then spreads the results back over the rows. Columns with
+many repeated values (units, categories of ranges, ...) are parsed in a fraction of the time.
+
+The results come either as a DataFrame of native columns (see SeriesNumAccessor.parse):
+1. "min" and "max": the bounds as float64 (NaN for missing values and values that could not be parsed)
+2. "unit": the units as a categorical column (e.g. "meter", "dimensionless")
+or as a Series of RangeValues backed by a RangeArray extension array (see SeriesNumAccessor.parse_array).
+
+pandas is an optional dependency: it is only needed by this module, which the rest of the package never imports.
+
+Example:
+    import num_parse.pandas_accessor
+    df["weight"].num.parse(errors="coerce")           # DataFrame with min, max and unit columns
+    df["weight"].num.parse_array(errors="coerce")     # Series of dtype "range"
+    df["weight"].num.parse(num_parser=NumParser(units_profile="basic"))
+
+"""
+
+import numbers
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import ExtensionArray, ExtensionDtype, register_extension_dtype, register_series_accessor, take
+from pandas.api.indexers import check_array_indexer
+from num_parse.NumParser import NumParser
+from num_parse.RangeValue import RangeValue
+from num_parse.columns import parse_column
+
+_default_parser = None
+
+def get_default_parser() -> NumParser:
+    """
+    :return: The parser the accessor uses when none is given, which is constructed on first use.
+    """
+
+    global _default_parser
+    if _default_parser is None:
+        _default_parser = NumParser()
+    return _default_parser
+
+def _factorize(series: pd.Series) -> Tuple[np.ndarray, List]:
+    """
+    :return: The code of every row (-1 for missing values) and the distinct values, as native Python objects.
+    """
+
+    codes, uniques = pd.factorize(series)
+    uniques = uniques.tolist() if hasattr(uniques, 'tolist') else list(uniques)
+    return codes, uniques
+
+def _parse_uniques(uniques: List,
+                   num_parser: NumParser,
+                   errors: str) -> List[Optional[RangeValue]]:
+    if errors not in ('raise', 'coerce'):
+        raise ValueError("errors must be 'raise' or 'coerce'!")
+    return parse_column(num_parser, uniques, errors=errors)
+
+@register_extension_dtype
+class RangeDtype(ExtensionDtype):
+    """
+    The dtype of columns of RangeValues.
+    """
+
+    name = 'range'
+    type = RangeValue
+    kind = 'O'
+    na_value = None
+
+    @classmethod
+    def construct_array_type(cls):
+        return RangeArray
+
+class RangeArray(ExtensionArray):
+    """
+    An extension array of RangeValues (or None for missing values).
+    """
+
+    def __init__(self,
+                 values: np.ndarray):
+        """
+        :param values: An object array of RangeValues and Nones.
+        """
+
+        self._data = values
+
+    @classmethod
+    def _from_sequence(cls, scalars, dtype=None, copy=False):
+        values = np.empty(len(scalars), dtype=object)
+        for idx, scalar in enumerate(scalars):
+            values[idx] = scalar
+        return cls(values)
+
+    @classmethod
+    def _from_factorized(cls, values, original):
+        return cls._from_sequence(values)
+
+    @classmethod
+    def _concat_same_type(cls, to_concat):
+        return cls(np.concatenate([array._data for array in to_concat]))
+
+    @property
+    def dtype(self) -> RangeDtype:
+        return RangeDtype()
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, item):
+        if isinstance(item, numbers.Integral):
+            return self._data[item]
+        return type(self)(self._data[check_array_indexer(self, item)])
+
+    def __array__(self, dtype=None, copy=None):
+        return self._data if dtype is None or dtype == object else self._data.astype(dtype)
+
+    def __eq__(self, other):
+        if isinstance(other, (pd.Series, pd.Index, pd.DataFrame)):
+            return NotImplemented
+        others = other._data if isinstance(other, RangeArray) else [other] * len(self)
+        return np.array([lhs is not None and rhs is not None and bool(lhs == rhs) for lhs, rhs in zip(self._data, others)],
+                        dtype=bool)
+
+    def isna(self) -> np.ndarray:
+        return np.array([value is None for value in self._data], dtype=bool)
+
+    def take(self, indices, allow_fill=False, fill_value=None):
+        return type(self)(take(self._data, indices, allow_fill=allow_fill, fill_value=fill_value))
+
+    def copy(self):
+        return type(self)(self._data.copy())
+
+    def _values_for_factorize(self):
+        # RangeValues are hashable (by their bounds and units), None marks missing values
+        return self._data, None
+
+@register_series_accessor('num')
+class SeriesNumAccessor(object):
+
+    def __init__(self, series: pd.Series):
+        self._series = series
+
+    def parse(self,
+              num_parser: Optional[NumParser] = None,
+              errors: str = 'raise') -> pd.DataFrame:
+        """
+        Parses every value of the column, parsing each distinct value only once.
+        :param num_parser: The parser to parse the column with. Defaults to a parser shared by every column.
+        :param errors: "raise" to raise the error of the first value parse_num rejects, "coerce" to give it NaN bounds
+                       and no unit. Missing values always do.
+        :return: A DataFrame with the index of the column and "min", "max" (float64) and "unit" (categorical) columns.
+        """
+
+        codes, uniques = _factorize(self._series)
+        values = _parse_uniques(uniques, num_parser or get_default_parser(), errors)
+
+        # The bounds and units of every distinct value, with a last entry for missing values that code -1 picks
+        min_vals = np.full(len(values) + 1, np.nan)
+        max_vals = np.full(len(values) + 1, np.nan)
+        unit_names = []
+        for idx, value in enumerate(values):
+            if value is None:
+                unit_names.append(None)
+                continue
+            min_vals[idx] = value.min_val.magnitude
+            max_vals[idx] = value.max_val.magnitude
+            unit_names.append(str(value.min_val.units))
+        unit_codes, units = pd.factorize(pd.Series(unit_names + [None], dtype=object))
+
+        return pd.DataFrame({
+            'min': min_vals[codes],
+            'max': max_vals[codes],
+            'unit': pd.Categorical.from_codes(unit_codes[codes], categories=units),
+        }, index=self._series.index)
+
+    def parse_array(self,
+                    num_parser: Optional[NumParser] = None,
+                    errors: str = 'raise') -> pd.Series:
+        """
+        Parses every value of the column like parse, but keeps the RangeValues.
+        :return: A Series of dtype "range" (backed by a RangeArray) with the index and name of the column, holding None
+                 for missing values and (with errors="coerce") values that could not be parsed.
+        """
+
+        codes, uniques = _factorize(self._series)
+        values = _parse_uniques(uniques, num_parser or get_default_parser(), errors)
+        return pd.Series(RangeArray._from_sequence(values + [None]).take(codes), index=self._series.index,
+                         name=self._series.name)
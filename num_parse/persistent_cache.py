@@ -0,0 +1,270 @@
+"""
+Persistent Cache
+
+A cache of parse_num results that outlives the process, in a local SQLite database, so that short-lived jobs over
+overlapping vocabularies only parse each string once across all of them.
+
+Results are keyed by the normalized input (and the expected dimensionality) and stored in the canonical JSON form of
+num_parse.serialization. Inputs parse_num rejects with a ValueError are cached too, and raise it again.
+
+Every entry also records the fingerprint of the parser it was parsed with: a digest of the unit definition files
+(basic_units.txt and the files it imports), the units and prefixes of the registry (which covers unit profiles and
+registered units), the lexicon (number words, decimal words, denoters and multipliers), the magnitude suffixes and
+currency symbols, and the versions of the cache format and pint. Entries are only read back by parsers with the same
+fingerprint, so editing the unit definitions or the lexicon invalidates them without any clean up. Stale entries are
+never used again and are the first to be evicted.
+
+The database is safe to share between processes: it runs in WAL mode (readers do not block the writer), writes wait
+for each other rather than fail, and every process buffers its new entries and the hits of its lookups and writes them
+in one transaction every flush_every parses. The cache holds at most max_entries entries, evicting the least recently
+used ones.
+
+Example:
+    from num_parse.persistent_cache import PersistentCache
+    with PersistentCache(num_parser, "~/.cache/num_parse.sqlite") as cache:
+        cache.parse_num("5 to 10 kg")       # parsed, and stored when the cache is flushed
+        cache.parse_num(" 5 to 10 kg")      # read back from the cache, in this process or the next one
+
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+import pint
+from num_parse.NumParser import NumParser
+from num_parse.RangeValue import RangeValue
+from num_parse.serialization import from_json, to_json
+from num_parse.unit_definitions.compiled import source_digests
+from num_parse.unit_definitions.profiles import DEFAULT_UNITS_PATH
+
+# Bump whenever parse_num starts returning different values for the same inputs, to invalidate every cached result
+CACHE_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    fingerprint TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    error TEXT,
+    used REAL NOT NULL,
+    PRIMARY KEY (fingerprint, key)
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+"""
+
+def parser_fingerprint(num_parser: NumParser) -> str:
+    """
+    :param num_parser: The parser.
+    :return: A digest of everything the results of the parser depend on besides its input (see the module docstring).
+    """
+
+    ureg = num_parser.ureg
+    state = {
+        'version': CACHE_VERSION,
+        'pint': pint.__version__,
+        'sources': source_digests(DEFAULT_UNITS_PATH),
+        'units': sorted(ureg._unit_index.items()),
+        'prefixes': sorted(ureg._prefixes),
+        'number_words': sorted(num_parser.number_words.items()),
+        'decimal_words': list(num_parser.decimal_words),
+        'measures': sorted(num_parser.measures.items()),
+        'relevant_words': list(num_parser.relevant_words),
+        'decimal_denoters': list(num_parser.decimal_denoters),
+        'negative_denoters': list(num_parser.negative_denoters),
+        'range_denoters': list(num_parser.range_denoters),
+        'range_expressions': list(num_parser.range_expressions),
+        'multipliers': list(num_parser.multipliers),
+        'magnitude_suffixes': sorted(num_parser.magnitude_suffixes.items()),
+        'currency_symbols': sorted(num_parser.currency_symbols.items()),
+    }
+    return hashlib.sha1(json.dumps(state, default=str).encode('utf-8')).hexdigest()
+
+class PersistentCache(object):
+
+    def __init__(self,
+                 num_parser: NumParser,
+                 path: Union[str, Path],
+                 max_entries: int = 1000000,
+                 flush_every: int = 1000,
+                 timeout: float = 30.0):
+        """
+        :param num_parser: The parser to parse inputs missing from the cache with.
+        :param path: The SQLite database file, which is created if it does not exist.
+        :param max_entries: The most entries the database keeps (for all fingerprints together).
+        :param flush_every: How many parses to buffer new entries and hits for before writing them.
+        :param timeout: How many seconds to wait for other processes writing to the database.
+        """
+
+        if max_entries < 1:
+            raise ValueError("The cache has to keep at least one entry!")
+        self.num_parser = num_parser
+        self.path = Path(path).expanduser()
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._connection = None
+        self._pid = None
+        # The entries parsed since the last flush, and the entries read since then, by fingerprint and key
+        self._pending: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str]]] = {}
+        self._touched = set()
+        self._parses = 0
+        self._fingerprint = None
+        self._fingerprint_state = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        The fingerprint of the parser, worked out again whenever units or prefixes have been defined or the shorthand
+        suffixes and currency symbols have been set since. Edits of the lexicon lists of a parser in place are not
+        noticed once the cache is in use.
+        """
+
+        ureg = self.num_parser.ureg
+        state = (len(ureg._unit_index), len(ureg._prefixes), id(self.num_parser.magnitude_suffixes),
+                 id(self.num_parser.currency_symbols))
+        if state != self._fingerprint_state:
+            self._fingerprint = parser_fingerprint(self.num_parser)
+            self._fingerprint_state = state
+        return self._fingerprint
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not be used across a fork, so a forked process opens its own
+        if self._connection is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), timeout=self.timeout, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def _key(normalized_input: str, expect: Optional[str]) -> str:
+        return normalized_input if expect is None else '{}\x1f{}'.format(normalized_input, expect)
+
+    def parse_num(self,
+                  number_string: str,
+                  expect: Optional[str] = None) -> RangeValue:
+        """
+        Same as NumParser.parse_num, but returns the cached result of the input if there is one.
+        :param number_string: A string containing a number.
+        :param expect: Optionally only detect units of this dimensionality (e.g. "[time]").
+        :return: The raw numeric value in the given string.
+        """
+
+        if not isinstance(number_string, str):
+            return self.num_parser.parse_num(number_string, expect)
+
+        key = self._key(self.num_parser.normalize_input(number_string), expect)
+        with self._lock:
+            fingerprint = self.fingerprint
+            entry = self._pending.get((fingerprint, key))
+            if entry is None:
+                entry = self._connect().execute('SELECT value, error FROM results WHERE fingerprint = ? AND key = ?',
+                                                (fingerprint, key)).fetchone()
+                if entry is not None:
+                    self._touched.add((fingerprint, key))
+            if entry is not None:
+                self.hits += 1
+                self._count_parse()
+        if entry is not None:
+            value, error = entry
+            if error is not None:
+                raise ValueError(error)
+            return from_json(value, self.num_parser.Quantity)
+
+        try:
+            result = self.num_parser.parse_num(number_string, expect)
+        except ValueError as e:
+            # Only the errors of inputs parse_num rejects are cached, not those of subclasses (e.g. pint's)
+            if type(e) is ValueError:
+                self._store(key, None, str(e))
+            raise
+        self._store(key, to_json(result), None)
+        return result
+
+    def _store(self, key: str, value: Optional[str], error: Optional[str]) -> None:
+        with self._lock:
+            self.misses += 1
+            self._pending[self.fingerprint, key] = (value, error)
+            self._count_parse()
+
+    def _count_parse(self) -> None:
+        self._parses += 1
+        if self._parses >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the buffered entries and the hits since the last flush to the database, and evicts the least recently
+        used entries beyond max_entries.
+        """
+
+        with self._lock:
+            self._parses = 0
+            if not self._pending and not self._touched:
+                return
+            now = time.time()
+            connection = self._connect()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.executemany('INSERT OR REPLACE INTO results (fingerprint, key, value, error, used) VALUES (?, ?, ?, ?, ?)',
+                                       [(fingerprint, key, value, error, now) for (fingerprint, key), (value, error) in self._pending.items()])
+                connection.executemany('UPDATE results SET used = ? WHERE fingerprint = ? AND key = ?',
+                                       [(now, fingerprint, key) for fingerprint, key in self._touched])
+                excess = connection.execute('SELECT COUNT(*) FROM results').fetchone()[0] - self.max_entries
+                if excess > 0:
+                    # Evict down to 90% of the bound, so that a full cache does not evict on every flush
+                    connection.execute('DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY used LIMIT ?)',
+                                       (excess + self.max_entries // 10,))
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            self._pending = {}
+            self._touched = set()
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the database (of every fingerprint), along with the buffered ones.
+        """
+
+        with self._lock:
+            self._pending = {}
+            self._touched = set()
+            self._connect().execute('DELETE FROM results')
+
+    def __len__(self):
+        """
+        :return: The number of entries in the database (of every fingerprint), not counting the buffered ones.
+        """
+
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Flushes the cache and closes the database.
+        """
+
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self.flush()
+                self._connection.close()
+            self._connection = None
@@ -0,0 +1,355 @@
+"""
+Reference
+
+The reference engine for parse_num: a NumParser whose parse_num, tokenizing and unit word search are frozen copies of
+the implementation that every accelerated path (caches, fast paths, new lexers, unit indexes, columnar parsing) has to
+agree with, including its quirks (the distribution of a multiplier over both sides of a range, the case insensitive
+unit search when no unit matches case sensitively, "in" being read as inches, ...).
+
+Optimizations belong in NumParser and RangeValue, never here, so that the differential harness (num_parse.differential)
+can check them against this engine. parse_num is self-contained: clock-style durations go through the old ":" branch
+and compound durations through the old loop over time words, values are built without make_value by reference_range
+(the original RangeValue constructor, with pint's own unitless), and the units of an expected dimensionality are found
+by going through every unit of the registry rather than the dimensionality index. The unit word search looks units up
+with pint's own parse_unit_name rather than the indexed has_unit_name of the registry. The registry is built from the
+text definition files, never from the compiled ones. Only the helpers NumParser has kept as they were (number ranges,
+relevant words, the integral and decimal sums, the arithmetic of RangeValue) are shared with it.
+
+REFERENCE_OPERATORS holds frozen copies of the original comparison operators of RangeValue, which convert the bounds
+and compare them through pint (with the error margin of NumParser's Quantity for equality), for the harness to check
+the precomputed comparisons of RangeValue against.
+
+The reference predates the shorthand numbers of NumParser.set_shorthand, and reads magnitude suffixes (e.g. the "k" of
+"4.5k") as units like NumParser does by default, so it only agrees with parsers given a table of suffixes on shorthand
+numbers without them (e.g. "$11").
+
+Example:
+    from num_parse.reference import ReferenceNumParser
+    reference = ReferenceNumParser()
+    reference.parse_num("5 to 10 million")      # returns 5000000 to 10000000
+    REFERENCE_OPERATORS['<'](reference.parse_num("5 m"), reference.parse_num("6 m"))    # returns True
+
+"""
+
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+from pint import DimensionalityError, OffsetUnitCalculusError
+from pint.compat import is_duck_array_type, zero_or_nan
+from num_parse.NumParser import MARGIN, NumParser, eq, tokenizer
+from num_parse.RangeValue import RangeValue
+from num_parse.unit_definitions.profiles import DEFAULT_UNITS_PATH, load_profile
+import numpy as np
+import tokenize
+
+class ReferenceNumParser(NumParser):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reference_time_units = self.get_reference_time_units()
+        #: The units of each expected dimensionality, found by get_reference_units
+        self.reference_units: Dict[str, FrozenSet[str]] = {}
+
+    def load_unit_definitions(self,
+                              units_profile: Optional[Union[str, Iterable[str]]] = None):
+        """
+        Loads the (trimmed) text definitions, never the compiled ones.
+        """
+
+        return load_profile(units_profile) or str(DEFAULT_UNITS_PATH)
+
+    def register_units(self,
+                       definitions: Union[str, Iterable[str]]) -> None:
+        super().register_units(definitions)
+        self.reference_time_units = self.get_reference_time_units()
+        self.reference_units = {}
+
+    def parse_num(self,
+                  number_string: str,
+                  expect: Optional[str] = None) -> RangeValue:
+        """
+        Parses a given string containing a numeric value into the raw numeric value, exactly as NumParser.parse_num did
+        before any accelerated path was added to it.
+        :param number_string: A string containing a number.
+        :param expect: Optionally only detect units of this dimensionality (e.g. "[time]" or "[length] / [time]").
+        :return: The raw numeric value in the given string.
+        """
+
+        if type(number_string) in [int, float]:
+            return reference_range(self.Quantity(number_string))
+
+        normalized_input = self.normalize_input(number_string)
+
+        if self.is_int(normalized_input) or self.is_float(normalized_input):
+            return reference_range(self.Quantity(normalized_input))
+
+        units = self.get_reference_units(expect) if expect else None
+        time_units = self.reference_time_units
+        if units is not None:
+            time_units = [unit for unit in time_units if unit in units]
+
+        clean_words = self.split_words(normalized_input)
+
+        if len(clean_words) == 0:
+            raise ValueError("No relevant words/numbers in the given string!")
+
+        unit_span, unit_string = self.has_unit_word(clean_words, True, units)
+        if not unit_string:
+            unit_span, unit_string = self.has_unit_word(clean_words, False, units)
+
+        range_denoter, min_number_words, max_number_words = self.get_number_range(' '.join(clean_words))
+        if range_denoter:
+            min_val = self.parse_num(' '.join(min_number_words), expect).min_val if len(min_number_words) else ''
+            max_val = self.parse_num(' '.join(max_number_words), expect).max_val if len(max_number_words) else ''
+            if max_val.m > 1000 * min_val.m and max_number_words[-1] in self.multipliers and min_number_words[-1] not in self.multipliers:
+                # distribute multiplier from max val
+                min_val = self.parse_num(' '.join(min_number_words + [max_number_words[-1]]), expect).min_val
+            q1 = self.Quantity(min_val.m, unit_string) if is_unitless(min_val) else min_val
+            q2 = self.Quantity(max_val.m, unit_string) if is_unitless(max_val) else max_val
+            return reference_range(q1, q2)
+
+        if len(clean_words) == 3 and clean_words[1] == ':' and time_units:
+            unit_string = ':'
+            clean_words = clean_words[:1] + ['minutes'] + clean_words[2:] + ['seconds']
+        if unit_string:
+            if not range_denoter and sum(map(lambda word: 1 if word in time_units or word.rstrip('s') in time_units else 0, clean_words)) > 1:
+                quantities = []
+                idx = 0
+                while idx < len(clean_words):
+                    if clean_words[idx] in time_units or clean_words[idx].rstrip('s') in time_units:
+                        unit_string = clean_words[idx]
+                        quantities.append(self.parse_num(' '.join(clean_words[:idx+1]), expect))
+                        clean_words = clean_words[idx+1:]
+                        idx = 0
+                    else:
+                        idx += 1
+                return sum(quantities, start=reference_range(self.Quantity(0, unit_string)))
+            else:
+                clean_words = clean_words[:unit_span[0]] + clean_words[unit_span[1]:]
+        final_words = [word for word in clean_words if self.is_relevant_word(word)]
+
+        isNegative = False
+        while final_words and final_words[0] in self.negative_denoters:
+            final_words.pop(0)
+            isNegative = not isNegative
+
+        clean_numbers = final_words
+        is_float_num, dec_word = self.has_float_word(clean_numbers)
+
+        if len(clean_numbers) == 0:
+            raise ValueError("No valid number words found! Please enter a valid number word (eg. two million twenty three thousand and forty nine)")
+
+        if clean_numbers.count('thousand') > 1 or clean_numbers.count('million') > 1 or clean_numbers.count('billion') > 1 or clean_numbers.count('point') > 1:
+            raise ValueError("Redundant number word! Please enter a valid number word (eg. two million twenty three thousand and forty nine)")
+
+        if is_float_num:
+            clean_decimal_numbers = clean_numbers[clean_numbers.index(dec_word) + 1:]
+            clean_numbers = clean_numbers[:clean_numbers.index(dec_word)]
+            left_val = str(self.parse_num(' '.join(clean_numbers))) if len(clean_numbers) else ''
+            right_val = str(self.parse_num(' '.join(clean_decimal_numbers))) if len(clean_decimal_numbers) else ''
+            final_num_string = left_val + '.' + right_val
+            if final_num_string == '.':
+                final_num = 0.0
+            else:
+                final_num = float(final_num_string)
+        else:
+            final_num = 0
+            if len(clean_numbers) > 0:
+                if self.is_phrased_as_decimal_val(clean_numbers):
+                    final_num += self.get_decimal_sum(clean_numbers, as_float=False)
+                else:
+                    final_num += self.get_integral_sum(clean_numbers)
+
+        if isNegative:
+            final_num = -final_num
+
+        return reference_range(self.Quantity(final_num, unit_string))
+
+    def get_reference_time_units(self) -> List[str]:
+        """
+        :return: The names of the units of time of the registry, found the way NumParser first found them.
+        """
+
+        def is_time_unit(unit_name):
+            try:
+                unit = self.Quantity._REGISTRY[unit_name]
+            except AttributeError as e:
+                return None
+            if unit.dimensionality._d == {'[time]': 1}:
+                return True
+        return list(filter(is_time_unit, self.Quantity._REGISTRY))
+
+    def get_reference_units(self,
+                            dimension: str) -> FrozenSet[str]:
+        """
+        :param dimension: A dimensionality, e.g. "[time]" or "[length] / [time]".
+        :return: The names, symbols and aliases of the units of the registry with that dimensionality, found by going
+                 through every unit of the registry the way get_reference_time_units does.
+        """
+
+        if dimension not in self.reference_units:
+            dimensionality = self.ureg.get_dimensionality(dimension)
+
+            def has_dimensionality(unit_name):
+                try:
+                    unit = self.Quantity._REGISTRY[unit_name]
+                except AttributeError as e:
+                    return False
+                return unit.dimensionality == dimensionality
+            self.reference_units[dimension] = frozenset(filter(has_dimensionality, self.Quantity._REGISTRY))
+        return self.reference_units[dimension]
+
+    def split_words(self,
+                    normalized_input: str) -> List[str]:
+        clean_words = [self.clean_word(tok.string) for tok in tokenizer(normalized_input) if tok.line and tok.type != tokenize.ERRORTOKEN]
+        return [item if item != '/' else 'per' for item in clean_words]
+
+    def has_unit_word(self,
+                      words: List[str],
+                      case_sensitive: bool,
+                      units: Optional[FrozenSet[str]] = None) -> Tuple[bool, str]:
+        for gram_size in range(len(words)-1, 0, -1):
+            for i in range(len(words) - gram_size + 1):
+                gram = '_'.join(words[i:i+gram_size])
+                if self.is_unit_name(gram, case_sensitive, units):
+                    return (i,i+gram_size), gram
+                # Also try removing the letter "s" when it is not at the end
+                for j in range(gram_size - 1):
+                    gram = '_'.join(words[i:i+j] + [words[i+j].rstrip('s')] + words[i+j+1:i+gram_size])
+                    if self.is_unit_name(gram, case_sensitive, units):
+                        return (i,i+gram_size), gram
+        return None, None
+
+    def is_unit_name(self,
+                     name: str,
+                     case_sensitive: bool,
+                     units: Optional[FrozenSet[str]] = None) -> bool:
+        candidates = self.ureg.parse_unit_name(name, case_sensitive=case_sensitive)
+        if units is None:
+            return bool(candidates)
+        return any(unit_name in units for _, unit_name, _ in candidates)
+
+def is_unitless(quantity) -> bool:
+    """
+    :return: Whether the Quantity has no root units, as pint's own unitless (which NumParser's Quantity overrides) does.
+    """
+
+    return not bool(quantity.to_root_units()._units)
+
+def reference_range(min_val,
+                    max_val=None) -> RangeValue:
+    """
+    Builds a RangeValue the way its constructor originally did, with pint's own unitless.
+    """
+
+    value = RangeValue.__new__(RangeValue)
+    value.min_val = min_val
+    value.max_val = max_val if max_val is not None else min_val
+
+    # If either one of the Quantities is unitless, then add the units of the other Quantity to it
+    if value.max_val is not None and is_unitless(value.max_val):
+        value.max_val._units = value.min_val._units
+        value.max_val._dimensionality = value.min_val._dimensionality
+
+    if is_unitless(value.min_val) and value.max_val is not None and value.max_val.units:
+        value.min_val._units = value.max_val._units
+        value.min_val._dimensionality = value.max_val._dimensionality
+
+    # Ensure units of the two values are the same
+    assert value.min_val.is_compatible_with(value.max_val)
+
+    # Ensure the min and max values are in the appropriate order
+    if value.min_val > value.max_val:
+        value.min_val, value.max_val = value.max_val, value.min_val
+
+    # If units differ, convert them to an SI unit
+    if not (is_unitless(value.min_val) or is_unitless(value.max_val)) and value.min_val.units != value.max_val.units:
+        value.min_val.ito_base_units()
+        value.max_val.ito_base_units()
+
+    # Only so that the value can be used like any other RangeValue; the reference operators never read these
+    value._canonicalize()
+    return value
+
+def quantity_eq(lhs, rhs):
+    """
+    The original equality of NumParser's Quantity: converts the left side to the units of the right side and compares
+    the magnitudes with an error margin of MARGIN.
+    """
+
+    def bool_result(value):
+        nonlocal rhs
+
+        if not is_duck_array_type(type(lhs._magnitude)):
+            return value
+
+        if isinstance(rhs, type(lhs)):
+            rhs = rhs._magnitude
+
+        template, _ = np.broadcast_arrays(lhs._magnitude, rhs)
+        return np.full_like(template, fill_value=value, dtype=np.bool_)
+
+    if not isinstance(rhs, type(lhs)):
+        if zero_or_nan(rhs, True):
+            # Handle the special case in which we compare to zero or NaN
+            # (or an array of zeros or NaNs)
+            if lhs._is_multiplicative:
+                # compare magnitude
+                return eq(lhs._magnitude, rhs, False)
+            else:
+                # compare the magnitude after converting the
+                # non-multiplicative quantity to base units
+                if lhs._REGISTRY.autoconvert_offset_to_baseunit:
+                    return eq(lhs.to_base_units()._magnitude, rhs, False, MARGIN)
+                else:
+                    raise OffsetUnitCalculusError(lhs._units)
+
+        if lhs.dimensionless:
+            return eq(lhs._convert_magnitude_not_inplace(lhs.UnitsContainer()), rhs, False, MARGIN)
+
+        return bool_result(False)
+
+    if lhs._units == rhs._units:
+        return eq(lhs._magnitude, rhs._magnitude, False, MARGIN)
+
+    try:
+        return eq(lhs._convert_magnitude_not_inplace(rhs._units), rhs._magnitude, False, MARGIN)
+    except DimensionalityError:
+        return bool_result(False)
+
+def range_eq(lhs: RangeValue, rhs) -> bool:
+    if type(rhs) == RangeValue:
+        return quantity_eq(lhs.min_val, rhs.min_val) and quantity_eq(lhs.max_val, rhs.max_val)
+    else:
+        return quantity_eq(lhs.min_val, rhs) and quantity_eq(lhs.max_val, rhs)
+
+def range_ge(lhs: RangeValue, rhs) -> bool:
+    if type(rhs) == RangeValue:
+        return lhs.min_val >= rhs.min_val and lhs.max_val >= rhs.max_val
+    else:
+        return lhs.min_val >= rhs
+
+def range_gt(lhs: RangeValue, rhs) -> bool:
+    if type(rhs) == RangeValue:
+        return lhs.min_val > rhs.min_val and lhs.max_val > rhs.max_val
+    else:
+        return lhs.min_val > rhs
+
+def range_le(lhs: RangeValue, rhs) -> bool:
+    if type(rhs) == RangeValue:
+        return lhs.min_val <= rhs.min_val and lhs.max_val <= rhs.max_val
+    else:
+        return lhs.max_val <= rhs
+
+def range_lt(lhs: RangeValue, rhs) -> bool:
+    if type(rhs) == RangeValue:
+        return lhs.min_val < rhs.min_val and lhs.max_val < rhs.max_val
+    else:
+        return lhs.max_val < rhs
+
+#: The original comparison operators of RangeValue, by symbol
+REFERENCE_OPERATORS: Dict[str, Callable[[RangeValue, object], bool]] = {
+    '==': range_eq,
+    '>=': range_ge,
+    '>': range_gt,
+    '<=': range_le,
+    '<': range_lt,
+}
@@ -0,0 +1,299 @@
+"""
+Serialization
+
+Compact binary and canonical JSON formats for shipping RangeValues between services without going through
+str() and parse_num.
+
+BINARY FORMAT:
+A stream is a sequence of fixed-width 24 byte records, all little-endian:
+    tag (1 byte) | flags (1 byte) | unit id (uint16) | length (uint32) | payload (16 bytes)
+1. A header record (tag "H") starts every stream. Its payload holds the format version and the version
+   (digest) and size of the unit dictionary used to assign unit ids.
+2. Value records (tag "V") hold the minimum and maximum magnitudes in the payload, each as an int64 or a float64
+   depending on the flags, so magnitudes round trip exactly.
+3. Units missing from the dictionary (e.g. compound units) are appended to it on the fly and announced with
+   unit records (tag "U") carrying the unit key as UTF-8, 16 bytes per record, before the first value using them.
+
+JSON FORMAT:
+One object per value with sorted keys and no whitespace, e.g. {"max":10,"min":5,"unit":"meter"}.
+Non-finite magnitudes, which strict JSON has no numbers for, are written as the strings "NaN", "Infinity" and
+"-Infinity" (e.g. {"max":"Infinity","min":5,"unit":"meter"}). Streams are written as JSON lines.
+
+"""
+
+import hashlib
+import json
+import math
+import struct
+from numbers import Integral
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from num_parse.RangeValue import RangeValue
+
+FORMAT_VERSION = 1
+RECORD_SIZE = 24
+
+_RECORD = struct.Struct('<cBHI16s')
+_HEADER_PAYLOAD = struct.Struct('<8sIH2x')
+_MAGNITUDES = {
+    (False, False): struct.Struct('<dd'),
+    (True, False): struct.Struct('<qd'),
+    (False, True): struct.Struct('<dq'),
+    (True, True): struct.Struct('<qq'),
+}
+_MIN_IS_INT = 1
+_MAX_IS_INT = 2
+_MORE_CHUNKS = 1
+_INT64_RANGE = (-2 ** 63, 2 ** 63 - 1)
+
+def units_to_key(units) -> str:
+    """
+    Builds a stable string key for a pint UnitsContainer without going through pint's formatting.
+    :param units: The UnitsContainer to convert.
+    :return: The unit name for simple units (e.g. "meter"), or "name**exponent" terms joined by spaces.
+    """
+
+    items = sorted(units.items())
+    if len(items) == 1 and items[0][1] == 1:
+        return items[0][0]
+    return ' '.join('{}**{}'.format(name, exponent) for name, exponent in items)
+
+def key_to_units(key: str, registry):
+    """
+    Inverse of units_to_key.
+    :param key: The unit key.
+    :param registry: The unit registry to build the UnitsContainer with.
+    :return: The UnitsContainer denoted by the key.
+    """
+
+    units = {}
+    for term in key.split():
+        name, _, exponent = term.partition('**')
+        if not exponent:
+            units[name] = 1
+        else:
+            units[name] = float(exponent) if '.' in exponent else int(exponent)
+    return registry.UnitsContainer(units)
+
+class UnitDictionary(object):
+    """
+    An ordered, append-only table assigning integer ids to unit keys.
+    Its version is a digest of the base entries, so two sides built from the same unit definitions agree on it.
+    """
+
+    def __init__(self, entries: Iterable[str]):
+        self.entries: List[str] = list(entries)
+        self.base_size = len(self.entries)
+        self.version = hashlib.sha1('\n'.join(self.entries).encode('utf-8')).digest()[:8]
+        self._ids: Dict[str, int] = {entry: idx for idx, entry in enumerate(self.entries)}
+
+    @classmethod
+    def from_registry(cls, registry) -> 'UnitDictionary':
+        """
+        Builds the dictionary of every unit defined in a registry, with and without each prefix.
+        Prefixed units the registry added on the fly are left out so the result only depends on the definitions.
+        """
+
+        dynamic_units = getattr(registry, '_prefixed_units', set())
+        names = sorted({definition.name for key, definition in registry._units.items() if key not in dynamic_units})
+        prefixes = sorted({definition.name for definition in registry._prefixes.values() if definition.name})
+        return cls([''] + names + [prefix + name for prefix in prefixes for name in names])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_id(self, key: str) -> Optional[int]:
+        return self._ids.get(key)
+
+    def add(self, key: str) -> int:
+        """
+        Appends a unit key to the dictionary (if it is not already there).
+        :param key: The unit key to add.
+        :return: The id of the unit key.
+        """
+
+        if key not in self._ids:
+            if len(self.entries) > 0xFFFF:
+                raise ValueError("Unit dictionary is full!")
+            self._ids[key] = len(self.entries)
+            self.entries.append(key)
+        return self._ids[key]
+
+    def copy(self) -> 'UnitDictionary':
+        dictionary = UnitDictionary.__new__(UnitDictionary)
+        dictionary.entries = list(self.entries)
+        dictionary.base_size = self.base_size
+        dictionary.version = self.version
+        dictionary._ids = dict(self._ids)
+        return dictionary
+
+def _pack_magnitude(magnitude) -> Tuple[bool, object]:
+    if isinstance(magnitude, Integral):
+        magnitude = int(magnitude)
+        if not _INT64_RANGE[0] <= magnitude <= _INT64_RANGE[1]:
+            raise ValueError("Magnitude {} does not fit in a 64-bit record!".format(magnitude))
+        return True, magnitude
+    return False, float(magnitude)
+
+class BinaryEncoder(object):
+    """
+    Writes RangeValues to a binary stream, one fixed-width record per value.
+    """
+
+    def __init__(self,
+                 stream: BinaryIO,
+                 dictionary: UnitDictionary):
+        self.stream = stream
+        # The dictionary may grow while encoding, so work on a copy that the decoder will mirror
+        self.dictionary = dictionary.copy()
+        header = _HEADER_PAYLOAD.pack(self.dictionary.version, self.dictionary.base_size, FORMAT_VERSION)
+        self.stream.write(_RECORD.pack(b'H', 0, 0, 0, header))
+
+    def _unit_id(self, units) -> int:
+        key = units_to_key(units)
+        unit_id = self.dictionary.get_id(key)
+        if unit_id is not None:
+            return unit_id
+
+        unit_id = self.dictionary.add(key)
+        encoded = key.encode('utf-8')
+        chunks = [encoded[i:i + 16] for i in range(0, len(encoded), 16)] or [b'']
+        for idx, chunk in enumerate(chunks):
+            flags = _MORE_CHUNKS if idx < len(chunks) - 1 else 0
+            self.stream.write(_RECORD.pack(b'U', flags, unit_id, len(chunk), chunk))
+        return unit_id
+
+    def write(self, value: RangeValue) -> None:
+        unit_id = self._unit_id(value.min_val._units)
+        min_is_int, min_val = _pack_magnitude(value.min_val._magnitude)
+        max_is_int, max_val = _pack_magnitude(value.max_val._magnitude)
+        flags = (_MIN_IS_INT if min_is_int else 0) | (_MAX_IS_INT if max_is_int else 0)
+        payload = _MAGNITUDES[min_is_int, max_is_int].pack(min_val, max_val)
+        self.stream.write(_RECORD.pack(b'V', flags, unit_id, 0, payload))
+
+def encode_binary(values: Iterable[RangeValue],
+                  stream: BinaryIO,
+                  dictionary: UnitDictionary) -> None:
+    """
+    Writes a sequence of RangeValues to a binary stream.
+    :param values: The RangeValues to encode.
+    :param stream: A binary file-like object to write to.
+    :param dictionary: The unit dictionary shared with the decoding side.
+    """
+
+    encoder = BinaryEncoder(stream, dictionary)
+    for value in values:
+        encoder.write(value)
+
+def decode_binary(stream: BinaryIO,
+                  Quantity,
+                  dictionary: UnitDictionary) -> Iterator[RangeValue]:
+    """
+    Reads RangeValues back from a binary stream written by encode_binary, one record at a time.
+    :param stream: A binary file-like object to read from.
+    :param Quantity: The Quantity class to build the values with (e.g. NumParser().Quantity).
+    :param dictionary: The unit dictionary shared with the encoding side.
+    :return: An iterator over the decoded RangeValues.
+    """
+
+    registry = Quantity._REGISTRY
+    header = stream.read(RECORD_SIZE)
+    if len(header) < RECORD_SIZE:
+        raise ValueError("Missing RangeValue stream header!")
+    tag, _, _, _, payload = _RECORD.unpack(header)
+    if tag != b'H':
+        raise ValueError("Not a RangeValue stream!")
+    version, base_size, format_version = _HEADER_PAYLOAD.unpack(payload)
+    if format_version != FORMAT_VERSION:
+        raise ValueError("Unsupported RangeValue stream format version {}!".format(format_version))
+    if version != dictionary.version or base_size != dictionary.base_size:
+        raise ValueError("RangeValue stream was written with a different unit dictionary!")
+
+    dictionary = dictionary.copy()
+    units_by_id = {}
+    pending_key = b''
+    while True:
+        record = stream.read(RECORD_SIZE)
+        if not record:
+            return
+        if len(record) < RECORD_SIZE:
+            raise ValueError("Truncated RangeValue record!")
+        tag, flags, unit_id, length, payload = _RECORD.unpack(record)
+
+        if tag == b'V':
+            units = units_by_id.get(unit_id)
+            if units is None:
+                units = units_by_id[unit_id] = key_to_units(dictionary.entries[unit_id], registry)
+            min_val, max_val = _MAGNITUDES[bool(flags & _MIN_IS_INT), bool(flags & _MAX_IS_INT)].unpack(payload)
+            yield RangeValue(Quantity(min_val, units), Quantity(max_val, units))
+        elif tag == b'U':
+            pending_key += payload[:length]
+            if not flags & _MORE_CHUNKS:
+                if dictionary.add(pending_key.decode('utf-8')) != unit_id:
+                    raise ValueError("Unit record out of sequence in RangeValue stream!")
+                pending_key = b''
+        else:
+            raise ValueError("Unknown RangeValue record tag {!r}!".format(tag))
+
+_NON_FINITE = {'NaN': float('nan'), 'Infinity': float('inf'), '-Infinity': float('-inf')}
+
+def _encode_magnitude(magnitude):
+    if isinstance(magnitude, float) and not math.isfinite(magnitude):
+        return 'NaN' if math.isnan(magnitude) else ('Infinity' if magnitude > 0 else '-Infinity')
+    return magnitude
+
+def _decode_magnitude(magnitude):
+    if isinstance(magnitude, str):
+        if magnitude not in _NON_FINITE:
+            raise ValueError("Invalid RangeValue magnitude {!r}!".format(magnitude))
+        return _NON_FINITE[magnitude]
+    return magnitude
+
+def to_json(value: RangeValue) -> str:
+    """
+    Serializes a RangeValue into its canonical JSON form.
+    :param value: The RangeValue to serialize.
+    :return: A JSON object string with sorted keys and no whitespace.
+    """
+
+    return json.dumps({'min': _encode_magnitude(value.min_val._magnitude),
+                       'max': _encode_magnitude(value.max_val._magnitude),
+                       'unit': units_to_key(value.min_val._units)},
+                      sort_keys=True, separators=(',', ':'), allow_nan=False)
+
+def from_json(text: str,
+              Quantity) -> RangeValue:
+    """
+    Deserializes a RangeValue from its canonical JSON form.
+    :param text: The JSON object string.
+    :param Quantity: The Quantity class to build the value with (e.g. NumParser().Quantity).
+    :return: The decoded RangeValue.
+    """
+
+    data = json.loads(text)
+    units = key_to_units(data['unit'], Quantity._REGISTRY)
+    return RangeValue(Quantity(_decode_magnitude(data['min']), units), Quantity(_decode_magnitude(data['max']), units))
+
+def encode_json_lines(values: Iterable[RangeValue],
+                      stream: TextIO) -> None:
+    """
+    Writes a sequence of RangeValues to a text stream, one canonical JSON object per line.
+    :param values: The RangeValues to encode.
+    :param stream: A text file-like object to write to.
+    """
+
+    for value in values:
+        stream.write(to_json(value))
+        stream.write('\n')
+
+def decode_json_lines(stream: TextIO,
+                      Quantity) -> Iterator[RangeValue]:
+    """
+    Reads RangeValues back from a text stream written by encode_json_lines, one line at a time.
+    :param stream: A text file-like object to read from.
+    :param Quantity: The Quantity class to build the values with (e.g. NumParser().Quantity).
+    :return: An iterator over the decoded RangeValues.
+    """
+
+    for line in stream:
+        if line.strip():
+            yield from_json(line, Quantity)
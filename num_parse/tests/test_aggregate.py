@@ -0,0 +1,68 @@
+import operator
+import unittest
+from functools import reduce
+from pint import DimensionalityError
+from num_parse.NumParser import NumParser
+from num_parse.RangeValue import RangeValue
+from num_parse import aggregate
+
+class TestAggregate(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.Q_ = self.num_parser.Quantity
+
+    def parse_all(self, strings):
+        return [self.num_parser.parse_num(s) for s in strings]
+
+    def test_sum_matches_addition(self):
+        values = self.parse_all(['1 m', '50 cm', 'four', '2 to 3 inches'])
+        self.assertEqual(aggregate.total(values), reduce(operator.add, values))
+
+    def test_sum_durations(self):
+        values = self.parse_all(['2 hours', '30 minutes', '15 seconds'])
+        self.assertEqual(aggregate.total(values, unit='seconds'), RangeValue(self.Q_(9015, 'seconds')))
+
+    def test_sum_unitless_keeps_ints(self):
+        self.assertEqual(str(aggregate.total(self.parse_all(['1', '2', 'three']))), '6')
+
+    def test_large_ints(self):
+        # Integers stay exact past the range of int64
+        values = [RangeValue(self.Q_(2**63)), RangeValue(self.Q_(2**62), self.Q_(2**64))]
+        total = aggregate.total(values)
+        self.assertEqual((total.min_val.m, total.max_val.m), (2**63 + 2**62, 2**63 + 2**64))
+        self.assertIs(type(total.min_val.m), int)
+        self.assertEqual(aggregate.maximum(values).max_val.m, 2**64)
+        self.assertEqual(aggregate.total([RangeValue(self.Q_(2**62))] * 2).min_val.m, 2**63)
+
+    def test_builtins_not_shadowed(self):
+        namespace = {}
+        exec('from num_parse.aggregate import *', namespace)
+        self.assertNotIn('sum', namespace)
+        self.assertIn('total', namespace)
+
+    def test_mean(self):
+        self.assertEqual(aggregate.mean(self.parse_all(['1 m', '50 cm'])), RangeValue(self.Q_(0.75, 'm')))
+
+    def test_min_max(self):
+        values = self.parse_all(['1 to 2 m', '5 m', '20 cm'])
+        self.assertEqual(aggregate.minimum(values), RangeValue(self.Q_(0.2, 'm')))
+        self.assertEqual(aggregate.maximum(values), RangeValue(self.Q_(5, 'm')))
+
+    def test_span(self):
+        self.assertEqual(aggregate.span(self.parse_all(['1 to 2 m', '5 m', '300 cm'])),
+                         RangeValue(self.Q_(1, 'm'), self.Q_(5, 'm')))
+
+    def test_min_offset_units(self):
+        values = [RangeValue(self.Q_(5, 'degF')), RangeValue(self.Q_(0, 'degC'))]
+        self.assertEqual(aggregate.minimum(values), RangeValue(self.Q_(5, 'degF')))
+
+    def test_grouped(self):
+        totals = aggregate.total(self.parse_all(['1 m', '2 kg', '300 cm', '4 kg']), grouped=True)
+        self.assertEqual(len(totals), 2)
+        self.assertEqual(totals[self.Q_(1, 'm').dimensionality], RangeValue(self.Q_(4, 'm')))
+        self.assertEqual(totals[self.Q_(1, 'kg').dimensionality], RangeValue(self.Q_(6, 'kg')))
+
+    def test_errors(self):
+        self.assertRaises(ValueError, aggregate.total, [])
+        self.assertRaises(DimensionalityError, aggregate.total, self.parse_all(['1 m', '2 kg']))
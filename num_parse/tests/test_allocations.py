@@ -0,0 +1,72 @@
+import tracemalloc
+import unittest
+from unittest import mock
+from num_parse.NumParser import NumParser
+from num_parse.allocations import AllocationProfiler, registry_sizes
+from num_parse.corpus import CorpusGenerator
+
+# The most memory a single parse may hold on top of what was allocated before it. Parsing currently peaks at 4-8 KB.
+PEAK_BUDGET = 16 * 1024
+# The memory a single parse may leave allocated
+RETAINED_BUDGET = 256
+# The memory a long run of parses of the same inputs may keep allocated, per parse
+GROWTH_BUDGET = 64
+
+CATEGORIES = {
+    'raw_numeric': ['112', '1,000,000', '3.14159'],
+    'number_words': ['one hundred and forty two', 'two million three thousand and nineteen'],
+    'ranges': ['five to 10', 'between 5 and 10', '5 to 10 million'],
+    'units': ['five meters', '10 degrees Celsius', '2 kips per square inch'],
+    'compound_durations': ['2 hours 30 minutes and 15 seconds', '1:02:03'],
+    'errors': ['the cat sat on the mat', 'kg'],
+}
+
+class TestAllocations(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.profiler = AllocationProfiler(self.num_parser)
+
+    def test_budgets(self):
+        for category, stats in self.profiler.profile_categories(CATEGORIES, repeat=20).items():
+            self.assertLess(stats.peak_bytes, PEAK_BUDGET, category)
+            # Once warmed up, parsing keeps (next to) nothing allocated. Bounded caches of pint and the interpreter
+            # keep a few small strings of the first few hundred calls, which the budget allows for.
+            self.assertLess(stats.retained_bytes, RETAINED_BUDGET, category)
+
+    def test_without_reset_peak(self):
+        # Python 3.7 and 3.8 have no tracemalloc.reset_peak
+        expected = self.profiler.profile_input('5 to 10 kg', repeat=5)
+        with mock.patch.dict(tracemalloc.__dict__):
+            del tracemalloc.reset_peak
+            stats = self.profiler.profile_input('5 to 10 kg', repeat=5)
+            tracemalloc.start()
+            try:
+                self.assertRaises(RuntimeError, self.profiler.profile_input, '5 to 10 kg')
+            finally:
+                tracemalloc.stop()
+        self.assertLess(stats.peak_bytes, PEAK_BUDGET)
+        self.assertLess(abs(stats.peak_bytes - expected.peak_bytes), 1024)
+        self.assertLess(stats.retained_bytes, RETAINED_BUDGET)
+
+    def test_registry_growth(self):
+        before = registry_sizes(self.num_parser)
+        self.num_parser.parse_num('5 kilofeet')
+        after = registry_sizes(self.num_parser)
+        # Looking up a prefixed unit inserts its definition into the registry, once
+        self.assertEqual(after['units'], before['units'] + 1)
+        self.num_parser.parse_num('7 kilofeet')
+        self.assertEqual(registry_sizes(self.num_parser)['units'], after['units'])
+
+    def test_steady_state(self):
+        texts = [record['text'] for record in CorpusGenerator(self.num_parser, seed=4).generate(100)]
+        self.profiler.track_growth(texts)
+        samples = self.profiler.track_growth(texts * 3, every=100)
+        self.assertEqual([sample.parses for sample in samples], [0, 100, 200, 300])
+        # Parsing the same inputs again neither grows the registry nor keeps more than a few bytes per parse allocated
+        # (the interpreter holds on to the odd string re.sub returns to normalize_input, about 10 bytes per parse)
+        self.assertEqual(samples[0].registry, samples[-1].registry)
+        self.assertLess((samples[-1].traced_bytes - samples[1].traced_bytes) / 200, GROWTH_BUDGET)
+
+if __name__ == '__main__':
+    unittest.main()
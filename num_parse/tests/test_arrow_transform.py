@@ -0,0 +1,71 @@
+import subprocess
+import sys
+import unittest
+from unittest import mock
+from num_parse.NumParser import NumParser
+
+try:
+    import pyarrow as pa
+    from num_parse.arrow_transform import PARSED_TYPE, parse_array, transform_batch, transform_batches
+except ImportError:
+    pa = None
+
+class TestOptionalImport(unittest.TestCase):
+
+    def test_core_without_pyarrow(self):
+        # Blocking pyarrow makes importing it fail, as if it were not installed
+        code = 'import sys; sys.modules["pyarrow"] = None; ' \
+               'import num_parse, num_parse.columns, num_parse.serialization; from num_parse.NumParser import NumParser; ' \
+               'print(NumParser().parse_num("5 kg"), "num_parse.arrow_transform" in sys.modules)'
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), '5 kilogram False')
+
+@unittest.skipIf(pa is None, 'pyarrow is not installed')
+class TestArrowTransform(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.texts = ['5 kg', '2 to 3 in', None, 'the cat sat', '5 kg', '$3M']
+
+    def test_transform_batch(self):
+        batch = pa.record_batch({'id': list(range(len(self.texts))), 'weight': self.texts})
+        result = transform_batch(batch, 'weight', self.num_parser)
+        self.assertEqual(result.schema.names, ['id', 'weight', 'weight_parsed'])
+        self.assertEqual(result.schema.field('weight_parsed').type, PARSED_TYPE)
+        structs = result.column(2).to_pylist()
+        self.assertEqual(structs[0], {'min': 5.0, 'max': 5.0, 'unit': 'kilogram', 'base_min': 5000.0, 'base_max': 5000.0, 'error': None})
+        self.assertEqual((structs[1]['min'], structs[1]['max'], structs[1]['unit']), (2.0, 3.0, 'inch'))
+        self.assertAlmostEqual(structs[1]['base_max'], 0.0762)
+        self.assertIsNone(structs[2])
+        self.assertEqual(structs[3], {'min': None, 'max': None, 'unit': None, 'base_min': None, 'base_max': None, 'error': 'ValueError'})
+        self.assertEqual(structs[4], structs[0])
+        self.assertEqual((structs[5]['min'], structs[5]['unit']), (3.0, 'dollar'))
+
+    def test_dictionary(self):
+        array = pa.array(self.texts * 10).dictionary_encode()
+        with mock.patch.object(self.num_parser, 'parse_num', wraps=self.num_parser.parse_num) as parse_num:
+            parsed = parse_array(self.num_parser, array)
+        self.assertEqual(parsed.to_pylist(), parse_array(self.num_parser, pa.array(self.texts * 10)).to_pylist())
+        # Once per dictionary entry, including the values parse_num rejects
+        self.assertEqual([call.args[0] for call in parse_num.call_args_list].count('the cat sat'), 1)
+        self.assertEqual([call.args[0] for call in parse_num.call_args_list].count('$3M'), 1)
+
+    def test_shared_dictionary(self):
+        # Batches that share a dictionary (like the batches of a Parquet row group) only parse its entries once
+        array = pa.array(self.texts * 10).dictionary_encode()
+        batches = [pa.record_batch({'weight': array.slice(0, 30)}), pa.record_batch({'weight': array.slice(30)})]
+        with mock.patch.object(self.num_parser, 'parse_num', wraps=self.num_parser.parse_num) as parse_num:
+            results = list(transform_batches(batches, 'weight', self.num_parser))
+        self.assertEqual([call.args[0] for call in parse_num.call_args_list].count('$3M'), 1)
+        self.assertEqual([value for batch in results for value in batch.column(1).to_pylist()],
+                         parse_array(self.num_parser, array).to_pylist())
+
+    def test_batches(self):
+        table = pa.table({'weight': pa.chunked_array([self.texts[:3], self.texts[3:]])})
+        batches = list(transform_batches(table.to_batches(), 'weight', self.num_parser, output='parsed'))
+        self.assertEqual([batch.num_rows for batch in batches], [3, 3])
+        chunked = parse_array(self.num_parser, table.column('weight'))
+        self.assertEqual([value for batch in batches for value in batch.column(1).to_pylist()], chunked.to_pylist())
+
+if __name__ == '__main__':
+    unittest.main()
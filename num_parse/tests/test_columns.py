@@ -0,0 +1,67 @@
+import random
+import unittest
+from num_parse.NumParser import NumParser
+from num_parse.RangeValue import RangeValue
+from num_parse.columns import infer_template, parse_column, signature
+
+class TestColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.Q_ = self.num_parser.Quantity
+        rnd = random.Random(0)
+        self.columns = {
+            'dose': ['{} mg'.format(rnd.randint(0, 2000)) for _ in range(50)],
+            'duration': ['{}.{} to {} hours'.format(rnd.randint(1, 9), rnd.randint(0, 9), rnd.randint(10, 20)) for _ in range(50)],
+            'price': ['${:,}'.format(rnd.randint(1, 99999)) for _ in range(50)],
+            'count': [str(rnd.randint(-500, 500)) for _ in range(50)],
+            'weight': ['between {} and {} kg'.format(rnd.randint(1, 9), rnd.randint(10, 99)) for _ in range(50)],
+        }
+
+    def assertSameValues(self, actual, expected):
+        self.assertEqual(len(actual), len(expected))
+        for lhs, rhs in zip(actual, expected):
+            if rhs is None:
+                self.assertIsNone(lhs)
+                continue
+            for left, right in ((lhs.min_val, rhs.min_val), (lhs.max_val, rhs.max_val)):
+                self.assertIs(type(left.magnitude), type(right.magnitude))
+                self.assertEqual((left.magnitude, left.units), (right.magnitude, right.units))
+
+    def parse_each(self, values):
+        results = []
+        for value in values:
+            try:
+                results.append(self.num_parser.parse_num(value))
+            except Exception:
+                results.append(None)
+        return results
+
+    def test_signature(self):
+        self.assertEqual(signature('5 to  10 mg'), ('', ' to ', ' mg'))
+        self.assertEqual(signature('$1,000'), ('$', ''))
+
+    def test_infer_template(self):
+        for name, values in self.columns.items():
+            template = infer_template(self.num_parser, values)
+            self.assertIsNotNone(template, name)
+        self.assertEqual(infer_template(self.num_parser, self.columns['dose']).unit_string, 'mg')
+        self.assertIsNone(infer_template(self.num_parser, ['5 mg', 'two hours', '3 to 4 kg', 'n/a']))
+
+    def test_same_as_parse_num(self):
+        extra = ['n/a', '5 kg', '007 mg', '1:30', '2 hours 30 minutes', '5 mg and 3 mg', '-12 mg', '1,500 mg', ' 7   mg ']
+        for name, values in self.columns.items():
+            column = values + extra
+            self.assertSameValues(parse_column(self.num_parser, column, errors='coerce'), self.parse_each(column))
+
+    def test_errors(self):
+        self.assertRaises(ValueError, parse_column, self.num_parser, self.columns['dose'] + ['n/a'])
+        self.assertEqual(parse_column(self.num_parser, ['5 mg', 'n/a'], errors='coerce')[1], None)
+        self.assertEqual(parse_column(self.num_parser, ['5 mg'])[0], RangeValue(self.Q_(5, 'mg')))
+        results = parse_column(self.num_parser, ['5 mg', 'n/a'], errors='return')
+        self.assertEqual(results[0], RangeValue(self.Q_(5, 'mg')))
+        self.assertIsInstance(results[1], ValueError)
+        self.assertRaises(ValueError, parse_column, self.num_parser, ['5 mg'], errors='ignore')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import random
+import shutil
+import string
+import tempfile
+import unittest
+from pathlib import Path
+from num_parse.NumParser import NumUnitRegistry
+from num_parse.unit_definitions.profiles import DEFAULT_UNITS_PATH, load_profile
+from num_parse.unit_definitions.compiled import artifact_path, compile_all, load_compiled
+
+class TestCompiledUnits(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path(tempfile.mkdtemp())
+        compile_all(directory=cls.tmp_dir)
+        cls.artifact = artifact_path(directory=cls.tmp_dir)
+        cls.profile_artifact = artifact_path('basic', cls.tmp_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def test_load(self):
+        compiled = load_compiled(artifact=self.artifact)
+        self.assertIsNotNone(compiled)
+        ureg = NumUnitRegistry(compiled)
+        text_ureg = NumUnitRegistry(str(DEFAULT_UNITS_PATH))
+        self.assertEqual(set(ureg._units), set(text_ureg._units))
+        self.assertEqual(ureg._unit_index, text_ureg._unit_index)
+        self.assertEqual(ureg.Quantity(1, 'mile').to('km').magnitude, text_ureg.Quantity(1, 'mile').to('km').magnitude)
+        self.assertEqual(ureg._dimension_index, text_ureg._dimension_index)
+
+    def test_profile(self):
+        compiled = load_compiled(artifact=self.profile_artifact, profile='basic')
+        self.assertIsNotNone(compiled)
+        ureg = NumUnitRegistry(compiled)
+        text_ureg = NumUnitRegistry(load_profile('basic'))
+        self.assertEqual(set(ureg._units), set(text_ureg._units))
+        self.assertEqual(ureg._unit_index, text_ureg._unit_index)
+        self.assertEqual(ureg._dimension_index, text_ureg._dimension_index)
+        self.assertNotIn('ampere', ureg._units)
+
+        # An artifact is only loaded for the profile it was compiled for
+        self.assertIsNone(load_compiled(artifact=self.profile_artifact))
+        self.assertIsNone(load_compiled(artifact=self.artifact, profile='basic'))
+        self.assertIsNotNone(load_compiled(artifact=self.artifact, profile='full'))
+        self.assertIsNone(load_compiled(artifact=self.artifact, profile=['length']))
+
+    def test_stale_artifact(self):
+        for name in ('basic_units.txt', 'constants_en.txt'):
+            shutil.copy(DEFAULT_UNITS_PATH.parent / name, self.tmp_dir / name)
+        self.assertIsNotNone(load_compiled(path=self.tmp_dir / 'basic_units.txt', artifact=self.artifact))
+
+        with open(self.tmp_dir / 'constants_en.txt', 'a') as f:
+            f.write('\nsmoot = 67 * inch\n')
+        self.assertIsNone(load_compiled(path=self.tmp_dir / 'basic_units.txt', artifact=self.artifact))
+
+    def test_missing_artifact(self):
+        self.assertIsNone(load_compiled(artifact=self.tmp_dir / 'missing.pickle'))
+
+    def test_has_unit_name(self):
+        ureg = NumUnitRegistry(load_compiled(artifact=self.artifact))
+        rnd = random.Random(0)
+        words = list(ureg._units) + ['kilometers', 'KM', 'ms', 'ss', 's', '', 'bananas', 'per'] + \
+                [''.join(rnd.choice(string.ascii_letters) for _ in range(rnd.randint(1, 5))) for _ in range(2000)]
+        for word in words:
+            for case_sensitive in (True, False):
+                self.assertEqual(ureg.has_unit_name(word, case_sensitive), bool(ureg.parse_unit_name(word, case_sensitive)), word)
+
+if __name__ == '__main__':
+    unittest.main()
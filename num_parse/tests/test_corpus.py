@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from num_parse.NumParser import NumParser
+from num_parse.corpus import CATEGORIES, CorpusGenerator, read_corpus
+
+class TestCorpus(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+
+    def test_reproducible(self):
+        first = list(CorpusGenerator(self.num_parser, seed=5).generate(200))
+        second = list(CorpusGenerator(self.num_parser, seed=5).generate(200))
+        other = list(CorpusGenerator(self.num_parser, seed=6).generate(200))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual({record['category'] for record in first}, set(CATEGORIES))
+
+    def test_mix(self):
+        records = list(CorpusGenerator(self.num_parser, mix={'unit': 3, 'junk': 1, 'range': 0}).generate(400))
+        self.assertEqual({record['category'] for record in records}, {'unit', 'junk'})
+        self.assertGreater(sum(record['category'] == 'unit' for record in records), 200)
+        with self.assertRaises(ValueError):
+            CorpusGenerator(self.num_parser, mix={'fractions': 1})
+        with self.assertRaises(ValueError):
+            CorpusGenerator(self.num_parser, mix={'unit': 0})
+
+    def test_write_and_read(self):
+        generator = CorpusGenerator(self.num_parser, seed=9)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'corpus.jsonl')
+            self.assertEqual(generator.write(path, 300), 300)
+            self.assertEqual(list(read_corpus(path)), list(CorpusGenerator(self.num_parser, seed=9).generate(300)))
+
+    def test_labels(self):
+        # The categories parse_num handles fully have to parse to their labels
+        mix = dict.fromkeys(('numeric', 'spelled', 'negative', 'unit', 'duration', 'junk'), 1)
+        for record in CorpusGenerator(self.num_parser, seed=3, mix=mix).generate(300):
+            if record['error']:
+                with self.assertRaises(Exception, msg=record['text']):
+                    self.num_parser.parse_num(record['text'])
+                continue
+            value = self.num_parser.parse_num(record['text'])
+            if record['unit'] is None:
+                self.assertAlmostEqual(value, record['min'], msg=record['text'])
+            else:
+                self.assertEqual(str(value.min_val.units), record['unit'], msg=record['text'])
+                self.assertAlmostEqual(value.min_val.m, record['min'], msg=record['text'])
+                self.assertAlmostEqual(value.max_val.m, record['max'], msg=record['text'])
+
+    def test_spell(self):
+        generator = CorpusGenerator(self.num_parser)
+        self.assertEqual(generator.spell(0), 'zero')
+        self.assertEqual(generator.spell(2000019), 'two million nineteen')
+        self.assertIn(generator.spell(142), ('one hundred forty two', 'one hundred and forty two'))
+
+if __name__ == '__main__':
+    unittest.main()
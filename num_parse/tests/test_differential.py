@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+from num_parse.NumParser import NumParser
+from num_parse.RangeValue import RangeValue
+from num_parse.corpus import CorpusGenerator
+from num_parse.differential import classify, classify_operators, compare_engines, default_engines, per_input
+from num_parse.reference import REFERENCE_OPERATORS, ReferenceNumParser, reference_range
+
+class TestDifferential(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.num_parser = NumParser()
+        cls.reference = ReferenceNumParser()
+
+    def test_reference_quirks(self):
+        # Multiplier distribution, the case insensitive unit fallback, "in" as inches and expected dimensionalities
+        for text, expect in (('5 to 10 million', None), ('2 M', None), ('4.5 million in total', None),
+                             ('5 m', '[time]'), ('2 hours 30 minutes', None), ('3:58', None), ('Between 5 and 10 Kg', None)):
+            self.assertIsNone(classify(self.reference.parse_num(text, expect), self.num_parser.parse_num(text, expect)), text)
+
+    def test_decimal_clock_durations(self):
+        # The reference reads these with the old ":" branch, NumParser with its clock expression or ":" fallback
+        for text in ('3.5:20', '1.5:20', '3:58.5', '0:45', 'five:20', '2 hours 30.5 minutes'):
+            self.assertIsNone(classify(self.reference.parse_num(text), self.num_parser.parse_num(text)), text)
+        self.assertEqual(str(self.reference.parse_num('3.5:20')), '230.0 second')
+
+    def test_generated_corpus(self):
+        records = CorpusGenerator(self.num_parser, seed=11).generate(150)
+        report = compare_engines(records, default_engines(self.num_parser), self.reference, batch_size=50)
+        self.assertEqual(report.records, 150)
+        self.assertTrue(report.agrees, report.summary())
+        self.assertEqual(set(report.throughput()), {'reference', 'parse_num', 'prefilter', 'columns'})
+
+    def test_divergences(self):
+        def broken(text, expect):
+            if text == 'five meters':
+                return self.num_parser.parse_num('five feet')
+            if text == 'six':
+                return self.num_parser.parse_num('6.0')
+            if text == 'the cat':
+                return self.num_parser.parse_num('0')
+            if text == '7 kg':
+                raise KeyError(text)
+            return self.num_parser.parse_num(text, expect)
+
+        records = [{'text': text} for text in ('five meters', 'six', 'the cat', '7 kg', 'eight')]
+        report = compare_engines(records, {'broken': per_input(broken)}, self.reference, max_divergences=2)
+        self.assertEqual(report.counts['broken'], {'exception': 2, 'unit': 1, 'value': 1, 'operator': 0})
+        self.assertEqual([divergence.kind for divergence in report.divergences['broken']], ['unit', 'value'])
+        self.assertFalse(report.agrees)
+        self.assertIn('broken', report.summary())
+        self.assertEqual(classify(ValueError(), ValueError('other message')), None)
+        self.assertEqual(classify(self.num_parser.parse_num('5'), ValueError()), 'exception')
+        self.assertEqual(classify(self.num_parser.parse_num('nan'), self.num_parser.parse_num('nan')), None)
+
+    def test_reference_operators(self):
+        Q_ = self.reference.Quantity
+        self.assertTrue(REFERENCE_OPERATORS['=='](reference_range(Q_(2, 'm')), reference_range(Q_(200, 'cm'))))
+        self.assertTrue(REFERENCE_OPERATORS['<'](reference_range(Q_(5, 'degF')), reference_range(Q_(2, 'degC'))))
+        self.assertFalse(REFERENCE_OPERATORS['>='](reference_range(Q_(1, 'm'), Q_(3, 'm')), reference_range(Q_(2, 'm'))))
+        with self.assertRaises(ValueError):
+            REFERENCE_OPERATORS['<'](reference_range(Q_(5, 'm')), 3)
+        self.assertIsNone(classify_operators((reference_range(Q_(5, 'm')), reference_range(Q_(2, 'kg'))),
+                                             (RangeValue(Q_(5, 'm')), RangeValue(Q_(2, 'kg')))))
+
+    def test_operator_divergences(self):
+        def sharing(text, expect):
+            value = self.num_parser.parse_num(text, expect)
+            if text == '5 meters':
+                # Built like RangeValue(Q_(5)) whose Quantity a later RangeValue gives units to
+                shared = self.num_parser.Quantity(5)
+                value = RangeValue(shared)
+                RangeValue(self.num_parser.Quantity(3, 'meter'), shared)
+            return value
+
+        records = [{'text': text} for text in ('500 cm', '5 meters', 'six', '2 km')]
+        report = compare_engines(records, {'sharing': per_input(sharing)}, self.reference)
+        self.assertTrue(report.agrees, report.summary())
+
+        # Without bringing the precomputed values up to date, the comparisons of the value are stale
+        with mock.patch.object(RangeValue, '_refresh', lambda value: None):
+            report = compare_engines(records, {'sharing': per_input(sharing)}, self.reference)
+        self.assertGreater(report.counts['sharing']['operator'], 0)
+        self.assertEqual(sum(report.counts['sharing'].values()), report.counts['sharing']['operator'])
+        divergence = report.divergences['sharing'][0]
+        self.assertEqual((divergence.kind, divergence.expected, divergence.actual), ('operator', True, False))
+        self.assertIn("'5 meters' == '500 cm'", repr(divergence))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import random
+import unittest
+from num_parse.NumParser import NumParser
+from num_parse.extraction import ExtractionSession
+
+class TestExtractionSession(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.text = "It weighs 5 kg.\nNothing here.\nIt takes 2 hours.\n"
+        self.session = ExtractionSession(self.num_parser, self.text)
+
+    def spans(self, spans):
+        return [(start, end, str(value)) for start, end, value in spans]
+
+    def assertMatchesFindNums(self):
+        self.assertEqual(self.spans(self.session.spans()), self.spans(self.num_parser.find_nums(self.session.text)))
+
+    def test_initial_spans(self):
+        self.assertEqual(self.spans(self.session.spans()), [(10, 14, '5 kilogram'), (39, 46, '2 hour')])
+
+    def test_changed(self):
+        changes = self.session.edit(10, 11, '6')
+        self.assertEqual(self.spans(change[0] for change in changes.changed), [(10, 14, '5 kilogram')])
+        self.assertEqual(self.spans(change[1] for change in changes.changed), [(10, 14, '6 kilogram')])
+        self.assertEqual(changes.added, [])
+        self.assertEqual(changes.removed, [])
+        self.assertMatchesFindNums()
+
+    def test_added_and_removed(self):
+        changes = self.session.edit(16, 29, 'It costs $11.')
+        self.assertEqual(self.spans(changes.added), [(25, 28, '11 dollar')])
+        self.assertFalse(changes.removed or changes.changed)
+
+        changes = self.session.edit(0, 16, '')
+        self.assertEqual(self.spans(changes.removed), [(10, 14, '5 kilogram')])
+        self.assertFalse(changes.added or changes.changed)
+        self.assertMatchesFindNums()
+
+    def test_moved_spans_not_reported(self):
+        self.assertFalse(self.session.edit(0, 0, 'Intro line.\n'))
+        self.assertMatchesFindNums()
+
+    def test_update(self):
+        changes = self.session.update(self.text.replace('2 hours', 'two to three hours'))
+        self.assertEqual(self.spans(change[1] for change in changes.changed), [(39, 57, '2 to 3 hour')])
+        self.assertMatchesFindNums()
+
+    def test_random_edits(self):
+        pieces = ['5 kg ', 'two to three hours', '\n', 'the cat ', ' and ', '1,000', 'x', '12 ', 'min', '\n\n']
+        rnd = random.Random(0)
+        for _ in range(200):
+            start = rnd.randint(0, len(self.session.text))
+            end = min(len(self.session.text), start + rnd.choice([0, 1, 2, 10]))
+            self.session.edit(start, end, ''.join(rnd.choice(pieces) for _ in range(rnd.randint(0, 2))))
+            self.assertMatchesFindNums()
+
+    def test_segments_reused(self):
+        scanned = []
+        scan_segment = self.num_parser.scan_segment
+        self.num_parser.scan_segment = lambda segment, offset=0: scanned.append(segment) or scan_segment(segment, offset)
+        self.session.edit(10, 11, '6')
+        self.session.edit(10, 11, '5')
+        self.assertEqual(scanned, ['It weighs 6 kg.\n'])
+
+if __name__ == '__main__':
+    unittest.main()
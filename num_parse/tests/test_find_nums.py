@@ -0,0 +1,61 @@
+import unittest
+from num_parse.NumParser import NumParser, MAX_SEGMENT_LENGTH
+from num_parse.RangeValue import RangeValue
+
+class TestFindNums(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.Q_ = self.num_parser.Quantity
+        self.text = "It weighs 5 kg and takes between two and three hours.\n" \
+                    "We paid $11 for 1,000 widgets, or 4.5 million total.\n" \
+                    "Nothing to see here.\n" \
+                    "The run lasted 2 hours, 30 minutes and 15 seconds over one hundred and thirty-five ft.\n"
+
+    def test_find_nums(self):
+        spans = [(self.text[start:end], value) for start, end, value in self.num_parser.find_nums(self.text)]
+        self.assertEqual(spans, [
+            ('5 kg', RangeValue(self.Q_(5, 'kg'))),
+            ('between two and three hours', RangeValue(self.Q_(2, 'hours'), self.Q_(3, 'hours'))),
+            ('$11', RangeValue(self.Q_(11, 'dollars'))),
+            ('1,000', RangeValue(self.Q_(1000))),
+            ('4.5 million', RangeValue(self.Q_(4500000))),
+            ('2 hours, 30 minutes and 15 seconds', RangeValue(self.Q_(9015, 'seconds'))),
+            ('one hundred and thirty-five ft', RangeValue(self.Q_(135, 'ft'))),
+        ])
+
+    def test_function_words(self):
+        # Function words that also name units are not read as the units of the numbers before them
+        text = "We met 20 at the station.\nThe bus leaves at 10:30 am.\nHe ran 20 minutes, 3 a day, 10 km as usual."
+        self.assertEqual([text[start:end] for start, end, _ in self.num_parser.find_nums(text)],
+                         ['20', '10:30', '20 minutes', '3', '10 km'])
+
+    def test_inches(self):
+        # "in" after a number is read as an inch, like parse_num does
+        text = "Use 12 in pipe for the 2 to 3 in gaps."
+        spans = [(text[start:end], value) for start, end, value in self.num_parser.find_nums(text)]
+        self.assertEqual(spans, [('12 in', self.num_parser.parse_num('12 in pipe')), ('2 to 3 in', self.num_parser.parse_num('2 to 3 in'))])
+        self.assertEqual(str(spans[0][1]), '12 inch')
+
+    def test_matches_parse_num(self):
+        for start, end, value in self.num_parser.find_nums(self.text):
+            self.assertEqual(value, self.num_parser.parse_num(self.text[start:end]))
+
+    def test_no_numbers(self):
+        self.assertEqual(list(self.num_parser.find_nums("Nothing to see here, and nothing to parse either.")), [])
+        self.assertEqual(list(self.num_parser.find_nums("")), [])
+
+    def test_streamed_chunks(self):
+        document = self.text * 50
+        expected = [(start, end) for start, end, _ in self.num_parser.find_nums(document)]
+        chunks = (document[i:i + 7] for i in range(0, len(document), 7))
+        self.assertEqual([(start, end) for start, end, _ in self.num_parser.find_nums(chunks)], expected)
+
+    def test_long_line(self):
+        document = "a line of 5 kg " * (MAX_SEGMENT_LENGTH // 10)
+        spans = list(self.num_parser.find_nums(document))
+        self.assertEqual(len(spans), MAX_SEGMENT_LENGTH // 10)
+        self.assertTrue(all(document[start:end] == '5 kg' for start, end, _ in spans))
+
+if __name__ == '__main__':
+    unittest.main()
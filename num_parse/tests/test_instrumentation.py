@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+from num_parse.NumParser import NumParser
+from num_parse.corpus import read_corpus
+from num_parse.instrumentation import STAGES, Instrumentation, SlowInputLog
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.profiles = []
+        self.instrumentation = Instrumentation(self.profiles.append)
+        self.num_parser.set_instrumentation(self.instrumentation)
+
+    def test_stages(self):
+        self.assertEqual(self.num_parser.parse_num('between two and three hours'), self.num_parser.parse_num('2 to 3 hours'))
+        snapshot = self.instrumentation.snapshot()
+        self.assertEqual(snapshot['parses'], 2)
+        self.assertEqual(snapshot['errors'], 0)
+        self.assertEqual(set(snapshot['stages']), set(STAGES))
+        for stage in STAGES:
+            self.assertGreater(snapshot['stages'][stage]['calls'], 0, stage)
+        self.assertEqual(snapshot['max_depth'], 2)
+        self.assertGreater(snapshot['unit_lookups'], 0)
+        self.assertAlmostEqual(snapshot['seconds'], sum(profile.seconds for profile in self.profiles))
+
+    def test_profiles(self):
+        self.num_parser.parse_num('12')
+        with self.assertRaises(ValueError):
+            self.num_parser.parse_num('the cat sat')
+        number, junk = self.profiles
+        self.assertEqual((number.input, number.error, number.depth), ('12', None, 1))
+        self.assertEqual(number.stages['make_value'][0], 1)
+        self.assertNotIn('parse_num.recursive', number.stages)
+        self.assertEqual((junk.input, junk.error), ('the cat sat', 'ValueError'))
+        self.assertEqual(self.instrumentation.snapshot()['errors'], 1)
+
+    def test_detach(self):
+        self.num_parser.set_instrumentation(None)
+        self.assertNotIn('parse_num', vars(self.num_parser))
+        self.assertNotIn('has_unit_name', vars(self.num_parser.ureg))
+        self.num_parser.parse_num('5 meters')
+        self.assertEqual(self.profiles, [])
+
+        self.num_parser.set_instrumentation(self.instrumentation)
+        self.instrumentation.reset()
+        self.num_parser.parse_num('5 meters')
+        self.assertEqual(self.instrumentation.snapshot()['parses'], 1)
+
+class FakeClock(object):
+    """
+    A clock that only moves when the first normalize_input of a top-level parse_num call runs, by the duration given
+    for that call, so the call and that stage take exactly that long.
+    """
+
+    def __init__(self, num_parser):
+        self.now = 0
+        self.pending = 0
+        normalize_input = num_parser.normalize_input
+
+        def slow_normalize_input(number_string):
+            self.now += self.pending
+            self.pending = 0
+            return normalize_input(number_string)
+
+        num_parser.normalize_input = slow_normalize_input
+
+    def __call__(self):
+        return self.now
+
+class TestSlowInputLog(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.clock = FakeClock(self.num_parser)
+        self.log = SlowInputLog(size=3, clock=self.clock)
+        self.num_parser.set_instrumentation(self.log)
+        inputs = ['1', '2', 'five meters', '2 hours 30 minutes and 15 seconds', 'between two and three hours', '3',
+                  'the cat sat']
+        for text, duration in zip(inputs, [1, 2, 5, 8, 9, 1, 7]):
+            self.clock.pending = duration
+            try:
+                self.num_parser.parse_num(text)
+            except ValueError:
+                pass
+
+    def test_slowest(self):
+        entries = self.log.entries()
+        # Only top-level calls are logged, not the sides of ranges
+        self.assertEqual([(entry.input, entry.seconds, entry.error) for entry in entries],
+                         [('between two and three hours', 9, None), ('2 hours 30 minutes and 15 seconds', 8, None),
+                          ('the cat sat', 7, 'ValueError')])
+        ranges = entries[0]
+        self.assertEqual(ranges.depth, 2)
+        self.assertIn('get_number_range', ranges.stages)
+        self.assertGreater(ranges.unit_lookups, 0)
+        # The stages are those of the call that was kept, which spent its time normalizing the input
+        for entry in entries:
+            self.assertEqual(entry.stages['normalize_input'][1], entry.seconds)
+            self.assertEqual(entry.stages['tokenize'][1], 0)
+
+    def test_slowest_call(self):
+        # An input that is slow again is kept once, with the time and stages of its slowest call
+        self.clock.pending = 20
+        self.num_parser.parse_num('between two and three hours')
+        self.clock.pending = 10
+        self.num_parser.parse_num('between two and three hours')
+        entries = self.log.entries()
+        self.assertEqual([(entry.input, entry.seconds) for entry in entries],
+                         [('between two and three hours', 20), ('2 hours 30 minutes and 15 seconds', 8),
+                          ('the cat sat', 7)])
+        self.assertEqual(entries[0].stages['normalize_input'][1], 20)
+
+    def test_dump(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'slow.jsonl')
+            self.assertEqual(self.log.dump(path), 3)
+            records = list(read_corpus(path))
+        self.assertEqual([record['text'] for record in records], [entry.input for entry in self.log.entries()])
+        for record in records:
+            self.assertIn('normalize_input', record['stages'])
+            if record['error'] is None:
+                self.num_parser.parse_num(record['text'], record['expect'])
+
+    def test_without_breakdown(self):
+        log = SlowInputLog(size=2, breakdown=False)
+        self.num_parser.set_instrumentation(log)
+        self.assertEqual(set(vars(self.num_parser)) & {'split_words', 'has_unit_word', 'make_value'}, set())
+        with self.assertRaises(ValueError):
+            self.num_parser.parse_num('the cat sat')
+        self.num_parser.parse_num('5')
+        self.assertEqual(sorted(entry.input for entry in log.entries()), ['5', 'the cat sat'])
+        self.assertEqual([entry.error for entry in log.entries() if entry.input == 'the cat sat'], ['ValueError'])
+        self.assertTrue(all(entry.stages == {} for entry in log.entries()))
+        self.assertEqual(len(self.log), 3)
+
+if __name__ == '__main__':
+    unittest.main()
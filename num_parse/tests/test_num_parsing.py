@@ -1,4 +1,5 @@
 import unittest
+from datetime import timedelta
 from num_parse.NumParser import NumParser
 from num_parse.RangeValue import RangeValue
 
@@ -359,6 +360,25 @@ class TestNumParse(unittest.TestCase):
         rv = RangeValue(self.Q_(238, 'seconds'))
         self.assertEqual(self.num_parser.parse_num('3:58'), rv)
 
+    def test_clock_duration(self):
+        self.assertEqual(self.num_parser.parse_num('1:02:03'), RangeValue(self.Q_(3723, 'seconds')))
+        self.assertEqual(self.num_parser.parse_num('01:30'), RangeValue(self.Q_(90, 'seconds')))
+        self.assertEqual(self.num_parser.parse_num('2:05 hours'), RangeValue(self.Q_(125, 'minutes')))
+
+    def test_decimal_clock_duration(self):
+        # A decimal leading field is read as minutes, as it always was
+        self.assertEqual(self.num_parser.parse_num('3.5:20'), RangeValue(self.Q_(230, 'seconds')))
+        self.assertEqual(self.num_parser.parse_num('1.5:20'), RangeValue(self.Q_(110, 'seconds')))
+        self.assertEqual(self.num_parser.duration_seconds('3.5:20'), 230)
+
+    def test_duration_seconds(self):
+        self.assertEqual(self.num_parser.duration_seconds('2 hours 30 minutes and 15 seconds'), 9015)
+        self.assertEqual(self.num_parser.duration_seconds('1:02:03'), 3723)
+        self.assertEqual(self.num_parser.duration_seconds('ninety minutes'), 5400)
+        self.assertEqual(self.num_parser.parse_timedelta('1 day and 2 hours'), timedelta(hours=26))
+        self.assertRaises(ValueError, self.num_parser.duration_seconds, 'five apples')
+        self.assertRaises(ValueError, self.num_parser.duration_seconds, '5 to 10 minutes')
+
     #######################################################
     # Combination tests
     #######################################################
@@ -405,6 +425,28 @@ class TestNumParse(unittest.TestCase):
         self.assertEqual(self.num_parser.parse_num("$519.2–520.9 million"),
                          RangeValue(self.Q_(519200000, 'dollar'), self.Q_(520900000, 'dollar')))
 
+    #######################################################
+    # Dimension-constrained tests
+    #######################################################
+
+    def test_expect_dimension(self):
+        self.assertEqual(self.num_parser.parse_num("5 min", expect='[time]'), RangeValue(self.Q_(5, 'minutes')))
+        self.assertEqual(self.num_parser.parse_num("3 in", expect='[length]'), RangeValue(self.Q_(3, 'inches')))
+        self.assertEqual(self.num_parser.parse_num("5 to 10 ft", expect='[length]'),
+                         RangeValue(self.Q_(5, 'feet'), self.Q_(10, 'feet')))
+        self.assertEqual(self.num_parser.parse_num("60 mph", expect='[length] / [time]'), RangeValue(self.Q_(60, 'mph')))
+        self.assertEqual(self.num_parser.parse_num("2 hours 30 minutes", expect='[time]'), RangeValue(self.Q_(150, 'minutes')))
+        self.assertEqual(self.num_parser.parse_num("3:58", expect='[time]'), RangeValue(self.Q_(238, 'seconds')))
+
+    def test_expect_other_dimension(self):
+        self.assertEqual(self.num_parser.parse_num("5 m", expect='[time]'), RangeValue(self.Q_(5)))
+        self.assertEqual(self.num_parser.parse_num("10 s", expect='[length]'), RangeValue(self.Q_(10)))
+
+    def test_dimension_index(self):
+        self.assertIn('hour', self.num_parser.time_units)
+        self.assertIn('feet', self.num_parser.ureg.get_units_for_dimension('[length]'))
+        self.assertNotIn('meter', self.num_parser.time_units)
+
 
     #######################################################
     # TODO: More involved strings (e.g. "It has a value between five to ten")
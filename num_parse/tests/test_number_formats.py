@@ -0,0 +1,50 @@
+import unittest
+from num_parse.NumParser import NumParser
+from num_parse.RangeValue import RangeValue
+from num_parse.columns import parse_column
+from num_parse.number_formats import NUMBER_FORMATS, detect_number_format, get_number_format
+
+class TestNumberFormats(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.Q_ = self.num_parser.Quantity
+
+    def test_european(self):
+        eu = NUMBER_FORMATS['eu']
+        self.assertEqual(eu.to_american('1.234,5 kg'), '1234.5 kg')
+        self.assertEqual(eu.to_american('12,5 kg'), '12.5 kg')
+        self.assertEqual(eu.to_american('1 234,5 kg'), '1234.5 kg')
+        self.assertEqual(eu.to_american('1 234 567'), '1234567')
+        self.assertEqual(eu.to_american('between 2,5 and 3,75 m'), 'between 2.5 and 3.75 m')
+        self.assertEqual(self.num_parser.parse_num(eu.to_american('12,5 kg')), RangeValue(self.Q_(12.5, 'kg')))
+
+    def test_indian(self):
+        indian = NUMBER_FORMATS['in']
+        self.assertEqual(indian.to_american('2.5 lakh'), '250000')
+        self.assertEqual(indian.to_american('3 Crores'), '30000000')
+        self.assertEqual(self.num_parser.parse_num(indian.to_american('12,34,567.5')), 1234567.5)
+
+    def test_american_unchanged(self):
+        text = '1,234.5 kg'
+        self.assertIs(NUMBER_FORMATS['en'].to_american(text), text)
+
+    def test_detect(self):
+        self.assertEqual(detect_number_format(['1.234,5 kg', '12,5 kg', '3 kg']).name, 'eu')
+        self.assertEqual(detect_number_format(['1 234 kg', '3 kg']).name, 'eu')
+        self.assertEqual(detect_number_format(['1,234.5', '3.25']).name, 'en')
+        self.assertEqual(detect_number_format(['12,34,567', '5 lakh']).name, 'in')
+        # Ambiguous values keep the American default
+        self.assertEqual(detect_number_format(['1,234', '5', 'n/a']).name, 'en')
+
+    def test_unknown_format(self):
+        self.assertRaises(ValueError, get_number_format, 'xx')
+
+    def test_parse_column(self):
+        values = ['1.234,5 kg', '12,5 kg', '3 kg', '7,25 kg']
+        self.assertEqual(parse_column(self.num_parser, values, number_format='detect'),
+                         [RangeValue(self.Q_(magnitude, 'kg')) for magnitude in (1234.5, 12.5, 3, 7.25)])
+        self.assertEqual(parse_column(self.num_parser, ['1,234 kg', '5 kg']), parse_column(self.num_parser, ['1,234 kg', '5 kg'], number_format='detect'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import unittest
+from unittest import mock
+from num_parse.NumParser import NumParser
+
+try:
+    import numpy as np
+    import pandas as pd
+    import num_parse.pandas_accessor
+except ImportError:
+    pd = None
+
+class TestOptionalImport(unittest.TestCase):
+
+    def test_core_without_pandas(self):
+        # Blocking pandas makes importing it fail, as if it were not installed
+        code = 'import sys; sys.modules["pandas"] = None; ' \
+               'import num_parse, num_parse.columns, num_parse.aggregate; from num_parse.NumParser import NumParser; ' \
+               'print(NumParser().parse_num("5 kg"), "num_parse.pandas_accessor" in sys.modules)'
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), '5 kilogram False')
+
+@unittest.skipIf(pd is None, 'pandas is not installed')
+class TestPandasAccessor(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.series = pd.Series(['5 kg', '2 to 3 m', '5 kg', None, 'the cat sat', 7, '5 kg'], index=list('abcdefg'), name='weight')
+
+    def test_parse(self):
+        frame = self.series.num.parse(self.num_parser, errors='coerce')
+        self.assertEqual(list(frame.index), list(self.series.index))
+        self.assertEqual(str(frame['min'].dtype), 'float64')
+        self.assertEqual(str(frame['unit'].dtype), 'category')
+        np.testing.assert_array_equal(frame['min'], [5, 2, 5, np.nan, np.nan, 7, 5])
+        np.testing.assert_array_equal(frame['max'], [5, 3, 5, np.nan, np.nan, 7, 5])
+        self.assertEqual(frame['unit'].tolist(), ['kilogram', 'meter', 'kilogram', np.nan, np.nan, 'dimensionless', 'kilogram'])
+
+    def test_parse_once(self):
+        with mock.patch.object(self.num_parser, 'parse_num', wraps=self.num_parser.parse_num) as parse_num:
+            self.series.num.parse(self.num_parser, errors='coerce')
+        inputs = [call.args[0] for call in parse_num.call_args_list]
+        self.assertEqual(inputs.count('5 kg'), 1)
+        self.assertEqual(inputs.count(7), 1)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            self.series.num.parse(self.num_parser)
+        with self.assertRaises(ValueError):
+            self.series.num.parse(self.num_parser, errors='ignore')
+        self.assertEqual(len(self.series.iloc[:3].num.parse(self.num_parser)), 3)
+
+    def test_parse_array(self):
+        values = self.series.num.parse_array(self.num_parser, errors='coerce')
+        self.assertEqual(str(values.dtype), 'range')
+        self.assertEqual(values.name, 'weight')
+        self.assertEqual(values.isna().tolist(), [False, False, False, True, True, False, False])
+        self.assertEqual(values['a'], self.num_parser.parse_num('5 kg'))
+        self.assertEqual(values.iloc[1], self.num_parser.parse_num('2 to 3 m'))
+        self.assertEqual(len(values.dropna()), 5)
+        self.assertEqual(len(pd.concat([values, values])), 14)
+
+if __name__ == '__main__':
+    unittest.main()
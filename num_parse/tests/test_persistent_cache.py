@@ -0,0 +1,88 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest import mock
+from num_parse.NumParser import NumParser
+from num_parse.persistent_cache import PersistentCache
+
+INPUTS = ['5 to 10 kg', 'two hundred and five', '1.5 m', '$3M', '3:58', '20 degrees Celsius']
+
+def parse_inputs(path):
+    # Run in other processes, all writing to the same database
+    with PersistentCache(NumParser(), path, flush_every=7) as cache:
+        for idx in range(50):
+            cache.parse_num('{} kg'.format(idx))
+        return cache.misses
+
+class TestPersistentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache.sqlite')
+        self.num_parser = NumParser()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        with PersistentCache(self.num_parser, self.path) as cache:
+            expected = [cache.parse_num(text) for text in INPUTS]
+            self.assertEqual(cache.misses, len(INPUTS))
+        with PersistentCache(self.num_parser, self.path) as cache:
+            with mock.patch.object(self.num_parser, 'parse_num') as parse_num:
+                # The inputs are looked up normalized
+                values = [cache.parse_num(' {} '.format(text)) for text in INPUTS]
+            parse_num.assert_not_called()
+            self.assertEqual(cache.hits, len(INPUTS))
+        for value, expected_value in zip(values, expected):
+            self.assertEqual(value, expected_value)
+            self.assertIs(type(value.min_val.m), type(expected_value.min_val.m))
+
+    def test_errors(self):
+        with PersistentCache(self.num_parser, self.path, flush_every=1) as cache:
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    cache.parse_num('the cat sat')
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            # Inputs of another expected dimensionality are cached separately
+            self.assertEqual(cache.parse_num('5 m', expect='[time]'), self.num_parser.parse_num('5'))
+            self.assertEqual(cache.parse_num('5 m'), self.num_parser.parse_num('5 m'))
+
+    def test_invalidation(self):
+        with PersistentCache(self.num_parser, self.path) as cache:
+            cache.parse_num('5 servings')
+            fingerprint = cache.fingerprint
+            # Registering units changes the fingerprint, so results parsed without them are not read back
+            self.num_parser.register_units('serving = [serving] = servings')
+            self.assertNotEqual(cache.fingerprint, fingerprint)
+            self.assertEqual(str(cache.parse_num('5 servings')), '5 serving')
+            self.assertEqual(cache.hits, 0)
+
+        # As does editing the unit definition files or the lexicon
+        with mock.patch('num_parse.persistent_cache.source_digests', return_value={'basic_units.txt': '0'}):
+            self.assertNotEqual(PersistentCache(self.num_parser, self.path).fingerprint, fingerprint)
+        num_parser = NumParser()
+        num_parser.multipliers = num_parser.multipliers + ['quadrillion']
+        self.assertNotEqual(PersistentCache(num_parser, self.path).fingerprint, PersistentCache(NumParser(), self.path).fingerprint)
+
+    def test_eviction(self):
+        with PersistentCache(self.num_parser, self.path, max_entries=20, flush_every=5) as cache:
+            for idx in range(100):
+                cache.parse_num('{} m'.format(idx))
+            self.assertLessEqual(len(cache), 20)
+            # The least recently used entries go first
+            cache.parse_num('99 m')
+            self.assertEqual(cache.hits, 1)
+
+    def test_processes(self):
+        with multiprocessing.get_context('spawn').Pool(3) as pool:
+            misses = pool.map(parse_inputs, [self.path] * 3)
+        self.assertGreaterEqual(sum(misses), 50)
+        with PersistentCache(self.num_parser, self.path) as cache:
+            self.assertEqual(len(cache), 50)
+            self.assertEqual(str(cache.parse_num('49 kg')), '49 kilogram')
+            self.assertEqual(cache.hits, 1)
+
+if __name__ == '__main__':
+    unittest.main()
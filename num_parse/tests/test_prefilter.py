@@ -0,0 +1,40 @@
+import random
+import unittest
+from num_parse.NumParser import NumParser
+
+class TestPrefilter(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+
+    def accepts(self, text):
+        try:
+            self.num_parser.parse_num(text)
+            return True
+        except Exception:
+            return False
+
+    def test_numbers(self):
+        for text in ['5 kg', 'twenty three', 'Hundred', '3:58', 'nan', '$11', '-4.5 million', 'one hundred and five']:
+            self.assertTrue(self.num_parser.may_contain_number(text), text)
+
+    def test_no_numbers(self):
+        for text in ['the cat sat on the mat', 'go to school', 'between you and me', 'cats or dogs', 'minus', 'kg', '']:
+            self.assertFalse(self.num_parser.may_contain_number(text), text)
+
+    def test_connectives(self):
+        # parse_num reads connectives that do not split a range as zero
+        self.assertTrue(self.num_parser.may_contain_number('salt and pepper'))
+        self.assertEqual(self.num_parser.parse_num('salt and pepper'), 0)
+
+    def test_no_false_negatives(self):
+        vocabulary = ['and', 'to', 'or', 'between', 'from', 'until', 'minus', '-', 'kg', 'hours', 'in', 'the', 'cat',
+                      'point', 'dot', '.', ',', '/', '$', 'five', 'Hundred', 'nan', '1,000', '3:58', 'x', 'AND', '"']
+        rnd = random.Random(0)
+        for _ in range(2000):
+            text = ' '.join(rnd.choice(vocabulary) for _ in range(rnd.randint(1, 6)))
+            if self.accepts(text):
+                self.assertTrue(self.num_parser.may_contain_number(text), text)
+
+if __name__ == '__main__':
+    unittest.main()
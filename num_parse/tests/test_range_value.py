@@ -1,6 +1,7 @@
 import unittest
+from pint import DimensionalityError
 from num_parse.NumParser import NumParser
-from num_parse.RangeValue import RangeValue
+from num_parse.RangeValue import RangeValue, unique, hash_join, convert_all, _BucketIndex, MARGIN
 
 class TestRangeValue(unittest.TestCase):
 
@@ -78,6 +79,129 @@ class TestRangeValue(unittest.TestCase):
         self.assertLess(rv, self.Q_(1000.00001, 'cm'))
         self.assertLess(rv, self.Q_(100000.00001, 'mm'))
 
+    def test_range_equality_range_different_units(self):
+        self.assertEqual(RangeValue(self.Q_(2, 'm'), self.Q_(3, 'm')), RangeValue(self.Q_(200, 'cm'), self.Q_(300, 'cm')))
+        self.assertNotEqual(RangeValue(self.Q_(2, 'm'), self.Q_(3, 'm')), RangeValue(self.Q_(200, 'cm'), self.Q_(301, 'cm')))
+        self.assertNotEqual(RangeValue(self.Q_(2, 'm')), RangeValue(self.Q_(2, 'kg')))
+        self.assertNotEqual(RangeValue(self.Q_(2, 'm')), RangeValue(self.Q_(2)))
+
+    def test_range_ordering_range_different_units(self):
+        rv = RangeValue(self.Q_(1, 'm'), self.Q_(2, 'm'))
+        self.assertLess(rv, RangeValue(self.Q_(150, 'cm'), self.Q_(250, 'cm')))
+        self.assertGreater(rv, RangeValue(self.Q_(1, 'inch'), self.Q_(2, 'inch')))
+        self.assertRaises(DimensionalityError, lambda: rv < RangeValue(self.Q_(1, 'kg')))
+
+    def test_range_ordering_offset_units(self):
+        self.assertLess(RangeValue(self.Q_(5, 'degF')), RangeValue(self.Q_(2, 'degC')))
+        self.assertEqual(RangeValue(self.Q_(32, 'degF')), RangeValue(self.Q_(0, 'degC')))
+
+    def test_canonical_magnitudes(self):
+        rv = RangeValue(self.Q_(150, 'cm'), self.Q_(2, 'm'))
+        self.assertAlmostEqual(rv.base_min, 1.5)
+        self.assertAlmostEqual(rv.base_max, 2)
+        self.assertEqual(rv.dimensionality, self.Q_(1, 'm').dimensionality)
+
+    def test_shared_quantities(self):
+        # Giving units to a unitless Quantity another range shares has to show in that range's comparisons too
+        shared = self.Q_(5)
+        rv = RangeValue(shared)
+        RangeValue(self.Q_(3, 'meter'), shared)
+        self.assertEqual(str(rv), '5 meter')
+        self.assertEqual(rv, RangeValue(self.Q_(5, 'meter')))
+        self.assertEqual(rv.dimensionality, self.Q_(1, 'm').dimensionality)
+        self.assertLess(rv, RangeValue(self.Q_(6, 'meter')))
+        self.assertEqual(rv.canonical_key(), RangeValue(self.Q_(500, 'cm')).canonical_key())
+
+        # As do conversions in place of the Quantities of a range, e.g. through __pos__
+        rv = RangeValue(self.Q_(2, 'km'))
+        (+rv).min_val.ito('m')
+        self.assertEqual(rv.base_min, 2000)
+        self.assertEqual(rv, RangeValue(self.Q_(2000, 'm')))
+
+    def test_sort_key(self):
+        values = [self.num_parser.parse_num(s) for s in ['3 m', '20 cm', '1 km', '5 to 10 inches']]
+        self.assertEqual([str(v) for v in sorted(values, key=lambda v: v.sort_key)],
+                         ['5 to 10 inch', '20 centimeter', '3 meter', '1 kilometer'])
+
+    #######################################################
+    # Hashing / Deduplication
+    #######################################################
+
+    def test_canonical_key_different_units(self):
+        self.assertEqual(self.num_parser.parse_num("2 m").canonical_key(),
+                         self.num_parser.parse_num("200 cm").canonical_key())
+        self.assertEqual(self.num_parser.parse_num("2.2046226218487758 pounds").canonical_key(),
+                         self.num_parser.parse_num("1 kilogram").canonical_key())
+        self.assertNotEqual(self.num_parser.parse_num("2 m").canonical_key(),
+                            self.num_parser.parse_num("2 kg").canonical_key())
+
+    def test_unique(self):
+        values = [self.num_parser.parse_num(s) for s in ['2 m', '200 cm', 'two', '2 kg', '2000 mm', '3 to 4 m', '300 to 400 cm']]
+        self.assertEqual([str(v) for v in unique(values)], ['2 meter', '2', '2 kilogram', '3 to 4 meter'])
+
+    def test_hash_join(self):
+        left = [self.num_parser.parse_num(s) for s in ['2 m', '5 seconds', '7']]
+        right = [self.num_parser.parse_num(s) for s in ['200 cm', '7', '5 minutes']]
+        self.assertEqual([(str(l), str(r)) for l, r in hash_join(left, right)],
+                         [('2 meter', '200 centimeter'), ('7', '7')])
+
+    def test_tolerance_in_larger_units(self):
+        # __eq__ allows MARGIN in the units of the values, e.g. 0.0001 km (0.1 m) or 0.0001 h (0.36 s)
+        km = [RangeValue(self.Q_(2, 'km')), RangeValue(self.Q_(2.00005, 'km'))]
+        hours = [RangeValue(self.Q_(1.5, 'hour')), RangeValue(self.Q_(1.50008, 'hour')), RangeValue(self.Q_(5400.1, 's'))]
+        self.assertEqual(km[0], km[1])
+        self.assertEqual([str(v) for v in unique(km + hours)], ['2 kilometer', '1.5 hour'])
+        self.assertEqual([(str(l), str(r)) for l, r in hash_join(km[:1], km[1:])], [('2 kilometer', '2.00005 kilometer')])
+        self.assertEqual(len(list(hash_join(hours[1:], hours[:1]))), 2)
+        self.assertEqual(unique([RangeValue(self.Q_(2, 'km')), RangeValue(self.Q_(2.1, 'km'))])[1].min_val.m, 2.1)
+
+    def test_mixed_magnitudes(self):
+        # A light-year or megaton value does not coarsen the buckets of the other values of its dimensionality
+        values = [RangeValue(self.Q_(idx, 'mm')) for idx in range(500)] + [RangeValue(self.Q_(1, 'light_year'))] + \
+                 [RangeValue(self.Q_(idx, 'kg')) for idx in range(500)] + [RangeValue(self.Q_(1, 'megaton'))]
+        index = _BucketIndex(MARGIN)
+        for value in values:
+            index.add(value)
+        self.assertEqual(len(index), len(values))
+        self.assertEqual(sorted(len(scales) for scales in index.scales.values()), [2, 2])
+        self.assertEqual(len(unique(values + values[::-1])), len(values))
+        self.assertEqual(len(list(hash_join(values, values))), len(values))
+        # Values within the tolerance of a value in large units still match it
+        self.assertEqual(len(list(hash_join([RangeValue(self.Q_(9460730472580800.0 + 1e11, 'm'))], values))), 1)
+
+    #######################################################
+    # Unit Conversion
+    #######################################################
+
+    def test_to(self):
+        rv = self.num_parser.parse_num("5 to 10 cm").to('inch')
+        self.assertEqual(str(rv.min_val.units), 'inch')
+        self.assertAlmostEqual(rv.min_val.m, 1.9685, places=4)
+        self.assertAlmostEqual(rv.max_val.m, 3.9370, places=4)
+
+    def test_to_offset_units(self):
+        rv = RangeValue(self.Q_(32, 'degF'), self.Q_(212, 'degF')).to('degC')
+        self.assertAlmostEqual(rv.min_val.m, 0)
+        self.assertAlmostEqual(rv.max_val.m, 100)
+
+    def test_to_logarithmic_units(self):
+        rv = RangeValue(self.Q_(10, 'dBm'), self.Q_(20, 'dBm')).to('milliwatt')
+        self.assertAlmostEqual(rv.min_val.m, 10)
+        self.assertAlmostEqual(rv.max_val.m, 100)
+        self.assertRaises(ValueError, self.num_parser.ureg.get_conversion, 'dBm', 'milliwatt')
+
+    def test_to_incompatible_units(self):
+        self.assertRaises(DimensionalityError, self.num_parser.parse_num("5 cm").to, 'kg')
+
+    def test_convert_all(self):
+        values = [self.num_parser.parse_num(s) for s in ['1 m', '50 cm', '1 to 2 km', '20 cm']]
+        self.assertEqual([str(v) for v in convert_all(values, 'cm')],
+                         ['100.0 centimeter', '50.0 centimeter', '100000.0 to 200000.0 centimeter', '20.0 centimeter'])
+
+    def test_convert_array(self):
+        converted = self.num_parser.ureg.convert_array([32, 212, -40], 'degF', 'degC')
+        self.assertEqual([round(v, 6) for v in converted], [0, 100, -40])
+
     #######################################################
     # Arithmetic
     #######################################################
@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+from num_parse.NumParser import NumParser, UnitCache
+from num_parse.RangeValue import RangeValue
+
+class TestRegisterUnits(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.Q_ = self.num_parser.Quantity
+
+    def test_register_units(self):
+        self.assertEqual(self.num_parser.parse_num('3 servings'), RangeValue(self.Q_(3)))
+        self.num_parser.register_units("""
+            serving = [serving] = servings
+            tablet = [tablet]
+            sq_ft = foot ** 2
+        """)
+        self.assertEqual(self.num_parser.parse_num('3 servings'), RangeValue(self.Q_(3, 'serving')))
+        self.assertEqual(self.num_parser.parse_num('2 tablets'), RangeValue(self.Q_(2, 'tablet')))
+        self.assertEqual(self.num_parser.parse_num('5 to 10 tablets'), RangeValue(self.Q_(5, 'tablet'), self.Q_(10, 'tablet')))
+        self.assertEqual(self.num_parser.parse_num('100 sq_ft'), RangeValue(self.Q_(100, 'foot ** 2')))
+
+    def test_register_time_units(self):
+        self.num_parser.register_units(['sennight = 7 * day'])
+        self.assertIn('sennight', self.num_parser.time_units)
+        self.assertEqual(self.num_parser.parse_num('1 sennight and 2 days'), RangeValue(self.Q_(9, 'day')))
+
+    def test_register_alias(self):
+        self.num_parser.register_units('@alias foot = footsie')
+        self.assertTrue(self.num_parser.ureg.has_unit_name('footsies', True))
+        self.assertEqual(self.num_parser.parse_num('2 footsies'), RangeValue(self.Q_(2, 'foot')))
+
+    def test_redefinition_invalidates_conversions(self):
+        self.num_parser.register_units('smoot = 67 * inch')
+        self.assertEqual(self.num_parser.parse_num('2 smoots').to('inch'), RangeValue(self.Q_(134, 'inch')))
+        self.num_parser.register_units('smoot = 70 * inch')
+        self.assertEqual(self.num_parser.parse_num('2 smoots').to('inch'), RangeValue(self.Q_(140, 'inch')))
+
+    def test_targeted_invalidation(self):
+        ureg = self.num_parser.ureg
+        self.assertEqual(str(ureg.parse_units('kft')), 'kilofoot')
+        ureg.parse_units('kilometer / hour')
+        # A new unit shadowing a prefixed one drops the cached parses of its spelling, and only those
+        self.num_parser.register_units('kft = 3 * foot')
+        self.assertEqual(str(ureg.parse_units('kft')), 'kft')
+        self.assertIn('kilometer / hour', ureg._cache.parse_unit)
+        # Later definitions look the affected entries up rather than going through every cached entry
+        with mock.patch.object(UnitCache, '__iter__', side_effect=AssertionError('scanned the cache')):
+            self.num_parser.register_units(['serving = [serving]', '@alias foot = footsie'])
+        self.assertEqual(self.num_parser.parse_num('3 servings'), RangeValue(self.Q_(3, 'serving')))
+        self.assertEqual(self.num_parser.parse_num('2 footsies'), RangeValue(self.Q_(2, 'foot')))
+
+    def test_compatible_units(self):
+        self.num_parser.register_units(['serving = [serving]', 'portion = 2 * serving'])
+        self.assertEqual({str(unit) for unit in self.num_parser.ureg.get_compatible_units('serving')}, {'serving', 'portion'})
+
+if __name__ == '__main__':
+    unittest.main()
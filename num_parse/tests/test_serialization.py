@@ -0,0 +1,70 @@
+import io
+import json
+import math
+import unittest
+from num_parse.NumParser import NumParser
+from num_parse.RangeValue import RangeValue
+from num_parse.serialization import UnitDictionary, RECORD_SIZE, encode_binary, decode_binary, to_json, from_json, \
+    encode_json_lines, decode_json_lines
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser()
+        self.Q_ = self.num_parser.Quantity
+        self.dictionary = UnitDictionary.from_registry(self.num_parser.ureg)
+        self.values = [self.num_parser.parse_num(s) for s in
+                       ['4 million miles', 'five to six hours', '2.2046226218487758 pounds', '-135 thousand',
+                        '45°F', '3 km']]
+        self.values.append(RangeValue(self.Q_(1.5, 'meter / second ** 2'), self.Q_(2, 'meter / second ** 2')))
+
+    def assertIdentical(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for e, a in zip(expected, actual):
+            self.assertEqual((e.min_val.m, type(e.min_val.m), e.max_val.m, type(e.max_val.m), e.min_val._units),
+                             (a.min_val.m, type(a.min_val.m), a.max_val.m, type(a.max_val.m), a.min_val._units))
+
+    def test_binary_round_trip(self):
+        stream = io.BytesIO()
+        encode_binary(self.values, stream, self.dictionary)
+        self.assertEqual(len(stream.getvalue()) % RECORD_SIZE, 0)
+        stream.seek(0)
+        self.assertIdentical(self.values, list(decode_binary(stream, self.Q_, self.dictionary)))
+
+    def test_binary_round_trip_other_parser(self):
+        stream = io.BytesIO()
+        encode_binary(self.values, stream, self.dictionary)
+        stream.seek(0)
+        other = NumParser()
+        decoded = list(decode_binary(stream, other.Quantity, UnitDictionary.from_registry(other.ureg)))
+        self.assertEqual([str(v) for v in self.values], [str(v) for v in decoded])
+
+    def test_binary_dictionary_mismatch(self):
+        stream = io.BytesIO()
+        encode_binary(self.values, stream, self.dictionary)
+        stream.seek(0)
+        with self.assertRaises(ValueError):
+            list(decode_binary(stream, self.Q_, UnitDictionary(['', 'meter'])))
+
+    def test_json_round_trip(self):
+        self.assertEqual(to_json(self.num_parser.parse_num('5 to 10 meters')), '{"max":10,"min":5,"unit":"meter"}')
+        self.assertIdentical(self.values, [from_json(to_json(v), self.Q_) for v in self.values])
+
+    def test_json_non_finite(self):
+        value = RangeValue(self.Q_(5.0, 'meter'), self.Q_(float('inf'), 'meter'))
+        text = to_json(value)
+        self.assertEqual(text, '{"max":"Infinity","min":5.0,"unit":"meter"}')
+        # Strict JSON, which parsers in other languages accept
+        json.loads(text, parse_constant=self.fail)
+        self.assertIdentical([value], [from_json(text, self.Q_)])
+        self.assertEqual(to_json(RangeValue(self.Q_(float('-inf')))), '{"max":"-Infinity","min":"-Infinity","unit":""}')
+        nan = from_json(to_json(self.num_parser.parse_num('nan')), self.Q_)
+        self.assertTrue(math.isnan(nan.min_val.m) and math.isnan(nan.max_val.m))
+        with self.assertRaises(ValueError):
+            from_json('{"max":"five","min":5,"unit":"meter"}', self.Q_)
+
+    def test_json_lines_round_trip(self):
+        stream = io.StringIO()
+        encode_json_lines(self.values, stream)
+        stream.seek(0)
+        self.assertIdentical(self.values, list(decode_json_lines(stream, self.Q_)))
@@ -0,0 +1,71 @@
+import unittest
+from num_parse.NumParser import NumParser, MAGNITUDE_SUFFIXES
+from num_parse.RangeValue import RangeValue
+
+class TestShorthand(unittest.TestCase):
+
+    def setUp(self):
+        self.num_parser = NumParser(magnitude_suffixes=MAGNITUDE_SUFFIXES)
+        self.Q_ = self.num_parser.Quantity
+
+    def test_suffixes(self):
+        self.assertEqual(self.num_parser.parse_num('4.5k'), RangeValue(self.Q_(4500)))
+        self.assertEqual(self.num_parser.parse_num('2.1bn'), RangeValue(self.Q_(2100000000)))
+        self.assertEqual(self.num_parser.parse_num('12MM'), RangeValue(self.Q_(12000000)))
+        self.assertEqual(self.num_parser.parse_num('-2.5k'), RangeValue(self.Q_(-2500)))
+        self.assertEqual(self.num_parser.parse_num('1.5e3k'), RangeValue(self.Q_(1500000)))
+        # Magnitudes are exact, and integers stay integers like "12 million" does
+        self.assertEqual(self.num_parser.parse_num('4.1k').min_val.m, 4100.0)
+        self.assertIs(type(self.num_parser.parse_num('12MM').min_val.m), int)
+
+    def test_currencies(self):
+        self.assertEqual(self.num_parser.parse_num('$3M'), RangeValue(self.Q_(3000000, 'dollar')))
+        self.assertEqual(self.num_parser.parse_num('-$1,200k'), RangeValue(self.Q_(-1200000, 'dollar')))
+        self.assertEqual(self.num_parser.parse_num('$ 11'), RangeValue(self.Q_(11, 'dollar')))
+        # A currency of another dimensionality than the expected one is not read as a unit
+        self.assertEqual(self.num_parser.parse_num('$3M', expect='[time]'), RangeValue(self.Q_(3)))
+
+    def test_ranges(self):
+        self.assertEqual(self.num_parser.parse_num('5k to 10k'), RangeValue(self.Q_(5000), self.Q_(10000)))
+        self.assertEqual(self.num_parser.parse_num('$3M - $5M'), RangeValue(self.Q_(3000000, 'dollar'), self.Q_(5000000, 'dollar')))
+        self.assertEqual(self.num_parser.parse_num('between 2.1bn and 3bn'), RangeValue(self.Q_(2100000000), self.Q_(3000000000)))
+        self.assertEqual(self.num_parser.parse_num('5k-10k'), RangeValue(self.Q_(5000), self.Q_(10000)))
+
+    def test_unit_phrases(self):
+        self.assertEqual(self.num_parser.parse_num('3k miles'), RangeValue(self.Q_(3000, 'mile')))
+        self.assertEqual(self.num_parser.parse_num('4.5k dollars'), RangeValue(self.Q_(4500, 'dollar')))
+        self.assertEqual(self.num_parser.parse_num('a budget of $1.2M'), RangeValue(self.Q_(1200000, 'dollar')))
+        # Words that merely start with a suffix are left alone
+        self.assertEqual(self.num_parser.parse_num('10kg to 12kg'), RangeValue(self.Q_(10, 'kilogram'), self.Q_(12, 'kilogram')))
+        self.assertEqual(self.num_parser.expand_shorthand('$3M - $5M', frozenset()), '$3M - $5M')
+
+    def test_not_shorthand(self):
+        # Suffixes have to directly follow the number
+        self.assertEqual(self.num_parser.parse_num('5 k'), RangeValue(self.Q_(5, 'boltzmann_constant')))
+        self.assertEqual(self.num_parser.parse_num('12mm'), RangeValue(self.Q_(12, 'millimeter')))
+        self.assertEqual(self.num_parser.parse_num('1.2e6'), RangeValue(self.Q_(1200000)))
+
+    def test_default_table(self):
+        # Without a table, suffixes are read as the units they name, and only currency symbols are read
+        num_parser = NumParser()
+        Q_ = num_parser.Quantity
+        self.assertEqual(num_parser.magnitude_suffixes, {})
+        self.assertEqual(num_parser.parse_num('10M'), RangeValue(Q_(10, 'meter')))
+        self.assertEqual(num_parser.parse_num('12MM'), RangeValue(Q_(12, 'millimeter')))
+        self.assertEqual(num_parser.parse_num('3k miles'), RangeValue(Q_(3, 'boltzmann_constant')))
+        self.assertEqual(num_parser.parse_num('$3M'), RangeValue(Q_(3, 'dollar')))
+        self.assertEqual(num_parser.parse_num('$ 11'), RangeValue(Q_(11, 'dollar')))
+
+    def test_custom_table(self):
+        num_parser = NumParser(magnitude_suffixes={'bn': 10**9}, currency_symbols={})
+        Q_ = num_parser.Quantity
+        self.assertEqual(num_parser.parse_num('12MM'), RangeValue(Q_(12, 'millimeter')))
+        self.assertEqual(num_parser.parse_num('5bn'), RangeValue(Q_(5000000000)))
+        num_parser.set_shorthand({}, {})
+        self.assertIsNone(num_parser.shorthand_expression)
+        self.assertEqual(num_parser.parse_num('$11'), RangeValue(Q_(11, 'dollar')))
+        with self.assertRaises(ValueError):
+            num_parser.set_shorthand(currency_symbols={'€': 'euro'})
+
+if __name__ == '__main__':
+    unittest.main()
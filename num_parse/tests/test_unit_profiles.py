@@ -0,0 +1,44 @@
+import unittest
+from num_parse.NumParser import NumParser
+from num_parse.RangeValue import RangeValue
+from num_parse.unit_definitions.profiles import parse_definitions, select_definitions
+
+class TestUnitProfiles(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.num_parser = NumParser(units_profile='basic')
+        cls.Q_ = cls.num_parser.Quantity
+
+    def test_profile_units(self):
+        self.assertEqual(self.num_parser.parse_num('5 kg'), RangeValue(self.Q_(5, 'kilogram')))
+        self.assertEqual(self.num_parser.parse_num('3 hours'), RangeValue(self.Q_(3, 'hour')))
+        self.assertEqual(self.num_parser.parse_num('$11'), RangeValue(self.Q_(11, 'dollar')))
+        self.assertEqual(self.num_parser.parse_num('2 gallons'), RangeValue(self.Q_(2, 'gallon')))
+        self.assertEqual(self.num_parser.parse_num('5 to 10 cm'), RangeValue(self.Q_(5, 'cm'), self.Q_(10, 'cm')))
+        self.assertEqual(self.num_parser.parse_num('1 hour and 30 minutes'), RangeValue(self.Q_(90, 'minutes')))
+
+    def test_profile_conversions(self):
+        self.assertEqual(self.num_parser.parse_num('1 mile').to('km'), RangeValue(self.Q_(1.609344, 'km')))
+        self.assertEqual(self.num_parser.parse_num('212 degrees Fahrenheit').to('degC'), RangeValue(self.Q_(100, 'degC')))
+
+    def test_excluded_units(self):
+        self.assertEqual(self.num_parser.parse_num('5 amperes'), RangeValue(self.Q_(5)))
+        self.assertNotIn('ampere', self.num_parser.ureg._units)
+
+    def test_time_units(self):
+        self.assertEqual(set(self.num_parser.time_units), set(NumParser().time_units))
+
+    def test_unit_groups(self):
+        num_parser = NumParser(units_profile=['USCSLiquidVolume'])
+        self.assertEqual(num_parser.parse_num('3 pints').to('quart'), RangeValue(num_parser.Quantity(1.5, 'quart')))
+        self.assertNotIn('acre', num_parser.ureg._units)
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            NumParser(units_profile='everything')
+        with self.assertRaises(ValueError):
+            select_definitions(parse_definitions(), ['smell'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+Compiled Unit Definitions
+
+A precompiled form of the unit definitions, built when the package is built and shipped next to the text files, so
+constructing a NumParser does not have to lex the definition files or build the registry cache and lookup indexes.
+
+The artifact holds:
+1. The parsed definitions, with @import directives already resolved.
+2. The registry cache (dimensionalities and root units) and the prefixed units resolved while building it, as they
+   stand right after construction.
+3. The prefix table (prefix spellings by length) and the alias/plural index used to detect unit words.
+4. The dimensionality index (units by dimensionality), which includes the time units.
+
+Every named unit profile (see profiles.UNIT_PROFILES) is compiled into an artifact of its own (e.g.
+basic_units.basic.pickle), so constructing a parser with a named profile does not have to trim the definitions either.
+Profiles given as lists of dimensions and unit groups are still trimmed from the text files.
+
+The artifact records a digest of every definition file it was compiled from and is ignored whenever those files have
+been customized (or pint has been upgraded), in which case the registry falls back to loading the text files.
+
+Usage:
+    python -m num_parse.unit_definitions.compiled [output directory]
+
+"""
+
+import hashlib
+import pickle
+import re
+import sys
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Union
+import pint
+from pint.definitions import UnitDefinition
+from pint.parser import DefinitionFile, DefinitionFiles
+from num_parse.unit_definitions.profiles import DEFAULT_UNITS_PATH, UNIT_PROFILES, load_profile, parse_definitions
+
+FORMAT_VERSION = 3
+ARTIFACT_PATH = DEFAULT_UNITS_PATH.with_suffix('.pickle')
+
+_IMPORT_PATTERN = re.compile(r'^@import\s+(\S+)', re.MULTILINE)
+
+def source_digests(path: Union[str, Path] = DEFAULT_UNITS_PATH) -> Dict[str, str]:
+    """
+    Computes a digest of a definitions file and of every file it imports.
+    :param path: The path of the definitions file.
+    :return: A dictionary mapping each file name to the SHA-1 digest of its contents.
+    """
+
+    digests = {}
+    pending = [Path(path)]
+    while pending:
+        current = pending.pop()
+        content = current.read_bytes()
+        digests[current.name] = hashlib.sha1(content).hexdigest()
+        pending.extend(current.parent / name for name in _IMPORT_PATTERN.findall(content.decode('utf-8')))
+    return digests
+
+def artifact_path(profile: Optional[str] = None,
+                  directory: Union[str, Path] = ARTIFACT_PATH.parent) -> Path:
+    """
+    :param profile: The name of a profile in UNIT_PROFILES, or None (or "full") for every unit.
+    :param directory: The directory of the artifacts.
+    :return: The path of the artifact of the profile.
+    """
+
+    if profile is None or profile == 'full':
+        return Path(directory) / ARTIFACT_PATH.name
+    return Path(directory) / '{}.{}{}'.format(ARTIFACT_PATH.stem, profile, ARTIFACT_PATH.suffix)
+
+class CompiledUnits(object):
+    """
+    The contents of a compiled unit definitions artifact.
+    Can be passed to NumUnitRegistry in place of a definitions file name.
+    """
+
+    def __init__(self,
+                 sources: Dict[str, str],
+                 profile: Optional[str],
+                 definitions: DefinitionFiles,
+                 cache,
+                 prefixed_units: Dict[str, UnitDefinition],
+                 prefix_table: Dict[int, Set[str]],
+                 unit_index: Dict[str, str],
+                 dimension_index: Dict[object, FrozenSet[str]]):
+        self.format_version = FORMAT_VERSION
+        self.pint_version = pint.__version__
+        self.sources = sources
+        self.profile = profile
+        self.definitions = definitions
+        self.cache = cache
+        self.prefixed_units = prefixed_units
+        self.prefix_table = prefix_table
+        self.unit_index = unit_index
+        self.dimension_index = dimension_index
+
+    def is_current(self,
+                   path: Union[str, Path] = DEFAULT_UNITS_PATH,
+                   profile: Optional[str] = None) -> bool:
+        """
+        Checks whether the artifact is still valid for the given definitions file, profile and the installed pint.
+        """
+
+        return self.format_version == FORMAT_VERSION and \
+               self.pint_version == pint.__version__ and \
+               self.profile == (None if profile == 'full' else profile) and \
+               self.sources == source_digests(path)
+
+def compile_definitions(path: Union[str, Path] = DEFAULT_UNITS_PATH,
+                        output: Union[str, Path] = ARTIFACT_PATH,
+                        profile: Optional[str] = None) -> CompiledUnits:
+    """
+    Compiles a definitions file into an artifact.
+    :param path: The path of the definitions file.
+    :param output: Where to write the artifact.
+    :param profile: Optionally the name of a profile in UNIT_PROFILES to trim the definitions to.
+    :return: The compiled unit definitions.
+    """
+
+    # Imported here since the registry itself loads compiled definitions
+    from num_parse.NumParser import NumUnitRegistry
+
+    profile = None if profile == 'full' else profile
+    if profile is None:
+        parsed = parse_definitions(path)
+        definitions = DefinitionFiles([DefinitionFile(None, False, None, None, tuple(parsed.iter_definitions()))])
+    else:
+        definitions = load_profile(profile, path)
+    registry = NumUnitRegistry(definitions)
+    compiled = CompiledUnits(sources=source_digests(path),
+                             profile=profile,
+                             definitions=definitions,
+                             cache=registry._cache,
+                             prefixed_units={name: registry._units[name] for name in registry._prefixed_units},
+                             prefix_table=registry._prefix_table,
+                             unit_index=registry._unit_index,
+                             dimension_index=registry._dimension_index)
+    with open(output, 'wb') as f:
+        pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return compiled
+
+def compile_all(path: Union[str, Path] = DEFAULT_UNITS_PATH,
+                directory: Union[str, Path] = ARTIFACT_PATH.parent) -> None:
+    """
+    Compiles the artifact of every unit and the artifact of every named profile.
+    :param path: The path of the definitions file.
+    :param directory: The directory to write the artifacts to.
+    """
+
+    for profile in (None,) + tuple(UNIT_PROFILES):
+        compile_definitions(path, artifact_path(profile, directory), profile)
+
+def load_compiled(path: Union[str, Path] = DEFAULT_UNITS_PATH,
+                  artifact: Optional[Union[str, Path]] = None,
+                  profile: Optional[Union[str, Iterable[str]]] = None) -> Optional[CompiledUnits]:
+    """
+    Loads the compiled unit definitions, if there is an artifact that is up to date with the definitions file.
+    :param path: The path of the definitions file the artifact should have been compiled from.
+    :param artifact: The path of the artifact. Defaults to the artifact of the profile next to the definitions.
+    :param profile: The units profile (see NumParser). Only named profiles are compiled.
+    :return: The compiled unit definitions, or None if the text files should be loaded (and trimmed) instead.
+    """
+
+    if profile is not None and not isinstance(profile, str):
+        return None
+    if artifact is None:
+        artifact = artifact_path(profile)
+    try:
+        with open(artifact, 'rb') as f:
+            compiled = pickle.load(f)
+    except Exception:
+        # Missing, or written by an incompatible version of the package or its dependencies
+        return None
+    if not isinstance(compiled, CompiledUnits) or not compiled.is_current(path, profile):
+        return None
+    return compiled
+
+if __name__ == '__main__':
+    # Go through the package module so the artifact refers to num_parse.unit_definitions.compiled, not __main__
+    from num_parse.unit_definitions import compiled
+    compiled.compile_all(directory=sys.argv[1] if len(sys.argv) > 1 else ARTIFACT_PATH.parent)
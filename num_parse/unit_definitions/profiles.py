@@ -0,0 +1,212 @@
+"""
+Unit Profiles
+
+Trimmed versions of the unit definitions that only contain selected dimensions or unit groups.
+
+The definition files are parsed with pint's own parser (without building a registry), the dimensionality of every
+unit is worked out from its references, and only the selected units are kept, along with the units, constants and
+groups they depend on. Prefixes, derived dimensions and the default system are always kept; conversion contexts and
+systems whose units did not survive the trimming are dropped.
+
+"""
+
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Union
+from pint.parser import Parser, DefinitionFile, DefinitionFiles
+from pint.definitions import AliasDefinition, DimensionDefinition, PrefixDefinition, UnitDefinition
+from pint.registry import DefaultsDefinition
+from pint.systems import GroupDefinition, SystemDefinition
+from pint.context import ContextDefinition
+
+DEFAULT_UNITS_PATH = Path(__file__).parent / 'basic_units.txt'
+
+#: Named profiles that can be passed to NumParser(units_profile=...)
+UNIT_PROFILES = {
+    'basic': ('length', 'mass', 'time', 'volume', 'temperature', 'currency'),
+}
+
+def parse_definitions(path: Union[str, Path] = DEFAULT_UNITS_PATH) -> DefinitionFiles:
+    """
+    Parses a unit definitions file (and the files it imports) into pint definition objects.
+    :param path: The path of the definitions file.
+    :return: The parsed definition files.
+    """
+
+    parser = Parser(float)
+    for prefix, definition_class in (('@alias', AliasDefinition),
+                                     ('@defaults', DefaultsDefinition),
+                                     ('@context', ContextDefinition),
+                                     ('@group', GroupDefinition),
+                                     ('@system', SystemDefinition)):
+        parser.register_class(prefix, definition_class)
+    return parser.parse(path)
+
+def _normalize_dimension(name: str) -> str:
+    if name == 'dimensionless':
+        return '[]'
+    return name if name.startswith('[') else '[' + name + ']'
+
+class _DefinitionIndex(object):
+    """
+    Resolves unit names (including symbols, aliases, prefixes and plurals) and dimensionalities from
+    parsed definitions.
+    """
+
+    def __init__(self, definitions):
+        self.units: Dict[str, UnitDefinition] = {}
+        self.prefixes: Set[str] = set()
+        self.dimensions: Dict[str, DimensionDefinition] = {}
+        for definition in definitions:
+            if isinstance(definition, UnitDefinition):
+                for key in (definition.name, definition.symbol) + tuple(definition.aliases):
+                    if key:
+                        self.units.setdefault(key, definition)
+            elif isinstance(definition, PrefixDefinition):
+                self.prefixes.update(key for key in (definition.name, definition.symbol) + tuple(definition.aliases) if key)
+            elif isinstance(definition, DimensionDefinition):
+                self.dimensions[definition.name] = definition
+        self._dimensionalities: Dict[str, Dict[str, float]] = {}
+
+    def resolve(self, name: str) -> UnitDefinition:
+        if name in self.units:
+            return self.units[name]
+        for candidate in (name, name[:-1] if name.endswith('s') else None):
+            if not candidate:
+                continue
+            if candidate in self.units:
+                return self.units[candidate]
+            for prefix in self.prefixes:
+                if candidate.startswith(prefix) and candidate[len(prefix):] in self.units:
+                    return self.units[candidate[len(prefix):]]
+        raise ValueError("Unit '{}' is not defined in the unit definitions!".format(name))
+
+    def dimension_dimensionality(self, name: str) -> Dict[str, float]:
+        definition = self.dimensions.get(name)
+        if definition is None or definition.is_base or definition.reference is None:
+            return {} if name == '[]' else {name: 1}
+        accumulator = defaultdict(float)
+        for key, exponent in definition.reference.items():
+            for dimension, dim_exponent in self.dimension_dimensionality(key).items():
+                accumulator[dimension] += exponent * dim_exponent
+        return {k: v for k, v in accumulator.items() if v != 0}
+
+    def dimensionality(self, definition: UnitDefinition) -> Dict[str, float]:
+        if definition.name in self._dimensionalities:
+            return self._dimensionalities[definition.name]
+
+        accumulator = defaultdict(float)
+        for key, exponent in (definition.reference or {}).items():
+            if key.startswith('['):
+                dimensionality = self.dimension_dimensionality(key)
+            else:
+                dimensionality = self.dimensionality(self.resolve(key))
+            for dimension, dim_exponent in dimensionality.items():
+                accumulator[dimension] += exponent * dim_exponent
+        dimensionality = {k: v for k, v in accumulator.items() if v != 0}
+        self._dimensionalities[definition.name] = dimensionality
+        return dimensionality
+
+    def dependencies(self, definition: UnitDefinition) -> Iterable[UnitDefinition]:
+        for key in (definition.reference or {}):
+            if not key.startswith('['):
+                yield self.resolve(key)
+
+def select_definitions(definitions: DefinitionFiles,
+                       profile: Iterable[str]) -> DefinitionFiles:
+    """
+    Trims parsed unit definitions down to the given dimensions and/or unit groups.
+    :param definitions: The parsed definition files (see parse_definitions).
+    :param profile: Dimension names (e.g. "length" or "[length]") and/or unit group names (e.g. "USCSLiquidVolume").
+    :return: The trimmed definitions, flattened into a single definition file.
+    """
+
+    parsed_lines = list(definitions.iter_definitions())
+    flat_definitions = []
+    for lineno, definition in parsed_lines:
+        if isinstance(definition, GroupDefinition):
+            flat_definitions.extend(unit for _, unit in definition.units)
+        else:
+            flat_definitions.append(definition)
+    index = _DefinitionIndex(flat_definitions)
+    group_names = {definition.name for _, definition in parsed_lines if isinstance(definition, GroupDefinition)}
+
+    selected_groups = set()
+    selected_dimensionalities = []
+    for entry in profile:
+        if entry in group_names:
+            selected_groups.add(entry)
+        else:
+            dimension = _normalize_dimension(entry)
+            if dimension != '[]' and dimension not in index.dimensions and \
+                    not any(dimension in (unit.reference or {}) for unit in index.units.values() if unit.is_base):
+                raise ValueError("Unknown dimension or unit group '{}' in unit profile!".format(entry))
+            selected_dimensionalities.append(index.dimension_dimensionality(dimension))
+
+    # Select the units by dimension or group
+    keep = set()
+    for lineno, definition in parsed_lines:
+        if isinstance(definition, GroupDefinition):
+            units = [unit for _, unit in definition.units]
+            in_group = definition.name in selected_groups
+        else:
+            units = [definition] if isinstance(definition, UnitDefinition) else []
+            in_group = False
+        for unit in units:
+            if in_group or index.dimensionality(unit) in selected_dimensionalities:
+                keep.add(unit.name)
+
+    # The default system's units are needed for conversions to base units
+    defaults = dict(content for _, definition in parsed_lines if isinstance(definition, DefaultsDefinition)
+                    for content in definition.content)
+    for lineno, definition in parsed_lines:
+        if isinstance(definition, SystemDefinition) and definition.name == defaults.get('system'):
+            for _, new_unit, old_unit in definition.unit_replacements:
+                keep.update(index.resolve(name).name for name in (new_unit, old_unit) if name)
+
+    # Resolve the dependencies of the selected units
+    pending = [index.units[name] for name in keep]
+    while pending:
+        for dependency in index.dependencies(pending.pop()):
+            if dependency.name not in keep:
+                keep.add(dependency.name)
+                pending.append(dependency)
+
+    trimmed = []
+    for lineno, definition in parsed_lines:
+        if isinstance(definition, UnitDefinition):
+            if definition.name in keep:
+                trimmed.append((lineno, definition))
+        elif isinstance(definition, GroupDefinition):
+            # Groups are kept (even if empty) since other groups and systems refer to them by name
+            units = tuple((unit_lineno, unit) for unit_lineno, unit in definition.units if unit.name in keep)
+            trimmed.append((lineno, GroupDefinition(definition.name, units, definition.using_group_names)))
+        elif isinstance(definition, AliasDefinition):
+            if index.resolve(definition.name).name in keep:
+                trimmed.append((lineno, definition))
+        elif isinstance(definition, SystemDefinition):
+            names = [name for _, new_unit, old_unit in definition.unit_replacements for name in (new_unit, old_unit) if name]
+            if all(index.resolve(name).name in keep for name in names):
+                trimmed.append((lineno, definition))
+        elif not isinstance(definition, ContextDefinition):
+            trimmed.append((lineno, definition))
+
+    return DefinitionFiles([DefinitionFile(None, False, None, None, tuple(trimmed))])
+
+def load_profile(profile: Optional[Union[str, Iterable[str]]],
+                 path: Union[str, Path] = DEFAULT_UNITS_PATH) -> Optional[DefinitionFiles]:
+    """
+    Builds the trimmed definitions for a units profile.
+    :param profile: The name of a profile in UNIT_PROFILES, or an iterable of dimension and/or unit group names.
+                    None (or "full") means no trimming.
+    :param path: The path of the definitions file.
+    :return: The trimmed definitions, or None if the full definitions should be loaded.
+    """
+
+    if profile is None or profile == 'full':
+        return None
+    if isinstance(profile, str):
+        if profile not in UNIT_PROFILES:
+            raise ValueError("Unknown unit profile '{}'!".format(profile))
+        profile = UNIT_PROFILES[profile]
+    return select_definitions(parse_definitions(path), profile)
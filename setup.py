@@ -1,4 +1,23 @@
+from pathlib import Path
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
+
+class BuildPyWithCompiledUnits(build_py):
+    """
+    Precompiles the unit definitions (and those of every named unit profile) into the package being built (see num_parse/unit_definitions/compiled.py).
+    If the dependencies are not available at build time, the package falls back to loading the text files.
+    """
+
+    def run(self):
+        super().run()
+        if self.dry_run:
+            return
+        try:
+            from num_parse.unit_definitions.compiled import compile_all
+        except ImportError as e:
+            self.warn('Not precompiling the unit definitions ({})'.format(e))
+            return
+        compile_all(directory=Path(self.build_lib) / 'num_parse' / 'unit_definitions')
 
 with open('requirements.txt', 'r') as requirements:
     install_requires = requirements.read().splitlines()
@@ -18,5 +37,7 @@ setup(
     packages=find_packages(),
     python_requires='>=3.7',
     install_requires= install_requires,
-    include_package_data=True
+    extras_require={'pandas': ['pandas'], 'arrow': ['pyarrow']},
+    include_package_data=True,
+    cmdclass={'build_py': BuildPyWithCompiledUnits}
     )